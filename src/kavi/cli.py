@@ -36,6 +36,12 @@ def _get_conn() -> sqlite3.Connection:
     return init_db(LEDGER_DB)
 
 
+def _close_conn(conn: sqlite3.Connection) -> None:
+    from kavi.ledger.db import close
+
+    close(conn)
+
+
 @app.callback()
 def main(
     version: bool | None = typer.Option(  # noqa: N803
@@ -94,7 +100,7 @@ def propose_skill_cmd(
         required_secrets=secrets,
         output_dir=ARTIFACTS_OUT,
     )
-    conn.close()
+    _close_conn(conn)
     rprint(f"[green]Proposal created:[/green] {proposal.id}")
     rprint(f"  Name: {proposal.name}")
     rprint(f"  Status: {proposal.status.value}")
@@ -129,16 +135,15 @@ def research_skill_cmd(
 
     if advise:
         from kavi.forge.research import advise_retry
-        from kavi.ledger.models import get_artifacts_for_related, get_build
+        from kavi.ledger.models import get_build, iter_artifacts_for_related
 
         build = get_build(conn, build_id)
         if build is None:
-            conn.close()
+            _close_conn(conn)
             return
         # Find the original build packet
-        artifacts = get_artifacts_for_related(conn, build.proposal_id)
         original_packet = ""
-        for art in artifacts:
+        for art in iter_artifacts_for_related(conn, build.proposal_id):
             if art.kind.value == "BUILD_PACKET":
                 from pathlib import Path
 
@@ -169,7 +174,7 @@ def research_skill_cmd(
                 rprint(f"\n[yellow]LLM advisory failed:[/yellow] {e}")
                 rprint("Proceeding with deterministic research only.")
 
-    conn.close()
+    _close_conn(conn)
     rprint("\n[yellow]Next:[/yellow] kavi build-skill <proposal_id>")
 
 
@@ -194,7 +199,7 @@ def build_skill_cmd(
     rprint(f"  Build packet: {artifact.path}")
 
     if not invoke:
-        conn.close()
+        _close_conn(conn)
         rprint("\n[yellow]Next:[/yellow] Run Claude Code with the build packet, then:")
         rprint(f"  kavi verify-skill {proposal_id}")
         return
@@ -213,7 +218,7 @@ def build_skill_cmd(
         output_dir=ARTIFACTS_OUT,
         timeout=timeout,
     )
-    conn.close()
+    _close_conn(conn)
 
     if success:
         rprint("[green]Build succeeded![/green] Allowlisted files copied to repo.")
@@ -229,6 +234,9 @@ def build_skill_cmd(
 @app.command("verify-skill")
 def verify_skill_cmd(
     proposal_id: str = typer.Argument(help="Proposal ID to verify"),
+    fail_fast: bool = typer.Option(
+        False, "--fail-fast", help="Skip mypy and pytest if ruff fails",
+    ),
 ) -> None:
     """Run verification checks on a built skill."""
     from kavi.config import ARTIFACTS_OUT, POLICY_PATH, PROJECT_ROOT
@@ -240,9 +248,9 @@ def verify_skill_cmd(
     verification, artifact = verify_skill(
         conn, proposal_id=proposal_id,
         policy=policy, output_dir=ARTIFACTS_OUT,
-        project_root=PROJECT_ROOT,
+        project_root=PROJECT_ROOT, fail_fast=fail_fast,
     )
-    conn.close()
+    _close_conn(conn)
 
     color = "green" if verification.status.value == "PASSED" else "red"
     rprint(f"[{color}]Verification: {verification.status.value}[/{color}]")
@@ -266,7 +274,7 @@ def check_invariants_cmd(
 
     conn = _get_conn()
     proposal = get_proposal(conn, proposal_id)
-    conn.close()
+    _close_conn(conn)
     if proposal is None:
         typer.echo(f"Proposal '{proposal_id}' not found")
         raise typer.Exit(1)
@@ -306,7 +314,7 @@ def promote_skill_cmd(
         conn, proposal_id=proposal_id,
         project_root=PROJECT_ROOT, registry_path=REGISTRY_PATH,
     )
-    conn.close()
+    _close_conn(conn)
     rprint("[green]Skill promoted to TRUSTED[/green]")
     rprint(f"  Approved by: {promotion.approved_by}")
     rprint(f"  Registry updated: {REGISTRY_PATH}")
@@ -1,5 +1,6 @@
 """Kavi configuration and path constants."""
 
+import os
 from pathlib import Path
 
 # Project root is determined relative to where kavi is invoked
@@ -20,8 +21,15 @@ LEDGER_DB = PROJECT_ROOT / "kavi.db"
 SKILLS_DIR = Path(__file__).parent / "skills"
 REGISTRY_PATH = SKILLS_DIR / "registry.yaml"
 
+# Skip re-hashing a skill file whose stat is unchanged since it last passed
+# its trust check; KAVI_STRICT_HASH=1 re-hashes on every load
+STRICT_TRUST_HASH = os.environ.get("KAVI_STRICT_HASH") == "1"
+
 # Policy config
 POLICY_PATH = Path(__file__).parent / "policies" / "policy.yaml"
+# Opt-in policy scan cache keyed by sha256(scanner source, policy, file
+# bytes); None (the default) disables it. Never read by the verify gate.
+SCAN_CACHE_DB: Path | None = None
 
 # Sparkstation (local LLM gateway)
 SPARK_BASE_URL = "http://localhost:8000/v1"
@@ -29,3 +37,20 @@ SPARK_MODEL = "gpt-oss-20b"
 SPARK_EMBED_MODEL = "bge-large"
 SPARK_TIMEOUT = 30  # seconds
 SPARK_MAX_PROMPT_CHARS = 12000  # bound input before sending
+
+# On-disk embedding cache (content-addressed by base URL + model + text); None disables
+SPARK_EMBED_CACHE_DB: Path | None = PROJECT_ROOT / ".kavi_cache" / "embeddings.db"
+SPARK_EMBED_CACHE_TTL = 30 * 24 * 3600  # seconds
+SPARK_EMBED_CACHE_MAX_ROWS = 50_000
+
+# summarize_note results keyed by sha256(model, style, note text); None disables
+SUMMARY_CACHE_DB: Path | None = PROJECT_ROOT / ".kavi_cache" / "summaries.db"
+SUMMARY_CACHE_TTL = 7 * 24 * 3600  # seconds
+SUMMARY_CACHE_MAX_ROWS = 5_000
+
+# Semantic response cache for generate() (opt-in: KAVI_SEMANTIC_CACHE=1).
+# Only temperature-0 calls are cached; a prompt whose final user message has
+# cosine similarity >= the threshold with a cached one, under the same
+# gateway, model and earlier messages, reuses its response.
+SPARK_SEMANTIC_CACHE = os.environ.get("KAVI_SEMANTIC_CACHE") == "1"
+SPARK_SEMANTIC_CACHE_THRESHOLD = 0.95
@@ -6,11 +6,13 @@ import hashlib
 import posixpath
 import shutil
 import sqlite3
+import stat
 import subprocess
 from pathlib import Path
 
 from kavi.artifacts.writer import write_artifact, write_build_packet
 from kavi.forge.paths import skill_file_path, skill_test_path
+from kavi.ledger.db import transaction
 from kavi.ledger.models import (
     Artifact,
     ArtifactKind,
@@ -153,10 +155,6 @@ def build_skill(
             f"expected one of {', '.join(s.value for s in _BUILDABLE)}"
         )
 
-    # Reset BUILT back to PROPOSED for retry
-    if proposal.status == ProposalStatus.BUILT:
-        update_proposal_status(conn, proposal_id, ProposalStatus.PROPOSED)
-
     if branch_name is None:
         branch_name = f"skill/{proposal.name}-{proposal.id[:8]}"
 
@@ -171,7 +169,6 @@ def build_skill(
         attempt_number=attempt_number,
         parent_build_id=parent_build_id,
     )
-    insert_build(conn, build)
 
     # Base build packet content
     base_content = _create_build_packet_content(
@@ -209,10 +206,15 @@ def build_skill(
                 research_note_content=research_content,
             )
 
-    artifact = write_build_packet(
-        conn, content=content, build_id=build.id, output_dir=output_dir,
-        proposal_id=build.proposal_id,
-    )
+    with transaction(conn):
+        # Reset BUILT back to PROPOSED for retry
+        if proposal.status == ProposalStatus.BUILT:
+            update_proposal_status(conn, proposal_id, ProposalStatus.PROPOSED)
+        insert_build(conn, build)
+        artifact = write_build_packet(
+            conn, content=content, build_id=build.id, output_dir=output_dir,
+            proposal_id=build.proposal_id,
+        )
 
     return build, artifact
 
@@ -230,7 +232,6 @@ def _is_secret_file(name: str) -> bool:
 
 def _is_special_file(path: Path) -> bool:
     """Check if a path is a socket, fifo, or other non-regular, non-dir file."""
-    import stat
     try:
         mode = path.lstat().st_mode
         return stat.S_ISSOCK(mode) or stat.S_ISFIFO(mode) or stat.S_ISBLK(mode)
@@ -395,6 +396,25 @@ def diff_allowlist_gate(
 # ---------------------------------------------------------------------------
 
 
+def _symlinked_component(root: Path, rel_path: str) -> Path | None:
+    """Return the first existing component of root/rel_path that is a symlink.
+
+    Walks the path lexically with one lstat per existing component and stops
+    at the first component that does not exist yet (nothing below it can be
+    a symlink).
+    """
+    current = root
+    for part in rel_path.split("/"):
+        current = current / part
+        try:
+            mode = current.lstat().st_mode
+        except FileNotFoundError:
+            return None
+        if stat.S_ISLNK(mode):
+            return current
+    return None
+
+
 def _safe_copy_back(
     sandbox: Path,
     project_root: Path,
@@ -405,7 +425,8 @@ def _safe_copy_back(
     Safety checks:
     - Rejects relative paths containing '..' or absolute paths
     - Rejects symlinks in source
-    - Validates resolved destination is under project_root
+    - Rejects destinations that pass through a symlink, so the lexical
+      destination (root / rel_path) is also the real one
     - Returns list of (rel_path, overwritten) tuples as log lines
     """
     repo_root_resolved = project_root.resolve()
@@ -414,7 +435,11 @@ def _safe_copy_back(
     for rel_path in allowed_changes:
         # Normalize and reject traversal / absolute paths
         normalized = posixpath.normpath(rel_path)
-        if normalized.startswith("/") or normalized.startswith(".."):
+        if (
+            normalized == "."
+            or normalized.startswith("/")
+            or normalized.startswith("..")
+        ):
             raise ValueError(
                 f"Refusing path with traversal or absolute: {rel_path!r} "
                 f"(normalized: {normalized!r})"
@@ -426,7 +451,9 @@ def _safe_copy_back(
             )
 
         src = sandbox / rel_path
-        dst = project_root / rel_path
+        # rel_path is normalized and relative, so this is already the
+        # resolved destination — unless a component along it is a symlink.
+        dst = repo_root_resolved / rel_path
 
         # Reject symlinks — Claude could point them outside the sandbox
         if src.is_symlink():
@@ -434,12 +461,11 @@ def _safe_copy_back(
                 f"Refusing to copy symlink: {rel_path} -> {src.readlink()}"
             )
 
-        # Validate destination resolves under project root
-        dst_resolved = dst.resolve()
-        if not str(dst_resolved).startswith(str(repo_root_resolved) + "/"):
+        link = _symlinked_component(repo_root_resolved, rel_path)
+        if link is not None:
             raise ValueError(
-                f"Path traversal detected: {rel_path} resolves to "
-                f"{dst_resolved}, outside {repo_root_resolved}"
+                f"Path traversal detected: {rel_path} passes through "
+                f"symlink {link} -> {link.readlink()}"
             )
 
         overwritten = dst.exists()
@@ -645,12 +671,13 @@ def mark_build_succeeded(
     build = Build.model_validate(
         dict(conn.execute("SELECT * FROM builds WHERE id = ?", (build_id,)).fetchone())
     )
-    update_build(
-        conn, build_id,
-        status=BuildStatus.SUCCEEDED,
-        summary=summary,
-    )
-    update_proposal_status(conn, build.proposal_id, ProposalStatus.BUILT)
+    with transaction(conn):
+        update_build(
+            conn, build_id,
+            status=BuildStatus.SUCCEEDED,
+            summary=summary,
+        )
+        update_proposal_status(conn, build.proposal_id, ProposalStatus.BUILT)
 
 
 def mark_build_failed(
@@ -4,28 +4,36 @@ Given a proposal name (e.g. "write_note"), derive:
 - Skill file:   src/kavi/skills/{name}.py
 - Test file:    tests/test_skill_{name}.py
 - Module path:  kavi.skills.{name}.{CamelCase}Skill
+
+Derivations are pure, so they are memoized: a forge session asks for the
+same handful of names over and over.
 """
 
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=512)
 def _to_camel_case(name: str) -> str:
     """Convert snake_case name to CamelCase."""
     return "".join(part.capitalize() for part in name.split("_"))
 
 
+@lru_cache(maxsize=512)
 def skill_file_path(name: str, project_root: Path) -> Path:
     """Return the conventional path for a skill implementation file."""
     return project_root / "src" / "kavi" / "skills" / f"{name}.py"
 
 
+@lru_cache(maxsize=512)
 def skill_test_path(name: str, project_root: Path) -> Path:
     """Return the conventional path for a skill's test file."""
     return project_root / "tests" / f"test_skill_{name}.py"
 
 
+@lru_cache(maxsize=512)
 def skill_module_path(name: str) -> str:
     """Return the dotted module path for a skill class.
 
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import functools
 import hashlib
 import json
 import sqlite3
 from pathlib import Path
 
 from kavi.forge.paths import skill_file_path, skill_module_path
+from kavi.ledger.db import transaction
 from kavi.ledger.models import (
     Promotion,
     ProposalStatus,
@@ -20,9 +22,20 @@ from kavi.skills.loader import load_registry, save_registry
 
 
 def _compute_skill_hash(path: Path) -> str:
-    """Compute sha256 of the skill source file."""
-    content = path.read_bytes()
-    return hashlib.sha256(content).hexdigest()
+    """Compute sha256 of the skill source file.
+
+    Memoized by (path, mtime_ns, size): any write to the file changes the
+    key, so a re-promotion of an unchanged skill skips the re-read.
+    """
+    st = path.stat()
+    return _hash_file(str(path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _hash_file(path: str, mtime_ns: int, size: int) -> str:
+    """Stream a file through sha256. mtime_ns/size only key the cache."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
 
 def promote_skill(
@@ -79,18 +92,20 @@ def promote_skill(
         "version": version,
         "hash": skill_hash,
     })
-    save_registry(registry_path, skills)
-
-    # Update proposal status
-    update_proposal_status(conn, proposal_id, ProposalStatus.TRUSTED)
-
-    # Record promotion
-    promotion = Promotion(
-        proposal_id=proposal_id,
-        from_status=ProposalStatus.VERIFIED.value,
-        to_status=ProposalStatus.TRUSTED.value,
-        approved_by=approved_by,
-    )
-    insert_promotion(conn, promotion)
+    # Registry write, status change, and promotion record share one commit
+    with transaction(conn):
+        save_registry(registry_path, skills)
+
+        # Update proposal status
+        update_proposal_status(conn, proposal_id, ProposalStatus.TRUSTED)
+
+        # Record promotion
+        promotion = Promotion(
+            proposal_id=proposal_id,
+            from_status=ProposalStatus.VERIFIED.value,
+            to_status=ProposalStatus.TRUSTED.value,
+            approved_by=approved_by,
+        )
+        insert_promotion(conn, promotion)
 
     return promotion
@@ -7,6 +7,7 @@ import sqlite3
 from pathlib import Path
 
 from kavi.artifacts.writer import write_skill_spec
+from kavi.ledger.db import transaction
 from kavi.ledger.models import (
     Artifact,
     SideEffectClass,
@@ -29,12 +30,14 @@ def propose_skill(
 
     Returns the proposal and the spec artifact.
     """
+    # Validate io_schema is valid JSON before doing any other work. This is
+    # the only parse of the schema (it is stored verbatim), and json.loads
+    # already runs on the C scanner; discarding-hook decoders are not faster.
+    json.loads(io_schema_json)
+
     secrets = required_secrets or []
     secrets_json = json.dumps(secrets)
 
-    # Validate io_schema is valid JSON
-    json.loads(io_schema_json)
-
     proposal = SkillProposal(
         name=name,
         description=description,
@@ -42,17 +45,19 @@ def propose_skill(
         side_effect_class=side_effect_class,
         required_secrets_json=secrets_json,
     )
-    insert_proposal(conn, proposal)
-
-    artifact = write_skill_spec(
-        conn,
-        name=name,
-        description=description,
-        io_schema=io_schema_json,
-        side_effect_class=side_effect_class.value,
-        required_secrets=secrets_json,
-        proposal_id=proposal.id,
-        output_dir=output_dir,
-    )
+    # One commit for the proposal row and its spec artifact row
+    with transaction(conn):
+        insert_proposal(conn, proposal)
+
+        artifact = write_skill_spec(
+            conn,
+            name=name,
+            description=description,
+            io_schema=io_schema_json,
+            side_effect_class=side_effect_class.value,
+            required_secrets=secrets_json,
+            proposal_id=proposal.id,
+            output_dir=output_dir,
+        )
 
     return proposal, artifact
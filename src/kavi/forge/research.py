@@ -7,6 +7,8 @@ Two-layer research:
 
 from __future__ import annotations
 
+import difflib
+import io
 import re
 import sqlite3
 from dataclasses import dataclass, field
@@ -21,9 +23,9 @@ from kavi.ledger.models import (
     BuildStatus,
     Verification,
     VerificationStatus,
-    get_artifacts_for_related,
+    count_failed_builds,
+    find_build_log_artifact,
     get_build,
-    get_builds_for_proposal,
     get_latest_verification,
 )
 
@@ -45,6 +47,19 @@ class FailureKind(StrEnum):
 
 _LOG_EXCERPT_MAX = 2000
 
+# Bounds on how much of a build log is read for classification. The head
+# covers the excerpt, exit code, and TIMEOUT marker; the tail covers the
+# diff-gate section, which build logs append after stdout/stderr.
+_LOG_READ_HEAD = 65_536
+_LOG_READ_TAIL = 16_384
+
+# Build-log patterns, compiled once. Callers guard each search with a plain
+# substring test so the common no-match case never enters the regex engine.
+_RE_VIOLATIONS = re.compile(r"Violations:\s*\[([^\]]*)\]")
+_RE_MISSING = re.compile(r"Required missing:\s*\[([^\]]*)\]")
+_RE_EXIT_CODE = re.compile(r"Exit code:\s*(\d+)")
+_RE_GATE_FAILED = re.compile(r"gate failed", re.IGNORECASE)
+
 
 @dataclass
 class FailureAnalysis:
@@ -93,15 +108,9 @@ def classify_failure(
                 attempt_number=build.attempt_number,
                 build_id=build.id,
             )
-        if not verification.pytest_ok:
-            facts.append("pytest failed")
-            return FailureAnalysis(
-                kind=FailureKind.VERIFY_TEST,
-                facts=facts,
-                log_excerpt=_extract_excerpt(build_log),
-                attempt_number=build.attempt_number,
-                build_id=build.id,
-            )
+        # Lint before tests: lint/type errors are usually the root cause of
+        # test failures, and fail-fast verification skips (and records as
+        # failed) mypy + pytest whenever ruff fails.
         if not verification.ruff_ok or not verification.mypy_ok:
             if not verification.ruff_ok:
                 facts.append("ruff check failed")
@@ -114,13 +123,22 @@ def classify_failure(
                 attempt_number=build.attempt_number,
                 build_id=build.id,
             )
+        if not verification.pytest_ok:
+            facts.append("pytest failed")
+            return FailureAnalysis(
+                kind=FailureKind.VERIFY_TEST,
+                facts=facts,
+                log_excerpt=_extract_excerpt(build_log),
+                attempt_number=build.attempt_number,
+                build_id=build.id,
+            )
 
     # Build-level failures
     if build.status == BuildStatus.FAILED:
         summary = build.summary or ""
 
         # Timeout
-        if "Timeout" in summary or "TIMEOUT" in build_log[:500]:
+        if "Timeout" in summary or build_log.find("TIMEOUT", 0, 500) != -1:
             facts.append(f"Build timed out: {summary}")
             return FailureAnalysis(
                 kind=FailureKind.TIMEOUT,
@@ -131,18 +149,16 @@ def classify_failure(
             )
 
         # Diff gate violation
-        if "Diff gate" in summary or "gate failed" in summary.lower():
+        if "Diff gate" in summary or _RE_GATE_FAILED.search(summary):
             # Extract violation details from build log
-            violations_match = re.search(
-                r"Violations:\s*\[([^\]]*)\]", build_log
-            )
-            if violations_match:
-                facts.append(f"Disallowed files: {violations_match.group(1)}")
-            missing_match = re.search(
-                r"Required missing:\s*\[([^\]]*)\]", build_log
-            )
-            if missing_match:
-                facts.append(f"Missing files: {missing_match.group(1)}")
+            if "Violations:" in build_log:
+                violations_match = _RE_VIOLATIONS.search(build_log)
+                if violations_match:
+                    facts.append(f"Disallowed files: {violations_match.group(1)}")
+            if "Required missing:" in build_log:
+                missing_match = _RE_MISSING.search(build_log)
+                if missing_match:
+                    facts.append(f"Missing files: {missing_match.group(1)}")
             facts.append(f"Gate summary: {summary}")
             return FailureAnalysis(
                 kind=FailureKind.GATE_VIOLATION,
@@ -154,9 +170,10 @@ def classify_failure(
 
         # Generic build error (non-zero exit, claude not found, etc.)
         facts.append(f"Build failed: {summary}")
-        exit_match = re.search(r"Exit code:\s*(\d+)", build_log)
-        if exit_match:
-            facts.append(f"Exit code: {exit_match.group(1)}")
+        if "Exit code:" in build_log:
+            exit_match = _RE_EXIT_CODE.search(build_log)
+            if exit_match:
+                facts.append(f"Exit code: {exit_match.group(1)}")
         return FailureAnalysis(
             kind=FailureKind.BUILD_ERROR,
             facts=facts,
@@ -178,13 +195,36 @@ def _find_build_log(
     conn: sqlite3.Connection, build: Build
 ) -> str:
     """Find and read the build log artifact for a build."""
-    artifacts = get_artifacts_for_related(conn, build.proposal_id)
-    for art in reversed(artifacts):
-        if art.kind == ArtifactKind.BUILD_LOG and build.id in art.path:
-            p = Path(art.path)
-            if p.exists():
-                return p.read_text(encoding="utf-8")
-    return ""
+    path = find_build_log_artifact(conn, build.proposal_id, build.id)
+    if path is None:
+        return ""
+    p = Path(path)
+    if not p.exists():
+        return ""
+    return _read_log_bounded(p)
+
+
+def _read_log_bounded(path: Path) -> str:
+    """Read a build log's head (and tail, if the log is large).
+
+    Peak memory stays O(_LOG_READ_HEAD + _LOG_READ_TAIL) regardless of log
+    size. A multi-byte character split at a boundary decodes as U+FFFD.
+    """
+    with path.open("rb") as f:
+        head = f.read(_LOG_READ_HEAD)
+        if len(head) < _LOG_READ_HEAD:
+            return head.decode("utf-8", errors="replace")
+        size = f.seek(0, 2)
+        if size <= _LOG_READ_HEAD + _LOG_READ_TAIL:
+            f.seek(_LOG_READ_HEAD)
+            return (head + f.read()).decode("utf-8", errors="replace")
+        f.seek(size - _LOG_READ_TAIL)
+        tail = f.read()
+    return (
+        head.decode("utf-8", errors="replace")
+        + "\n... (truncated)\n"
+        + tail.decode("utf-8", errors="replace")
+    )
 
 
 def research_skill(
@@ -216,25 +256,25 @@ def research_skill(
     build_log = _find_build_log(conn, build)
     analysis = classify_failure(build, build_log, verification)
 
-    # Format research note content
-    lines = [
-        f"# Research Note: Build {build_id}\n",
-        f"## Failure Classification: {analysis.kind.value}\n",
-        f"**Attempt:** {analysis.attempt_number}",
-        f"**Build ID:** {analysis.build_id}\n",
-        "## Facts",
-    ]
+    # Format research note content into a single buffer
+    buf = io.StringIO()
+    buf.write(
+        f"# Research Note: Build {build_id}\n\n"
+        f"## Failure Classification: {analysis.kind.value}\n\n"
+        f"**Attempt:** {analysis.attempt_number}\n"
+        f"**Build ID:** {analysis.build_id}\n\n"
+        "## Facts\n"
+    )
     for fact in analysis.facts:
-        lines.append(f"- {fact}")
+        buf.write(f"- {fact}\n")
 
     if user_hint:
-        lines.append(f"\n## User Hint\n{user_hint}")
+        buf.write(f"\n## User Hint\n{user_hint}\n")
 
     if analysis.log_excerpt:
-        lines.append("\n## Log Excerpt")
-        lines.append(f"```\n{analysis.log_excerpt}\n```")
+        buf.write(f"\n## Log Excerpt\n```\n{analysis.log_excerpt}\n```\n")
 
-    content = "\n".join(lines) + "\n"
+    content = buf.getvalue()
 
     artifact = write_artifact(
         conn,
@@ -252,6 +292,11 @@ def research_skill(
 # ---------------------------------------------------------------------------
 
 
+# Keywords whose first appearance in a proposed packet signals a wider
+# side_effect_class or new secrets.
+_RE_ESCALATING = re.compile(r"network|money|messaging|secret", re.IGNORECASE)
+
+
 class EscalationTrigger(StrEnum):
     REPEATED_FAILURE = "REPEATED_FAILURE"
     PERMISSION_WIDENING = "PERMISSION_WIDENING"
@@ -260,22 +305,16 @@ class EscalationTrigger(StrEnum):
     AMBIGUOUS = "AMBIGUOUS"
 
 
-def _check_escalation_triggers(
-    conn: sqlite3.Connection,
-    *,
-    analysis: FailureAnalysis,
-    original_packet: str,
-    proposed_packet: str,
+def _check_pre_llm_triggers(
+    conn: sqlite3.Connection, analysis: FailureAnalysis,
 ) -> list[EscalationTrigger]:
-    """Check if any escalation triggers fire."""
+    """Triggers decidable from the analysis and ledger alone (no packet diff)."""
     triggers: list[EscalationTrigger] = []
 
     # Repeated same failure kind (>= 3 consecutive)
     build = get_build(conn, analysis.build_id)
     if build is not None:
-        prior_builds = get_builds_for_proposal(conn, build.proposal_id)
-        failed_builds = [b for b in prior_builds if b.status == BuildStatus.FAILED]
-        if len(failed_builds) >= 3:
+        if count_failed_builds(conn, build.proposal_id) >= 3:
             # Check if the last 3 all have RESEARCH_NOTEs with same kind
             # (simplified: just check count of consecutive failures)
             triggers.append(EscalationTrigger.REPEATED_FAILURE)
@@ -284,25 +323,6 @@ def _check_escalation_triggers(
     if analysis.kind in (FailureKind.VERIFY_POLICY, FailureKind.VERIFY_INVARIANT):
         triggers.append(EscalationTrigger.SECURITY_CLASS)
 
-    # Permission widening — check for wider side_effect_class or new secrets
-    orig_lower = original_packet.lower()
-    prop_lower = proposed_packet.lower()
-    escalating_keywords = ["network", "money", "messaging", "secret"]
-    for kw in escalating_keywords:
-        if kw in prop_lower and kw not in orig_lower:
-            triggers.append(EscalationTrigger.PERMISSION_WIDENING)
-            break
-
-    # Large diff
-    orig_lines = original_packet.splitlines()
-    prop_lines = proposed_packet.splitlines()
-    if orig_lines:
-        changed = sum(1 for a, b in zip(orig_lines, prop_lines) if a != b)
-        added = abs(len(prop_lines) - len(orig_lines))
-        diff_ratio = (changed + added) / max(len(orig_lines), 1)
-        if diff_ratio > 0.5:
-            triggers.append(EscalationTrigger.LARGE_DIFF)
-
     # Ambiguity
     if analysis.kind == FailureKind.UNKNOWN:
         triggers.append(EscalationTrigger.AMBIGUOUS)
@@ -310,6 +330,49 @@ def _check_escalation_triggers(
     return triggers
 
 
+def _check_post_llm_triggers(
+    original_packet: str, proposed_packet: str,
+) -> list[EscalationTrigger]:
+    """Triggers that depend on the proposed packet."""
+    triggers: list[EscalationTrigger] = []
+
+    # Permission widening — check for wider side_effect_class or new secrets
+    orig_hits = {m.lower() for m in _RE_ESCALATING.findall(original_packet)}
+    prop_hits = {m.lower() for m in _RE_ESCALATING.findall(proposed_packet)}
+    if prop_hits - orig_hits:
+        triggers.append(EscalationTrigger.PERMISSION_WIDENING)
+
+    # Large diff — changed or removed original lines plus net growth, over
+    # the original's length. quick_ratio counts lines common to both
+    # packets in one hashing pass (no per-line Python loop); it is scaled
+    # by the combined length, so the matched count is recovered from it.
+    if original_packet and original_packet != proposed_packet:
+        orig_lines = original_packet.splitlines()
+        prop_lines = proposed_packet.splitlines()
+        if orig_lines:
+            matcher = difflib.SequenceMatcher(None, orig_lines, prop_lines, autojunk=False)
+            matched = round(matcher.quick_ratio() * (len(orig_lines) + len(prop_lines)) / 2)
+            unmatched = max(len(orig_lines), len(prop_lines)) - matched
+            if unmatched / len(orig_lines) > 0.5:
+                triggers.append(EscalationTrigger.LARGE_DIFF)
+
+    return triggers
+
+
+def _check_escalation_triggers(
+    conn: sqlite3.Connection,
+    *,
+    analysis: FailureAnalysis,
+    original_packet: str,
+    proposed_packet: str,
+) -> list[EscalationTrigger]:
+    """Check if any escalation triggers fire."""
+    return (
+        _check_pre_llm_triggers(conn, analysis)
+        + _check_post_llm_triggers(original_packet, proposed_packet)
+    )
+
+
 def _format_advisory_messages(
     analysis: FailureAnalysis, original_packet: str,
 ) -> list[dict[str, str]]:
@@ -351,8 +414,22 @@ def advise_retry(
     Returns (proposed_packet_content, escalation_triggers).
     If escalation_triggers is non-empty, human review required.
     Falls back to deterministic-only (original packet + AMBIGUOUS) if Spark unavailable.
+
+    With ``auto=True``, triggers that are already known before the LLM call
+    (repeated failure, security class, ambiguity) short-circuit: the original
+    packet is returned with those triggers and Sparkstation is not contacted,
+    since human review is required regardless of what the LLM proposes.
     """
-    from kavi.llm.spark import SparkUnavailableError, generate, is_available
+    from kavi.llm.spark import (
+        NearMatchResponse,
+        SparkUnavailableError,
+        generate,
+        is_available,
+    )
+
+    pre_triggers = _check_pre_llm_triggers(conn, analysis)
+    if auto and pre_triggers:
+        return original_packet, pre_triggers
 
     if not is_available():
         return original_packet, [EscalationTrigger.AMBIGUOUS]
@@ -363,11 +440,9 @@ def advise_retry(
     except SparkUnavailableError:
         return original_packet, [EscalationTrigger.AMBIGUOUS]
 
-    triggers = _check_escalation_triggers(
-        conn,
-        analysis=analysis,
-        original_packet=original_packet,
-        proposed_packet=proposed,
-    )
+    triggers = pre_triggers + _check_post_llm_triggers(original_packet, proposed)
+    # Reused from a similar failure's prompt, not written for this one
+    if isinstance(proposed, NearMatchResponse) and EscalationTrigger.AMBIGUOUS not in triggers:
+        triggers.append(EscalationTrigger.AMBIGUOUS)
 
     return proposed, triggers
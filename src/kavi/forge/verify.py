@@ -4,13 +4,17 @@ from __future__ import annotations
 
 import sqlite3
 import subprocess
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from typing import Protocol
 
 from kavi.artifacts.writer import write_verification_report
 from kavi.forge.invariants import check_invariants
 from kavi.forge.paths import skill_file_path
+from kavi.ledger.db import transaction
 from kavi.ledger.models import (
     Artifact,
     ProposalStatus,
@@ -74,7 +78,9 @@ class SubprocessRunner:
         return self._run(["pytest", "-q", "--tb=short"], cwd=cwd)
 
     def run_policy_scan(self, skill_file: Path, policy: Policy) -> CheckResult:
-        violations = scan_file(skill_file, policy)
+        # Never trust a cached verdict here: the skill under review runs its
+        # own tests in the project tree while this scan runs.
+        violations = scan_file(skill_file, policy, use_cache=False)
         scan_result = ScanResult(violations=violations, files_scanned=1)
         detail = format_report(scan_result) if not scan_result.ok else ""
         return CheckResult(ok=scan_result.ok, detail=detail)
@@ -100,6 +106,31 @@ _default_runner = SubprocessRunner()
 
 # --- Core verify function ---
 
+_SKIPPED_DETAIL = "skipped (ruff failed)"
+
+
+def _run_concurrently(
+    checks: dict[str, Callable[[], CheckResult]],
+) -> dict[str, CheckResult]:
+    """Run independent checks in a thread pool and collect results by name.
+
+    The subprocess checks spend their time waiting on child processes, so
+    wall time is bounded by the slowest check rather than the sum.
+    """
+    if not checks:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        futures = {name: pool.submit(fn) for name, fn in checks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _verdict(result: CheckResult) -> str:
+    if result.ok:
+        return "PASS"
+    if result.detail == _SKIPPED_DETAIL:
+        return "SKIP (ruff failed)"
+    return "FAIL"
+
 
 def verify_skill(
     conn: sqlite3.Connection,
@@ -109,17 +140,24 @@ def verify_skill(
     output_dir: Path,
     project_root: Path,
     runner: ToolRunner | None = None,
+    fail_fast: bool = False,
 ) -> tuple[Verification, Artifact]:
     """Run all verification checks on a skill and record results.
 
     The skill file is derived from the proposal name using convention:
     ``src/kavi/skills/{name}.py``
 
-    Checks (via runner):
+    Checks (via runner, run concurrently):
     1. ruff (linting)
     2. mypy (type checking)
     3. pytest (unit tests)
     4. Policy scanner (forbidden patterns)
+    5. Invariant checks (structural contract)
+
+    With ``fail_fast=True``, ruff runs first (alongside the cheap AST-based
+    policy and invariant scans, which are never skipped); if ruff fails,
+    mypy and pytest are skipped and recorded as failed, since the skill
+    cannot reach VERIFIED anyway.
 
     Pass a custom ToolRunner to override tool execution (e.g. for testing).
     """
@@ -132,17 +170,37 @@ def verify_skill(
 
     skill_file = skill_file_path(proposal.name, project_root)
 
-    # Run checks
-    ruff_result = runner.run_ruff(skill_file, project_root)
-    mypy_result = runner.run_mypy(skill_file, project_root)
-    pytest_result = runner.run_pytest(project_root)
-    policy_result = runner.run_policy_scan(skill_file, policy)
-    invariant_result = runner.run_invariant_check(
-        skill_file,
-        expected_side_effect=proposal.side_effect_class.value,
-        proposal_name=proposal.name,
-        project_root=project_root,
-    )
+    checks: dict[str, Callable[[], CheckResult]] = {
+        "ruff": partial(runner.run_ruff, skill_file, project_root),
+        "mypy": partial(runner.run_mypy, skill_file, project_root),
+        "pytest": partial(runner.run_pytest, project_root),
+        "policy": partial(runner.run_policy_scan, skill_file, policy),
+        "invariants": partial(
+            runner.run_invariant_check,
+            skill_file,
+            expected_side_effect=proposal.side_effect_class.value,
+            proposal_name=proposal.name,
+            project_root=project_root,
+        ),
+    }
+
+    results: dict[str, CheckResult] = {}
+    if fail_fast:
+        expensive = {name: checks.pop(name) for name in ("mypy", "pytest")}
+        results.update(_run_concurrently(checks))
+        if results["ruff"].ok:
+            results.update(_run_concurrently(expensive))
+        else:
+            skipped = CheckResult(ok=False, detail=_SKIPPED_DETAIL)
+            results.update(dict.fromkeys(expensive, skipped))
+    else:
+        results.update(_run_concurrently(checks))
+
+    ruff_result = results["ruff"]
+    mypy_result = results["mypy"]
+    pytest_result = results["pytest"]
+    policy_result = results["policy"]
+    invariant_result = results["invariants"]
 
     ruff_ok = ruff_result.ok
     mypy_ok = mypy_result.ok
@@ -158,11 +216,11 @@ def verify_skill(
         "# Verification Report\n",
         f"Proposal: {proposal_id} ({proposal.name})\n",
         "## Results\n",
-        f"- ruff: {'PASS' if ruff_ok else 'FAIL'}",
-        f"- mypy: {'PASS' if mypy_ok else 'FAIL'}",
-        f"- pytest: {'PASS' if pytest_ok else 'FAIL'}",
-        f"- policy: {'PASS' if policy_ok else 'FAIL'}",
-        f"- invariants: {'PASS' if invariant_ok else 'FAIL'}",
+        f"- ruff: {_verdict(ruff_result)}",
+        f"- mypy: {_verdict(mypy_result)}",
+        f"- pytest: {_verdict(pytest_result)}",
+        f"- policy: {_verdict(policy_result)}",
+        f"- invariants: {_verdict(invariant_result)}",
         f"\n## Overall: {'PASSED' if all_ok else 'FAILED'}\n",
     ]
 
@@ -176,26 +234,26 @@ def verify_skill(
 
     report_content = "\n".join(report_lines)
 
-    # Write report artifact
-    artifact = write_verification_report(
-        conn, content=report_content, proposal_id=proposal_id, output_dir=output_dir,
-    )
-
-    # Record verification
-    verification = Verification(
-        proposal_id=proposal_id,
-        status=status,
-        ruff_ok=ruff_ok,
-        mypy_ok=mypy_ok,
-        pytest_ok=pytest_ok,
-        policy_ok=policy_ok,
-        invariant_ok=invariant_ok,
-        report_path=artifact.path,
-    )
-    insert_verification(conn, verification)
-
-    # Update proposal status
-    if all_ok:
-        update_proposal_status(conn, proposal_id, ProposalStatus.VERIFIED)
+    # Report artifact, verification record, and status change share one commit
+    with transaction(conn):
+        artifact = write_verification_report(
+            conn, content=report_content, proposal_id=proposal_id,
+            output_dir=output_dir,
+        )
+
+        verification = Verification(
+            proposal_id=proposal_id,
+            status=status,
+            ruff_ok=ruff_ok,
+            mypy_ok=mypy_ok,
+            pytest_ok=pytest_ok,
+            policy_ok=policy_ok,
+            invariant_ok=invariant_ok,
+            report_path=artifact.path,
+        )
+        insert_verification(conn, verification)
+
+        if all_ok:
+            update_proposal_status(conn, proposal_id, ProposalStatus.VERIFIED)
 
     return verification, artifact
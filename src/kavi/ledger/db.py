@@ -1,9 +1,11 @@
 """Database connection and schema management."""
 
 import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
-SCHEMA_VERSION = 5
+SCHEMA_VERSION = 9
 
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS skill_proposals (
@@ -36,6 +38,9 @@ CREATE TABLE IF NOT EXISTS builds (
     parent_build_id TEXT REFERENCES builds(id)
 );
 
+-- verifications and promotions stay rowid tables: they are read by
+-- proposal_id (a secondary index either way), get_latest_verification
+-- orders by rowid, and WITHOUT ROWID would cluster rows on the random id.
 CREATE TABLE IF NOT EXISTS verifications (
     id TEXT PRIMARY KEY,
     proposal_id TEXT NOT NULL REFERENCES skill_proposals(id),
@@ -70,21 +75,112 @@ CREATE TABLE IF NOT EXISTS artifacts (
     related_id TEXT
 );
 
-CREATE TABLE IF NOT EXISTS schema_version (
-    version INTEGER NOT NULL
-);
+CREATE INDEX IF NOT EXISTS idx_builds_proposal_status
+    ON builds(proposal_id, status);
+CREATE INDEX IF NOT EXISTS idx_verifications_proposal
+    ON verifications(proposal_id);
+CREATE INDEX IF NOT EXISTS idx_artifacts_related_kind
+    ON artifacts(related_id, kind);
+CREATE INDEX IF NOT EXISTS idx_proposals_status_created
+    ON skill_proposals(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_builds_proposal_started
+    ON builds(proposal_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_artifacts_related_created
+    ON artifacts(related_id, created_at);
 """
 
 
-def get_connection(db_path: Path) -> sqlite3.Connection:
-    """Get a SQLite connection with WAL mode and foreign keys enabled."""
-    conn = sqlite3.connect(str(db_path))
+class LedgerConnection(sqlite3.Connection):
+    """SQLite connection that tracks its own transaction() nesting depth.
+
+    Ledger write helpers defer their commit while ``batch_depth`` is
+    non-zero. The counter lives on the connection, which sqlite3 confines
+    to the thread that created it, so it needs no lock.
+    """
+
+    batch_depth = 0
+
+
+def get_connection(db_path: Path, *, safe_mode: bool = False) -> sqlite3.Connection:
+    """Get a SQLite connection with WAL mode and foreign keys enabled.
+
+    By default uses ``synchronous=NORMAL``: under WAL this fsyncs once per
+    checkpoint rather than once per commit, and can only lose the most
+    recent commits on power loss (never corrupt). Pass ``safe_mode=True``
+    to keep ``synchronous=FULL`` when every commit must be durable.
+    """
+    conn = sqlite3.connect(str(db_path), factory=LedgerConnection)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute(f"PRAGMA synchronous={'FULL' if safe_mode else 'NORMAL'}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    conn.execute("PRAGMA busy_timeout=5000")
     return conn
 
 
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Group several ledger writes into a single commit.
+
+    Write helpers in ``kavi.ledger.models`` normally commit after each
+    statement; inside this block they defer to one commit on exit (or a
+    rollback if the block raises). Nested blocks join the outer one.
+
+    The outermost block opens with ``BEGIN IMMEDIATE`` so the write lock is
+    taken up front (waiting up to ``busy_timeout``) instead of failing with
+    SQLITE_BUSY when a deferred read transaction later tries to write.
+
+    ``conn`` must come from get_connection() or init_db().
+    """
+    if not isinstance(conn, LedgerConnection):
+        raise TypeError("transaction() needs a connection from get_connection()")
+    if conn.batch_depth:
+        conn.batch_depth += 1
+        try:
+            yield conn
+        finally:
+            conn.batch_depth -= 1
+        return
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    conn.batch_depth = 1
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        conn.batch_depth = 0
+
+
+def commit(conn: sqlite3.Connection) -> None:
+    """Commit now, unless conn is inside a transaction() block."""
+    if not getattr(conn, "batch_depth", 0):
+        conn.commit()
+
+
+def optimize(conn: sqlite3.Connection) -> None:
+    """Refresh planner statistics where SQLite thinks they are stale.
+
+    Cheap when nothing changed. Long-lived processes can call this
+    periodically; short-lived ones get it from close().
+    """
+    conn.execute("PRAGMA optimize")
+
+
+def close(conn: sqlite3.Connection) -> None:
+    """Run PRAGMA optimize, then close the connection."""
+    try:
+        optimize(conn)
+    finally:
+        conn.close()
+
+
 MIGRATIONS: dict[int, list[str]] = {
     2: [
         "ALTER TABLE verifications ADD COLUMN invariant_ok INTEGER NOT NULL DEFAULT 0",
@@ -149,10 +245,49 @@ MIGRATIONS: dict[int, list[str]] = {
         "DROP TABLE skill_proposals",
         "ALTER TABLE skill_proposals_new RENAME TO skill_proposals",
     ],
+    6: [
+        # Indexes for per-proposal lookups (research, escalation, verify)
+        """CREATE INDEX IF NOT EXISTS idx_builds_proposal_status
+            ON builds(proposal_id, status)""",
+        """CREATE INDEX IF NOT EXISTS idx_verifications_proposal_created
+            ON verifications(proposal_id, created_at DESC)""",
+        """CREATE INDEX IF NOT EXISTS idx_artifacts_related_kind
+            ON artifacts(related_id, kind)""",
+    ],
+    7: [
+        # Schema version now lives in PRAGMA user_version
+        "DROP TABLE IF EXISTS schema_version",
+    ],
+    8: [
+        # Indexes matching the ORDER BY of list queries (no temp b-tree sort)
+        """CREATE INDEX IF NOT EXISTS idx_proposals_status_created
+            ON skill_proposals(status, created_at)""",
+        """CREATE INDEX IF NOT EXISTS idx_builds_proposal_started
+            ON builds(proposal_id, started_at)""",
+        """CREATE INDEX IF NOT EXISTS idx_artifacts_related_created
+            ON artifacts(related_id, created_at)""",
+    ],
+    9: [
+        # Latest verification is found by rowid (insert order). An index on
+        # proposal_id alone carries rowid as its implicit last column, so
+        # ORDER BY rowid DESC LIMIT 1 walks it backwards with no sort.
+        "DROP INDEX IF EXISTS idx_verifications_proposal_created",
+        """CREATE INDEX IF NOT EXISTS idx_verifications_proposal
+            ON verifications(proposal_id)""",
+    ],
 }
 
 
 def _get_schema_version(conn: sqlite3.Connection) -> int:
+    version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+    if version:
+        return version
+    # Ledgers before v7 tracked the version in a schema_version table
+    cursor = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'"
+    )
+    if cursor.fetchone() is None:
+        return 0
     row = conn.execute("SELECT version FROM schema_version").fetchone()
     return int(row["version"]) if row else 0
 
@@ -161,32 +296,51 @@ def _run_migrations(conn: sqlite3.Connection, current: int) -> None:
     # Temporarily disable FK checks — table recreates (e.g. migration 5)
     # drop referenced tables. PRAGMA must run outside a transaction.
     conn.execute("PRAGMA foreign_keys=OFF")
-    for version in sorted(MIGRATIONS):
-        if version > current:
-            for sql in MIGRATIONS[version]:
-                conn.execute(sql)
-            conn.execute(
-                "UPDATE schema_version SET version = ?", (version,),
+    try:
+        for version in sorted(MIGRATIONS):
+            if version <= current:
+                continue
+            # Each version runs as one script in its own transaction; a failing
+            # statement leaves the ledger at the previous version.
+            # (PRAGMA values cannot be bound as parameters.)
+            script = ";\n".join(
+                ["BEGIN", *MIGRATIONS[version], f"PRAGMA user_version = {int(version)}"]
             )
-    conn.commit()
-    conn.execute("PRAGMA foreign_keys=ON")
+            try:
+                conn.executescript(script + ";\nCOMMIT;")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+    finally:
+        conn.execute("PRAGMA foreign_keys=ON")
 
 
-def init_db(db_path: Path) -> sqlite3.Connection:
-    """Initialize database with schema. Idempotent."""
-    conn = get_connection(db_path)
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create or migrate the schema on an open connection. Idempotent.
 
-    # Check if schema is already initialized
-    cursor = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'"
-    )
-    if cursor.fetchone() is not None:
-        current = _get_schema_version(conn)
+    For an up-to-date ledger this is a single ``PRAGMA user_version`` read
+    from the file header; sqlite_master is only consulted when the version
+    is 0 (new file, or a pre-v7 ledger).
+    """
+    current = _get_schema_version(conn)
+    if current:
         if current < SCHEMA_VERSION:
             _run_migrations(conn, current)
-        return conn
+            optimize(conn)
+        return
 
     conn.executescript(SCHEMA_SQL)
-    conn.execute("INSERT INTO schema_version (version) VALUES (?)", (SCHEMA_VERSION,))
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
+
+
+def init_db(db_path: Path, *, safe_mode: bool = False) -> sqlite3.Connection:
+    """Open the ledger and ensure its schema is current. Idempotent."""
+    conn = get_connection(db_path, safe_mode=safe_mode)
+    try:
+        ensure_schema(conn)
+    except BaseException:
+        conn.close()
+        raise
     return conn
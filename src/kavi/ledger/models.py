@@ -3,13 +3,16 @@
 from __future__ import annotations
 
 import sqlite3
-import uuid
-from datetime import UTC, datetime
+import time
+from collections.abc import Iterator
 from enum import StrEnum
-from typing import Any
+from secrets import token_hex
+from typing import Any, NamedTuple
 
 from pydantic import BaseModel, Field
 
+from kavi.ledger.db import commit, transaction
+
 # --- Enums ---
 
 class SideEffectClass(StrEnum):
@@ -50,14 +53,24 @@ class ArtifactKind(StrEnum):
     RESEARCH_NOTE = "RESEARCH_NOTE"
 
 
+# StrEnum members are str subclasses; bind them as their text directly.
+for _enum in (
+    SideEffectClass, ProposalStatus, BuildStatus, VerificationStatus, ArtifactKind,
+):
+    sqlite3.register_adapter(_enum, str)
+del _enum
+
+
 # --- Pydantic Models ---
 
 def _new_id() -> str:
-    return uuid.uuid4().hex[:12]
+    # 48 random bits as 12 hex chars, same shape as uuid4().hex[:12]
+    return token_hex(6)
 
 
 def _now() -> str:
-    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # time.strftime on a struct_time skips building a datetime; ~3x faster.
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
 class SkillProposal(BaseModel):
@@ -71,6 +84,19 @@ class SkillProposal(BaseModel):
     created_at: str = Field(default_factory=_now)
 
 
+class ProposalRow(NamedTuple):
+    """Unvalidated proposal row for read-only listings (see list_proposals_rows)."""
+
+    id: str
+    name: str
+    description: str
+    io_schema_json: str
+    side_effect_class: str
+    required_secrets_json: str
+    status: str
+    created_at: str
+
+
 class Build(BaseModel):
     id: str = Field(default_factory=_new_id)
     proposal_id: str
@@ -116,27 +142,64 @@ class Artifact(BaseModel):
 
 # --- DB Operations ---
 
+# INSERT statements, whitespace-normalized. sqlite3 caches prepared
+# statements per connection keyed by SQL text (128 by default, more than
+# the ledger uses), so these are parsed once per connection.
+_SQL_INSERT_PROPOSAL = (
+    "INSERT INTO skill_proposals (id, name, description, io_schema_json,"
+    " side_effect_class, required_secrets_json, status, created_at)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_BUILD = (
+    "INSERT INTO builds (id, proposal_id, branch_name, started_at, finished_at,"
+    " status, summary, attempt_number, parent_build_id)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_VERIFICATION = (
+    "INSERT INTO verifications (id, proposal_id, status, ruff_ok, mypy_ok,"
+    " pytest_ok, policy_ok, invariant_ok, report_path, created_at)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_PROMOTION = (
+    "INSERT INTO promotions"
+    " (id, proposal_id, from_status, to_status, approved_by, created_at)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_ARTIFACT = (
+    "INSERT INTO artifacts (id, kind, path, sha256, created_at, related_id)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
 def _row_to_dict(row: sqlite3.Row) -> dict[str, Any]:
     return dict(row)
 
 
 def insert_proposal(conn: sqlite3.Connection, proposal: SkillProposal) -> SkillProposal:
-    conn.execute(
-        """INSERT INTO skill_proposals
-           (id, name, description, io_schema_json, side_effect_class,
-            required_secrets_json, status, created_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            proposal.id, proposal.name, proposal.description,
-            proposal.io_schema_json, proposal.side_effect_class.value,
-            proposal.required_secrets_json, proposal.status.value,
-            proposal.created_at,
-        ),
-    )
-    conn.commit()
+    insert_proposals(conn, [proposal])
     return proposal
 
 
+def insert_proposals(
+    conn: sqlite3.Connection, proposals: list[SkillProposal]
+) -> list[SkillProposal]:
+    """Insert several proposals with one prepared statement and one commit."""
+    with transaction(conn):
+        conn.executemany(
+            _SQL_INSERT_PROPOSAL,
+            [
+                (
+                    p.id, p.name, p.description,
+                    p.io_schema_json, p.side_effect_class,
+                    p.required_secrets_json, p.status,
+                    p.created_at,
+                )
+                for p in proposals
+            ],
+        )
+    return proposals
+
+
 def get_proposal(conn: sqlite3.Connection, proposal_id: str) -> SkillProposal | None:
     cursor = conn.execute("SELECT * FROM skill_proposals WHERE id = ?", (proposal_id,))
     row = cursor.fetchone()
@@ -150,40 +213,71 @@ def update_proposal_status(
 ) -> None:
     conn.execute(
         "UPDATE skill_proposals SET status = ? WHERE id = ?",
-        (status.value, proposal_id),
+        (status, proposal_id),
     )
-    conn.commit()
+    commit(conn)
 
 
 def list_proposals(
     conn: sqlite3.Connection, status: ProposalStatus | None = None
 ) -> list[SkillProposal]:
+    return list(iter_proposals(conn, status))
+
+
+def iter_proposals(
+    conn: sqlite3.Connection, status: ProposalStatus | None = None
+) -> Iterator[SkillProposal]:
+    """Yield proposals one row at a time instead of materializing the list."""
     if status is not None:
         cursor = conn.execute(
             "SELECT * FROM skill_proposals WHERE status = ? ORDER BY created_at",
-            (status.value,),
+            (status,),
         )
     else:
         cursor = conn.execute("SELECT * FROM skill_proposals ORDER BY created_at")
-    return [SkillProposal(**_row_to_dict(row)) for row in cursor.fetchall()]
+    for row in cursor:
+        yield SkillProposal(**_row_to_dict(row))
+
+
+def list_proposals_rows(
+    conn: sqlite3.Connection, status: ProposalStatus | None = None
+) -> list[ProposalRow]:
+    """Like list_proposals, but returns plain tuples without pydantic validation."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    columns = ", ".join(ProposalRow._fields)
+    if status is not None:
+        cursor.execute(
+            f"SELECT {columns} FROM skill_proposals WHERE status = ? ORDER BY created_at",
+            (status,),
+        )
+    else:
+        cursor.execute(f"SELECT {columns} FROM skill_proposals ORDER BY created_at")
+    return [ProposalRow._make(row) for row in cursor.fetchall()]
 
 
 def insert_build(conn: sqlite3.Connection, build: Build) -> Build:
-    conn.execute(
-        """INSERT INTO builds
-           (id, proposal_id, branch_name, started_at, finished_at, status, summary,
-            attempt_number, parent_build_id)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            build.id, build.proposal_id, build.branch_name,
-            build.started_at, build.finished_at, build.status.value,
-            build.summary, build.attempt_number, build.parent_build_id,
-        ),
-    )
-    conn.commit()
+    insert_builds(conn, [build])
     return build
 
 
+def insert_builds(conn: sqlite3.Connection, builds: list[Build]) -> list[Build]:
+    """Insert several builds with one prepared statement and one commit."""
+    with transaction(conn):
+        conn.executemany(
+            _SQL_INSERT_BUILD,
+            [
+                (
+                    b.id, b.proposal_id, b.branch_name,
+                    b.started_at, b.finished_at, b.status,
+                    b.summary, b.attempt_number, b.parent_build_id,
+                )
+                for b in builds
+            ],
+        )
+    return builds
+
+
 def update_build(
     conn: sqlite3.Connection, build_id: str, *,
     status: BuildStatus | None = None,
@@ -194,7 +288,7 @@ def update_build(
     params: list[Any] = []
     if status is not None:
         updates.append("status = ?")
-        params.append(status.value)
+        params.append(status)
     if finished_at is not None:
         updates.append("finished_at = ?")
         params.append(finished_at)
@@ -205,7 +299,7 @@ def update_build(
         return
     params.append(build_id)
     conn.execute(f"UPDATE builds SET {', '.join(updates)} WHERE id = ?", params)
-    conn.commit()
+    commit(conn)
 
 
 def get_build(conn: sqlite3.Connection, build_id: str) -> Build | None:
@@ -217,25 +311,38 @@ def get_build(conn: sqlite3.Connection, build_id: str) -> Build | None:
 
 
 def get_builds_for_proposal(conn: sqlite3.Connection, proposal_id: str) -> list[Build]:
+    return list(iter_builds_for_proposal(conn, proposal_id))
+
+
+def iter_builds_for_proposal(
+    conn: sqlite3.Connection, proposal_id: str
+) -> Iterator[Build]:
+    """Yield a proposal's builds one row at a time, oldest first."""
     cursor = conn.execute(
         "SELECT * FROM builds WHERE proposal_id = ? ORDER BY started_at", (proposal_id,)
     )
-    return [Build(**_row_to_dict(row)) for row in cursor.fetchall()]
+    for row in cursor:
+        yield Build(**_row_to_dict(row))
+
+
+def count_failed_builds(conn: sqlite3.Connection, proposal_id: str) -> int:
+    row = conn.execute(
+        "SELECT COUNT(*) FROM builds WHERE proposal_id = ? AND status = ?",
+        (proposal_id, BuildStatus.FAILED),
+    ).fetchone()
+    return int(row[0])
 
 
 def insert_verification(conn: sqlite3.Connection, v: Verification) -> Verification:
     conn.execute(
-        """INSERT INTO verifications
-           (id, proposal_id, status, ruff_ok, mypy_ok, pytest_ok, policy_ok,
-            invariant_ok, report_path, created_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        _SQL_INSERT_VERIFICATION,
         (
-            v.id, v.proposal_id, v.status.value,
+            v.id, v.proposal_id, v.status,
             int(v.ruff_ok), int(v.mypy_ok), int(v.pytest_ok), int(v.policy_ok),
             int(v.invariant_ok), v.report_path, v.created_at,
         ),
     )
-    conn.commit()
+    commit(conn)
     return v
 
 
@@ -244,7 +351,7 @@ def get_latest_verification(
 ) -> Verification | None:
     cursor = conn.execute(
         "SELECT * FROM verifications WHERE proposal_id = ?"
-        " ORDER BY created_at DESC, rowid DESC LIMIT 1",
+        " ORDER BY rowid DESC LIMIT 1",
         (proposal_id,),
     )
     row = cursor.fetchone()
@@ -255,37 +362,62 @@ def get_latest_verification(
 
 def insert_promotion(conn: sqlite3.Connection, promo: Promotion) -> Promotion:
     conn.execute(
-        """INSERT INTO promotions
-           (id, proposal_id, from_status, to_status, approved_by, created_at)
-           VALUES (?, ?, ?, ?, ?, ?)""",
+        _SQL_INSERT_PROMOTION,
         (
             promo.id, promo.proposal_id, promo.from_status,
             promo.to_status, promo.approved_by, promo.created_at,
         ),
     )
-    conn.commit()
+    commit(conn)
     return promo
 
 
 def insert_artifact(conn: sqlite3.Connection, artifact: Artifact) -> Artifact:
-    conn.execute(
-        """INSERT INTO artifacts
-           (id, kind, path, sha256, created_at, related_id)
-           VALUES (?, ?, ?, ?, ?, ?)""",
-        (
-            artifact.id, artifact.kind.value, artifact.path,
-            artifact.sha256, artifact.created_at, artifact.related_id,
-        ),
-    )
-    conn.commit()
+    insert_artifacts(conn, [artifact])
     return artifact
 
 
+def insert_artifacts(
+    conn: sqlite3.Connection, artifacts: list[Artifact]
+) -> list[Artifact]:
+    """Insert several artifacts with one prepared statement and one commit."""
+    with transaction(conn):
+        conn.executemany(
+            _SQL_INSERT_ARTIFACT,
+            [
+                (a.id, a.kind, a.path, a.sha256, a.created_at, a.related_id)
+                for a in artifacts
+            ],
+        )
+    return artifacts
+
+
 def get_artifacts_for_related(
     conn: sqlite3.Connection, related_id: str
 ) -> list[Artifact]:
+    return list(iter_artifacts_for_related(conn, related_id))
+
+
+def iter_artifacts_for_related(
+    conn: sqlite3.Connection, related_id: str
+) -> Iterator[Artifact]:
+    """Yield artifacts for related_id one row at a time, oldest first."""
     cursor = conn.execute(
         "SELECT * FROM artifacts WHERE related_id = ? ORDER BY created_at",
         (related_id,),
     )
-    return [Artifact(**_row_to_dict(row)) for row in cursor.fetchall()]
+    for row in cursor:
+        yield Artifact(**_row_to_dict(row))
+
+
+def find_build_log_artifact(
+    conn: sqlite3.Connection, proposal_id: str, build_id: str
+) -> str | None:
+    """Return the path of the newest BUILD_LOG artifact for a build, if any."""
+    row = conn.execute(
+        "SELECT path FROM artifacts"
+        " WHERE related_id = ? AND kind = ? AND instr(path, ?) > 0"
+        " ORDER BY created_at DESC, rowid DESC LIMIT 1",
+        (proposal_id, ArtifactKind.BUILD_LOG, build_id),
+    ).fetchone()
+    return row[0] if row else None
@@ -6,18 +6,50 @@ D019: generate() takes messages: list[dict] (role-separated).
 
 from __future__ import annotations
 
-from typing import Any, NamedTuple
-
-from openai import OpenAI
+import atexit
+import hashlib
+import json
+import logging
+import math
+import socket
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+from urllib.parse import urlsplit
 
 from kavi.config import (
     SPARK_BASE_URL,
+    SPARK_EMBED_CACHE_DB,
+    SPARK_EMBED_CACHE_MAX_ROWS,
+    SPARK_EMBED_CACHE_TTL,
     SPARK_EMBED_MODEL,
     SPARK_MAX_PROMPT_CHARS,
     SPARK_MODEL,
+    SPARK_SEMANTIC_CACHE,
+    SPARK_SEMANTIC_CACHE_THRESHOLD,
     SPARK_TIMEOUT,
 )
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+def __getattr__(name: str) -> Any:
+    # openai (and httpx under it) costs over half a second to import, so it
+    # is loaded on first client creation rather than with this module.
+    if name == "OpenAI":
+        from openai import OpenAI
+
+        globals()["OpenAI"] = OpenAI
+        return OpenAI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class SparkError(Exception):
     """Base error for Sparkstation operations."""
@@ -27,6 +59,13 @@ class SparkUnavailableError(SparkError):
     """Sparkstation gateway is unreachable or not responding."""
 
 
+class _BatchUnsupportedError(SparkError):
+    """The gateway does not serve the Files/Batch endpoints."""
+
+
+_log = logging.getLogger(__name__)
+
+
 class ToolCallResult(NamedTuple):
     """Structured result from a tool-call completion."""
 
@@ -35,11 +74,82 @@ class ToolCallResult(NamedTuple):
     call_id: str = ""
 
 
+# One client per gateway URL. Each client owns an HTTP connection pool, so
+# reusing it keeps connections alive across calls instead of reconnecting.
+# Timeouts are passed per request, so one client serves every caller.
+_clients: dict[str, OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+@atexit.register
+def _close_clients() -> None:
+    """Close pooled connections at interpreter exit."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+# The SDK default drops idle connections after 5s, shorter than a typical
+# pause between agent turns, so nearly every call would reconnect.
+_KEEPALIVE_EXPIRY = 60.0  # seconds
+_MAX_KEEPALIVE_CONNECTIONS = 16
+
+
+def _http_client() -> Any:
+    """Build the SDK's HTTP client with a longer keep-alive window."""
+    from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient
+
+    limits = type(DEFAULT_CONNECTION_LIMITS)(
+        max_connections=DEFAULT_CONNECTION_LIMITS.max_connections,
+        max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=_KEEPALIVE_EXPIRY,
+    )
+    return DefaultHttpxClient(limits=limits)
+
+
+def _get_client(base_url: str) -> OpenAI:
+    """Return the shared client for base_url, creating it on first use."""
+    client = _clients.get(base_url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(base_url)
+            if client is None:
+                openai_cls = globals().get("OpenAI") or __getattr__("OpenAI")
+                client = openai_cls(
+                    api_key="dummy-key", base_url=base_url, http_client=_http_client(),
+                )
+                _clients[base_url] = client
+    return client
+
+
+@lru_cache(maxsize=8)
+def _host_port(base_url: str) -> tuple[str, int]:
+    parts = urlsplit(base_url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return parts.hostname or "localhost", port
+
+
+def _tcp_reachable(base_url: str, timeout: float) -> bool:
+    """Return True if a TCP connection to base_url's host:port succeeds."""
+    try:
+        with socket.create_connection(_host_port(base_url), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
 def is_available(base_url: str = SPARK_BASE_URL, timeout: float = 5) -> bool:
-    """Return True if Sparkstation responds to a model list request."""
+    """Return True if Sparkstation responds to a model list request.
+
+    A TCP probe runs first so a down gateway fails in one round trip,
+    without the SDK's connection retries and backoff.
+    """
+    if not _tcp_reachable(base_url, timeout):
+        return False
     try:
-        client = OpenAI(api_key="dummy-key", base_url=base_url, timeout=timeout)
-        client.models.list()
+        client = _get_client(base_url)
+        client.models.list(timeout=timeout)
         return True
     except Exception:
         return False
@@ -48,6 +158,8 @@ def is_available(base_url: str = SPARK_BASE_URL, timeout: float = 5) -> bool:
 def _content_len(msg: dict[str, Any]) -> int:
     """Return char length of a message's content (handles None)."""
     c = msg.get("content")
+    if isinstance(c, str):
+        return len(c)
     if c is None:
         return 0
     return len(str(c))
@@ -65,44 +177,119 @@ def _truncate_messages(
        assistant+tool_calls, tool, assistant = 3 messages together.
     3. Last resort: truncate the current user message.
     """
-    total = sum(_content_len(m) for m in messages)
+    lengths = [_content_len(m) for m in messages]
+    total = sum(lengths)
     if total <= max_chars:
         return messages
 
-    result = list(messages)
-
     # Identify protected indices: system (first if role=system) and last message
-    first_history = 1 if result and result[0].get("role") == "system" else 0
-
-    # Drop from oldest history until within budget or only protected remain
-    while sum(_content_len(m) for m in result) > max_chars:
-        if first_history >= len(result) - 1:
-            break  # only system + last message remain
-
-        msg = result[first_history]
+    first_history = 1 if messages and messages[0].get("role") == "system" else 0
+    last = len(messages) - 1
+
+    # Walk from oldest history, keeping a running total, until within budget
+    # or only protected remain; then drop the whole prefix with one slice.
+    cut = first_history
+    while total > max_chars and cut < last:
+        msg = messages[cut]
         # Tool-call group: assistant with tool_calls + tool + assistant = 3 msgs
         if msg.get("role") == "assistant" and msg.get("tool_calls"):
-            count = min(3, len(result) - first_history - 1)  # don't eat last
-            del result[first_history:first_history + count]
+            count = min(3, last - cut)  # don't eat last
         else:
-            del result[first_history]
+            count = 1
+        total -= sum(lengths[cut:cut + count])
+        cut += count
+
+    result = messages[:first_history] + messages[cut:]
 
     # Last resort: truncate the last user message
-    total = sum(_content_len(m) for m in result)
     if total > max_chars:
         overshoot = total - max_chars
         for i in range(len(result) - 1, -1, -1):
             if result[i].get("role") == "user":
                 content = str(result[i].get("content", ""))
-                if len(content) > overshoot:
-                    result[i] = {**result[i], "content": content[:-overshoot]}
-                else:
-                    result[i] = {**result[i], "content": ""}
+                keep = len(content) - overshoot
+                result[i] = {**result[i], "content": content[:keep] if keep > 0 else ""}
                 break
 
     return result
 
 
+# generate() responses for temperature-0 prompts, keyed by a hash of the
+# gateway, model and full message list, and holding (context hash,
+# unit-length embedding of the final user message or None, response). The
+# context hash covers everything but that final message, so a near match
+# needs the same gateway, model, system prompt and history.
+_semantic_cache_enabled = SPARK_SEMANTIC_CACHE
+_SEMANTIC_CACHE_MAX = 256
+_semantic_cache: OrderedDict[str, tuple[str, list[float] | None, str]] = OrderedDict()
+_semantic_cache_lock = threading.Lock()
+
+
+class NearMatchResponse(str):
+    """A generate() response reused from a similar, not identical, prompt.
+
+    Callers that persist results keyed by their own input should not store
+    these: the response was produced for a different final message.
+    """
+
+
+def _unit(vector: list[float]) -> list[float] | None:
+    norm = math.sqrt(math.fsum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else None
+
+
+def _semantic_hash(base_url: str, model: str, messages: list[dict[str, Any]]) -> str:
+    payload = json.dumps(messages, sort_keys=True, default=str)
+    return hashlib.sha256(f"{base_url}\0{model}\0{payload}".encode()).hexdigest()
+
+
+def _semantic_lookup(
+    messages: list[dict[str, Any]], model: str, base_url: str,
+) -> tuple[str, str, list[float] | None, str | None]:
+    """Return (key, context hash, query vector, cached response or None).
+
+    An exact repeat returns the cached str. Otherwise, if the final
+    message is from the user, it is embedded and compared only against
+    entries with the same context; a close one returns a NearMatchResponse.
+    """
+    key = _semantic_hash(base_url, model, messages)
+    context = _semantic_hash(base_url, model, messages[:-1])
+    with _semantic_cache_lock:
+        hit = _semantic_cache.get(key)
+        if hit is not None:
+            _semantic_cache.move_to_end(key)
+            return key, context, hit[1], hit[2]
+    last = messages[-1] if messages else None
+    if last is None or last.get("role") != "user" or not isinstance(last.get("content"), str):
+        return key, context, None, None
+    try:
+        vector = _unit(embed([last["content"]], base_url=base_url)[0])
+    except SparkError:
+        return key, context, None, None
+    if vector is None:
+        return key, context, None, None
+    best, best_response = SPARK_SEMANTIC_CACHE_THRESHOLD, None
+    with _semantic_cache_lock:
+        for cached_context, cached_vec, response in _semantic_cache.values():
+            if cached_context != context or cached_vec is None:
+                continue
+            score = math.fsum(a * b for a, b in zip(vector, cached_vec, strict=False))
+            if score >= best:
+                best, best_response = score, response
+    if best_response is None:
+        return key, context, vector, None
+    return key, context, vector, NearMatchResponse(best_response)
+
+
+def _semantic_store(
+    key: str, context: str, vector: list[float] | None, response: str,
+) -> None:
+    with _semantic_cache_lock:
+        _semantic_cache[key] = (context, vector, str(response))
+        while len(_semantic_cache) > _SEMANTIC_CACHE_MAX:
+            _semantic_cache.popitem(last=False)
+
+
 def generate(
     messages: list[dict[str, Any]],
     *,
@@ -121,17 +308,34 @@ def generate(
         timeout: Request timeout in seconds.
         max_prompt_chars: Truncate last user message if total exceeds this.
 
+    With the semantic cache enabled (KAVI_SEMANTIC_CACHE=1), temperature-0
+    calls that repeat a previous prompt return its response without a chat
+    completion. A call whose final user message closely resembles a cached
+    one, with identical gateway, model and earlier messages, returns that
+    response as a NearMatchResponse.
+
     Raises SparkUnavailableError if the gateway is unreachable,
     SparkError on unexpected response issues.
     """
     messages = _truncate_messages(messages, max_prompt_chars)
 
+    cache_key: str | None = None
+    cache_context = ""
+    prompt_vec: list[float] | None = None
+    if _semantic_cache_enabled and temperature == 0:
+        cache_key, cache_context, prompt_vec, cached = _semantic_lookup(
+            messages, model, base_url,
+        )
+        if cached is not None:
+            return cached
+
     try:
-        client = OpenAI(api_key="dummy-key", base_url=base_url, timeout=timeout)
+        client = _get_client(base_url)
         response = client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
+            timeout=timeout,
         )
     except Exception as exc:
         raise SparkUnavailableError(f"Sparkstation unreachable: {exc}") from exc
@@ -140,6 +344,8 @@ def generate(
     if choice is None or choice.message.content is None:
         raise SparkError("Sparkstation returned empty response")
 
+    if cache_key is not None:
+        _semantic_store(cache_key, cache_context, prompt_vec, choice.message.content)
     return choice.message.content
 
 
@@ -159,18 +365,17 @@ def generate_tool_call(
     Raises SparkUnavailableError if the gateway is unreachable,
     SparkError if no tool call in response or response is malformed.
     """
-    import json
-
     messages = _truncate_messages(messages, max_prompt_chars)
 
     try:
-        client = OpenAI(api_key="dummy-key", base_url=base_url, timeout=timeout)
+        client = _get_client(base_url)
         response = client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
             tools=tools,
             tool_choice=tool_choice,
+            timeout=timeout,
         )
     except Exception as exc:
         raise SparkUnavailableError(f"Sparkstation unreachable: {exc}") from exc
@@ -185,38 +390,305 @@ def generate_tool_call(
         raise SparkError("Sparkstation returned no tool call")
 
     tc = tool_calls[0]
-    try:
-        args: dict[str, Any] = json.loads(tc.function.arguments)
-    except (json.JSONDecodeError, TypeError) as exc:
-        raise SparkError(f"Invalid tool call arguments: {exc}") from exc
+    raw_args = tc.function.arguments
+    if isinstance(raw_args, str) and not raw_args.strip():
+        args: Any = {}  # argument-less tools may send an empty string
+    else:
+        try:
+            args = json.loads(raw_args)
+        except (ValueError, TypeError) as exc:
+            raise SparkError(f"Invalid tool call arguments: {exc}") from exc
+    if not isinstance(args, dict):
+        raise SparkError(
+            f"Invalid tool call arguments: expected an object, got {type(args).__name__}"
+        )
 
     return ToolCallResult(name=tc.function.name, arguments=args, call_id=tc.id or "")
 
 
+# Recently returned vectors keyed by (base_url, model, text), oldest first.
+# Skill names and descriptions are re-embedded often; hits skip the network.
+_EMBED_CACHE_MAX = 4096
+_embed_cache: OrderedDict[tuple[str, str, str], list[float]] = OrderedDict()
+_embed_cache_lock = threading.Lock()
+
+
+# Second tier behind _embed_cache: vectors persisted across processes in a
+# small SQLite file. Any error there is treated as a miss, never raised.
+# Keys cover the gateway as well as the model, like the in-memory key;
+# bump the version whenever the key changes so older rows are never reused.
+_embed_cache_db: Path | None = SPARK_EMBED_CACHE_DB
+_DISK_KEY_VERSION = "2"
+
+
+def _disk_key(base_url: str, model: str, text: str) -> str:
+    return hashlib.sha256(
+        f"{_DISK_KEY_VERSION}\0{base_url}\0{model}\0{text}".encode(),
+    ).hexdigest()
+
+
+def _open_disk_cache(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS embeddings"
+        " (key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+    )
+    return conn
+
+
+def _disk_cache_get(
+    path: Path, base_url: str, model: str, texts: list[str],
+) -> dict[str, list[float]]:
+    keys = {_disk_key(base_url, model, t): t for t in texts}
+    key_list = list(keys)
+    cutoff = time.time() - SPARK_EMBED_CACHE_TTL
+    rows: list[tuple[str, bytes]] = []
+    try:
+        conn = _open_disk_cache(path)
+        try:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                rows += conn.execute(
+                    f"SELECT key, vector FROM embeddings"
+                    f" WHERE key IN ({', '.join('?' * len(chunk))}) AND created_at >= ?",
+                    [*chunk, cutoff],
+                ).fetchall()
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError):
+        return {}
+    return {keys[key]: array("d", blob).tolist() for key, blob in rows}
+
+
+def _disk_cache_put(
+    path: Path, base_url: str, model: str, vectors: dict[str, list[float]],
+) -> None:
+    now = time.time()
+    try:
+        conn = _open_disk_cache(path)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                    [
+                        (_disk_key(base_url, model, t), array("d", v).tobytes(), now)
+                        for t, v in vectors.items()
+                    ],
+                )
+                conn.execute(
+                    "DELETE FROM embeddings WHERE created_at < ?",
+                    (now - SPARK_EMBED_CACHE_TTL,),
+                )
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings"
+                    " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (SPARK_EMBED_CACHE_MAX_ROWS,),
+                )
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def _embed_batch(
+    client: OpenAI, texts: list[str], model: str, timeout: float,
+) -> list[list[float]]:
+    """Embed one request's worth of texts, in input order."""
+    try:
+        response = client.embeddings.create(model=model, input=texts, timeout=timeout)
+    except Exception as exc:
+        raise SparkUnavailableError(f"Sparkstation unreachable: {exc}") from exc
+
+    if not response.data:
+        raise SparkError("Sparkstation returned empty embeddings response")
+    if len(response.data) != len(texts):
+        raise SparkError(
+            f"Sparkstation returned {len(response.data)} embeddings "
+            f"for {len(texts)} inputs"
+        )
+
+    # Place each vector at its index to restore input order without sorting
+    out: list[Any] = [None] * len(texts)
+    for d in response.data:
+        if not 0 <= d.index < len(out) or out[d.index] is not None:
+            raise SparkError(f"Sparkstation returned bad embedding index {d.index}")
+        out[d.index] = d.embedding
+    return out
+
+
+_BATCH_JOB_MAX_WAIT = 3600.0  # default seconds before giving up on a batch job
+_BATCH_JOB_DONE = frozenset({"completed", "failed", "expired", "cancelled"})
+# Statuses a gateway without the Files/Batch API answers with
+_BATCH_UNSUPPORTED_STATUS = frozenset({404, 405, 501})
+
+
+def _batch_call(fn: Any, *args: Any, **kwargs: Any) -> Any:
+    """Call a Files/Batch endpoint, mapping errors like _embed_batch does."""
+    try:
+        return fn(*args, **kwargs)
+    except Exception as exc:
+        if getattr(exc, "status_code", None) in _BATCH_UNSUPPORTED_STATUS:
+            raise _BatchUnsupportedError(f"Batch API unsupported: {exc}") from exc
+        raise SparkUnavailableError(f"Sparkstation unreachable: {exc}") from exc
+
+
+def _embed_batch_job(
+    client: OpenAI, texts: list[str], model: str, timeout: float,
+    poll_interval: float, max_wait: float,
+) -> list[list[float]]:
+    """Embed texts through the Batch API, in input order.
+
+    Uploads one /v1/embeddings request per text as a JSONL file, polls the
+    batch until it finishes, then maps results back by custom_id. A batch
+    still running after max_wait seconds, or when anything fails, is
+    cancelled; the uploaded and output files are always deleted.
+    """
+    payload = "\n".join(
+        json.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/embeddings",
+            "body": {"model": model, "input": text},
+        })
+        for i, text in enumerate(texts)
+    )
+    upload = _batch_call(
+        client.files.create,
+        file=("embeddings.jsonl", payload.encode()), purpose="batch", timeout=timeout,
+    )
+    batch: Any = None
+    try:
+        batch = _batch_call(
+            client.batches.create,
+            input_file_id=upload.id,
+            endpoint="/v1/embeddings",
+            completion_window="24h",
+            timeout=timeout,
+        )
+        deadline = time.monotonic() + max_wait
+        while batch.status not in _BATCH_JOB_DONE:
+            if time.monotonic() > deadline:
+                raise SparkError(f"Batch {batch.id} still {batch.status} after {max_wait}s")
+            time.sleep(poll_interval)
+            batch = _batch_call(client.batches.retrieve, batch.id, timeout=timeout)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise SparkError(f"Batch {batch.id} ended {batch.status}")
+
+        out: list[Any] = [None] * len(texts)
+        output = _batch_call(client.files.content, batch.output_file_id, timeout=timeout).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = (record.get("response") or {}).get("body") or {}
+            out[int(record["custom_id"])] = body["data"][0]["embedding"]
+        if any(v is None for v in out):
+            raise SparkError(f"Batch {batch.id} is missing embeddings")
+        return out
+    except BaseException:
+        if batch is not None and batch.status not in _BATCH_JOB_DONE:
+            try:
+                client.batches.cancel(batch.id, timeout=timeout)
+            except Exception as exc:
+                _log.warning("Could not cancel batch %s: %s", batch.id, exc)
+        raise
+    finally:
+        file_ids = [upload.id]
+        if batch is not None and getattr(batch, "output_file_id", None):
+            file_ids.append(batch.output_file_id)
+        for file_id in file_ids:
+            try:
+                client.files.delete(file_id, timeout=timeout)
+            except Exception as exc:
+                _log.warning("Could not delete batch file %s: %s", file_id, exc)
+
+
 def embed(
     texts: list[str],
     *,
     model: str = SPARK_EMBED_MODEL,
     base_url: str = SPARK_BASE_URL,
     timeout: float = SPARK_TIMEOUT,
+    batch_size: int = 256,
+    concurrency: int = 8,
+    use_batch: bool = False,
+    poll_interval: float = 5.0,
+    batch_max_wait: float = _BATCH_JOB_MAX_WAIT,
 ) -> list[list[float]]:
     """Return embedding vectors for a batch of texts via Sparkstation.
 
+    Texts that need a request are split into batches of ``batch_size``;
+    when there is more than one, up to ``concurrency`` are in flight at once
+    on the shared client.
+
+    With ``use_batch=True`` (bulk, latency-insensitive jobs) uncached texts
+    go through the Batch API instead, polled every ``poll_interval``
+    seconds and cancelled after ``batch_max_wait``. Only a gateway without
+    the Batch API falls back to the real-time endpoint; a failed, expired
+    or timed-out job raises SparkError.
+
     Raises SparkUnavailableError if the gateway is unreachable,
     SparkError on unexpected response issues.
     """
     if not texts:
         return []
 
-    try:
-        client = OpenAI(api_key="dummy-key", base_url=base_url, timeout=timeout)
-        response = client.embeddings.create(model=model, input=texts)
-    except Exception as exc:
-        raise SparkUnavailableError(f"Sparkstation unreachable: {exc}") from exc
-
-    if not response.data:
-        raise SparkError("Sparkstation returned empty embeddings response")
-
-    # Sort by index to preserve input order
-    sorted_data = sorted(response.data, key=lambda d: d.index)
-    return [d.embedding for d in sorted_data]
+    # Send each distinct uncached text once; duplicates share its vector.
+    found: dict[str, list[float]] = {}
+    with _embed_cache_lock:
+        for text in texts:
+            if text in found:
+                continue
+            cached = _embed_cache.get((base_url, model, text))
+            if cached is not None:
+                _embed_cache.move_to_end((base_url, model, text))
+                found[text] = cached
+    misses = list(dict.fromkeys(t for t in texts if t not in found))
+    if not misses:
+        return [found[t] for t in texts]
+
+    disk_db = _embed_cache_db
+    if disk_db is not None:
+        from_disk = _disk_cache_get(disk_db, base_url, model, misses)
+        if from_disk:
+            found.update(from_disk)
+            with _embed_cache_lock:
+                for text, vector in from_disk.items():
+                    _embed_cache[(base_url, model, text)] = vector
+            misses = [t for t in misses if t not in from_disk]
+            if not misses:
+                return [found[t] for t in texts]
+
+    client = _get_client(base_url)
+    batches = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+    results: list[list[list[float]]] | None = None
+    if use_batch:
+        try:
+            job = _embed_batch_job(
+                client, misses, model, timeout, poll_interval, batch_max_wait,
+            )
+        except _BatchUnsupportedError as exc:
+            _log.warning("Falling back to real-time embeddings: %s", exc)
+        else:
+            batches, results = [misses], [job]
+    if results is None:
+        if len(batches) == 1:
+            results = [_embed_batch(client, misses, model, timeout)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as pool:
+                results = list(pool.map(
+                    lambda batch: _embed_batch(client, batch, model, timeout), batches,
+                ))
+
+    with _embed_cache_lock:
+        for batch, vectors in zip(batches, results, strict=True):
+            for text, vector in zip(batch, vectors, strict=True):
+                found[text] = vector
+                _embed_cache[(base_url, model, text)] = vector
+        while len(_embed_cache) > _EMBED_CACHE_MAX:
+            _embed_cache.popitem(last=False)
+    if disk_db is not None:
+        _disk_cache_put(disk_db, base_url, model, {t: found[t] for t in misses})
+    return [found[t] for t in texts]
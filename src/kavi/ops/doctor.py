@@ -8,17 +8,20 @@ from __future__ import annotations
 
 import hashlib
 import importlib
+import importlib.metadata
 import json
 import os
 import shutil
-import subprocess
+import stat
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from pathlib import Path
+from types import ModuleType
 from typing import Any
 
-from openai import OpenAI
+from kavi.llm.spark import is_available
 
 
 @dataclass
@@ -69,9 +72,18 @@ class DoctorReport:
 # Check 1: Config + paths
 # ---------------------------------------------------------------------------
 
+def _stat(path: Path) -> os.stat_result | None:
+    """Stat path once; None if it does not exist or cannot be reached."""
+    try:
+        return path.stat()
+    except OSError:
+        return None
+
+
 def check_vault_path(vault_out: Path) -> CheckResult:
     """Verify vault output directory exists and is a directory."""
-    if vault_out.exists() and vault_out.is_dir():
+    st = _stat(vault_out)
+    if st is not None and stat.S_ISDIR(st.st_mode):
         return CheckResult("vault_path", "ok", f"Vault exists: {vault_out}")
     return CheckResult(
         "vault_path", "fail",
@@ -82,14 +94,14 @@ def check_vault_path(vault_out: Path) -> CheckResult:
 
 def check_registry_path(registry_path: Path) -> CheckResult:
     """Verify registry YAML exists and is readable."""
-    if registry_path.exists() and os.access(registry_path, os.R_OK):
-        return CheckResult("registry_path", "ok", f"Registry readable: {registry_path}")
-    if not registry_path.exists():
+    if _stat(registry_path) is None:
         return CheckResult(
             "registry_path", "fail",
             f"Registry file missing: {registry_path}",
             "Re-install kavi or restore registry.yaml from git",
         )
+    if os.access(registry_path, os.R_OK):
+        return CheckResult("registry_path", "ok", f"Registry readable: {registry_path}")
     return CheckResult(
         "registry_path", "fail",
         f"Registry file not readable: {registry_path}",
@@ -99,7 +111,7 @@ def check_registry_path(registry_path: Path) -> CheckResult:
 
 def check_execution_log_path(log_path: Path) -> CheckResult:
     """Verify execution log path is writable (or parent is writable)."""
-    if log_path.exists():
+    if _stat(log_path) is not None:
         if os.access(log_path, os.W_OK):
             return CheckResult("execution_log", "ok", f"Log writable: {log_path}")
         return CheckResult(
@@ -107,9 +119,9 @@ def check_execution_log_path(log_path: Path) -> CheckResult:
             f"Log file not writable: {log_path}",
             f"chmod +w {log_path}",
         )
-    # File doesn't exist — check parent
+    # File doesn't exist — check parent (os.access fails for a missing one)
     parent = log_path.parent
-    if parent.exists() and os.access(parent, os.W_OK):
+    if os.access(parent, os.W_OK):
         return CheckResult(
             "execution_log", "ok",
             f"Log parent writable (log will be created): {parent}",
@@ -138,6 +150,90 @@ def check_config_paths(
 # Check 2: Registry integrity
 # ---------------------------------------------------------------------------
 
+def _module_name(module_path: str) -> str:
+    parts = module_path.rsplit(".", 1)
+    return parts[0] if parts else module_path
+
+
+def _import_or_error(module_name: str) -> ModuleType | Exception:
+    try:
+        return importlib.import_module(module_name)
+    except Exception as exc:
+        return exc
+
+
+def _hash_or_error(source_file: str) -> str | OSError:
+    try:
+        with open(source_file, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError as exc:
+        return exc
+
+
+def _check_skill(
+    entry: dict[str, Any],
+    modules: dict[str, ModuleType | Exception],
+    hashes: dict[str, str | OSError],
+) -> CheckResult:
+    """Judge one registry entry from pre-computed imports and file hashes."""
+    name = entry.get("name", "<unknown>")
+    module_path = entry.get("module_path", "")
+    expected_hash = entry.get("hash")
+
+    if not module_path:
+        return CheckResult(
+            f"skill_{name}", "fail",
+            f"Skill '{name}': missing module_path",
+            "Fix registry.yaml entry",
+        )
+
+    module_name = _module_name(module_path)
+    mod = modules[module_name]
+    if isinstance(mod, Exception):
+        return CheckResult(
+            f"skill_{name}", "fail",
+            f"Skill '{name}': import failed — {mod}",
+            f"Check that {module_name} exists and has no import errors",
+        )
+
+    # Hash verification (coerce to str — YAML may parse hex as int)
+    expected_hash = str(expected_hash) if expected_hash is not None else None
+    if not expected_hash:
+        return CheckResult(
+            f"skill_{name}", "warn",
+            f"Skill '{name}': no hash in registry (trust check skipped)",
+            "kavi promote-skill <proposal_id> to store hash",
+        )
+
+    source_file = getattr(mod, "__file__", None)
+    if source_file is None:
+        return CheckResult(
+            f"skill_{name}", "fail",
+            f"Skill '{name}': cannot locate source file",
+            "Reinstall the kavi package",
+        )
+
+    actual_hash = hashes[source_file]
+    if isinstance(actual_hash, OSError):
+        return CheckResult(
+            f"skill_{name}", "fail",
+            f"Skill '{name}': cannot read source file — {actual_hash}",
+            f"Restore the file from git:\n  git checkout -- {source_file}",
+        )
+    if actual_hash != expected_hash:
+        return CheckResult(
+            f"skill_{name}", "fail",
+            f"Skill '{name}': hash drift — "
+            f"expected {expected_hash[:12]}..., got {actual_hash[:12]}...",
+            f"Re-verify and re-promote the skill, or restore the file from git:\n"
+            f"  git checkout -- {source_file}",
+        )
+    return CheckResult(
+        f"skill_{name}", "ok",
+        f"Skill '{name}': hash verified",
+    )
+
+
 def check_registry_integrity(registry_path: Path) -> list[CheckResult]:
     """Validate registry YAML, skill loadability, and hash trust."""
     results: list[CheckResult] = []
@@ -187,66 +283,26 @@ def check_registry_integrity(registry_path: Path) -> list[CheckResult]:
             "Remove duplicate entries from registry.yaml",
         ))
 
-    # Check each skill
+    # Import each distinct module once, serially: imports hold the import
+    # locks and the GIL, and concurrent imports of modules that share
+    # dependencies can deadlock. Then hash each distinct source file once,
+    # concurrently (hashlib releases the GIL). Results follow registry order.
+    module_names = list(dict.fromkeys(
+        _module_name(e["module_path"]) for e in skills if e.get("module_path")
+    ))
+    modules = {name: _import_or_error(name) for name in module_names}
+    source_files: dict[str, None] = {}
     for entry in skills:
-        name = entry.get("name", "<unknown>")
-        module_path = entry.get("module_path", "")
-        expected_hash = entry.get("hash")
-
-        if not module_path:
-            results.append(CheckResult(
-                f"skill_{name}", "fail",
-                f"Skill '{name}': missing module_path",
-                "Fix registry.yaml entry",
-            ))
-            continue
-
-        # Try importing the module
-        parts = module_path.rsplit(".", 1)
-        module_name = parts[0] if parts else module_path
-        try:
-            mod = importlib.import_module(module_name)
-        except Exception as exc:
-            results.append(CheckResult(
-                f"skill_{name}", "fail",
-                f"Skill '{name}': import failed — {exc}",
-                f"Check that {module_name} exists and has no import errors",
-            ))
-            continue
-
-        # Hash verification (coerce to str — YAML may parse hex as int)
-        expected_hash = str(expected_hash) if expected_hash is not None else None
-        if not expected_hash:
-            results.append(CheckResult(
-                f"skill_{name}", "warn",
-                f"Skill '{name}': no hash in registry (trust check skipped)",
-                "kavi promote-skill <proposal_id> to store hash",
-            ))
-            continue
-
-        source_file = getattr(mod, "__file__", None)
-        if source_file is None:
-            results.append(CheckResult(
-                f"skill_{name}", "fail",
-                f"Skill '{name}': cannot locate source file",
-                "Reinstall the kavi package",
-            ))
-            continue
-
-        actual_hash = hashlib.sha256(Path(source_file).read_bytes()).hexdigest()
-        if actual_hash != expected_hash:
-            results.append(CheckResult(
-                f"skill_{name}", "fail",
-                f"Skill '{name}': hash drift — "
-                f"expected {expected_hash[:12]}..., got {actual_hash[:12]}...",
-                f"Re-verify and re-promote the skill, or restore the file from git:\n"
-                f"  git checkout -- {source_file}",
-            ))
-        else:
-            results.append(CheckResult(
-                f"skill_{name}", "ok",
-                f"Skill '{name}': hash verified",
-            ))
+        if entry.get("module_path") and entry.get("hash") is not None:
+            mod = modules[_module_name(entry["module_path"])]
+            source_file = getattr(mod, "__file__", None)
+            if isinstance(source_file, str):
+                source_files[source_file] = None
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        hashes = dict(zip(
+            source_files, pool.map(_hash_or_error, source_files), strict=True,
+        ))
+    results.extend(_check_skill(entry, modules, hashes) for entry in skills)
 
     return results
 
@@ -260,20 +316,17 @@ def check_sparkstation(
     timeout: float = 1.0,
 ) -> CheckResult:
     """Best-effort Sparkstation connectivity check with short timeout."""
-    try:
-        client = OpenAI(api_key="dummy-key", base_url=base_url, timeout=timeout)
-        client.models.list()
+    if is_available(base_url, timeout=timeout):
         return CheckResult(
             "sparkstation", "ok",
             f"Sparkstation reachable at {base_url}",
         )
-    except Exception:
-        return CheckResult(
-            "sparkstation", "warn",
-            f"Sparkstation unreachable at {base_url}. "
-            "Features impacted: summarize_note may fallback; search_notes uses lexical fallback",
-            "Start Sparkstation or check SPARK_BASE_URL in config.py",
-        )
+    return CheckResult(
+        "sparkstation", "warn",
+        f"Sparkstation unreachable at {base_url}. "
+        "Features impacted: summarize_note may fallback; search_notes uses lexical fallback",
+        "Start Sparkstation or check SPARK_BASE_URL in config.py",
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -308,19 +361,19 @@ def check_toolchain() -> list[CheckResult]:
             "Install uv: curl -LsSf https://astral.sh/uv/install.sh | sh",
         ))
 
-    # ruff (importable check)
+    # ruff: installed distribution metadata, else a binary on PATH
     try:
-        subprocess.run(
-            ["ruff", "--version"],
-            capture_output=True, timeout=5,
-        )
-        results.append(CheckResult("ruff", "ok", "ruff available"))
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        results.append(CheckResult(
-            "ruff", "warn",
-            "ruff not found",
-            "uv add --dev ruff",
-        ))
+        ruff_version = importlib.metadata.version("ruff")
+        results.append(CheckResult("ruff", "ok", f"ruff {ruff_version} available"))
+    except importlib.metadata.PackageNotFoundError:
+        if shutil.which("ruff"):
+            results.append(CheckResult("ruff", "ok", "ruff available"))
+        else:
+            results.append(CheckResult(
+                "ruff", "warn",
+                "ruff not found",
+                "uv add --dev ruff",
+            ))
 
     return results
 
@@ -343,19 +396,21 @@ def check_log_sanity(log_path: Path) -> CheckResult:
     has_version = 0
 
     try:
-        with open(log_path, encoding="utf-8") as f:
+        # Binary mode: json.loads takes UTF-8 bytes and ignores surrounding
+        # whitespace, so lines need neither decoding nor stripping first.
+        with open(log_path, "rb") as f:
             for line in f:
-                line = line.strip()
-                if not line:
+                if line.isspace():
                     continue
                 total += 1
                 try:
                     data = json.loads(line)
-                    valid += 1
-                    if "v" in data:
-                        has_version += 1
-                except (json.JSONDecodeError, ValueError):
+                except ValueError:  # JSONDecodeError, UnicodeDecodeError
                     malformed += 1
+                    continue
+                valid += 1
+                if isinstance(data, dict) and "v" in data:
+                    has_version += 1
     except Exception as exc:
         return CheckResult(
             "log_sanity", "fail",
@@ -388,13 +443,25 @@ def run_all_checks(
     spark_base_url: str,
     spark_timeout: float = 1.0,
 ) -> DoctorReport:
-    """Run every healthcheck and return an aggregate report."""
+    """Run every healthcheck and return an aggregate report.
+
+    The checks are independent, so they run concurrently and total time
+    is roughly that of the slowest (usually the Sparkstation probe).
+    Results are reported in the same fixed order regardless.
+    """
     report = DoctorReport()
 
-    report.checks.extend(check_config_paths(vault_out, registry_path, log_path))
-    report.checks.extend(check_registry_integrity(registry_path))
-    report.checks.append(check_sparkstation(spark_base_url, timeout=spark_timeout))
-    report.checks.extend(check_toolchain())
-    report.checks.append(check_log_sanity(log_path))
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        groups = [
+            pool.submit(check_config_paths, vault_out, registry_path, log_path),
+            pool.submit(check_registry_integrity, registry_path),
+            pool.submit(lambda: [
+                check_sparkstation(spark_base_url, timeout=spark_timeout),
+            ]),
+            pool.submit(check_toolchain),
+            pool.submit(lambda: [check_log_sanity(log_path)]),
+        ]
+        for group in groups:
+            report.checks.extend(group.result())
 
     return report
@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 import ast
+import functools
+import hashlib
+import json
+import os
 import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 
 import yaml
 
+from kavi.config import SCAN_CACHE_DB
+
 
 @dataclass
 class PolicyViolation:
@@ -47,29 +55,41 @@ class Policy:
         )
 
 
-class _Visitor(ast.NodeVisitor):
-    """AST visitor that checks for policy violations."""
+class _Visitor:
+    """Checks a parsed module for policy violations.
+
+    Walks the tree iteratively with ast.walk and dispatches on node type,
+    rather than recursing through ast.NodeVisitor.generic_visit.
+    """
 
     def __init__(self, policy: Policy, filename: str) -> None:
         self.policy = policy
         self.filename = filename
         self.violations: list[PolicyViolation] = []
-
-    def visit_Import(self, node: ast.Import) -> None:  # noqa: N802
-        for alias in node.names:
-            self._check_import(alias.name, node.lineno)
-        self.generic_visit(node)
-
-    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:  # noqa: N802
+        self._forbidden = frozenset(policy.forbidden_imports)
+
+    def visit(self, tree: ast.AST) -> None:
+        check_exec = self.policy.forbid_dynamic_exec
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                self._check_call(node, check_exec)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    self._check_import(alias.name, node.lineno)
+            elif isinstance(node, ast.ImportFrom):
+                self._check_import_from(node)
+        # ast.walk is breadth-first; report in source order
+        self.violations.sort(key=lambda v: v.line)
+
+    def _check_import_from(self, node: ast.ImportFrom) -> None:
         if node.module:
             self._check_import(node.module, node.lineno)
             for alias in node.names:
                 full = f"{node.module}.{alias.name}"
                 self._check_import(full, node.lineno)
-        self.generic_visit(node)
 
-    def visit_Call(self, node: ast.Call) -> None:  # noqa: N802
-        if self.policy.forbid_dynamic_exec:
+    def _check_call(self, node: ast.Call, check_exec: bool) -> None:
+        if check_exec:
             name = _call_name(node)
             if name in ("eval", "exec", "compile"):
                 self.violations.append(PolicyViolation(
@@ -79,7 +99,6 @@ class _Visitor(ast.NodeVisitor):
                     detail=f"Call to {name}() is forbidden",
                 ))
         self._check_secret_leak(node)
-        self.generic_visit(node)
 
     def _check_secret_leak(self, node: ast.Call) -> None:
         """Detect print/log calls that leak environment variable values.
@@ -104,14 +123,19 @@ class _Visitor(ast.NodeVisitor):
                 ))
 
     def _check_import(self, module_name: str, lineno: int) -> None:
-        for forbidden in self.policy.forbidden_imports:
-            if module_name == forbidden or module_name.startswith(forbidden + "."):
-                self.violations.append(PolicyViolation(
-                    file=self.filename,
-                    line=lineno,
-                    rule="forbidden_import",
-                    detail=f"Import of '{module_name}' is forbidden",
-                ))
+        # A module is forbidden if it or any dotted prefix of it is listed.
+        prefix = module_name
+        while prefix not in self._forbidden:
+            dot = prefix.rfind(".")
+            if dot < 0:
+                return
+            prefix = prefix[:dot]
+        self.violations.append(PolicyViolation(
+            file=self.filename,
+            line=lineno,
+            rule="forbidden_import",
+            detail=f"Import of '{module_name}' is forbidden",
+        ))
 
 
 def _call_name(node: ast.Call) -> str | None:
@@ -168,11 +192,82 @@ _EXEC_PATTERN = re.compile(r'\b(eval|exec|compile)\s*\(')
 _OS_SYSTEM_PATTERN = re.compile(r'\bos\.system\s*\(')
 
 
-def scan_file(path: Path, policy: Policy) -> list[PolicyViolation]:
-    """Scan a single Python file against the policy."""
-    source = path.read_text()
-    filename = str(path)
+# Scan results persisted across runs. Opt-in (SCAN_CACHE_DB): a cached
+# verdict is only as trustworthy as whoever can write the cache file, so
+# the forge verify gate always scans with use_cache=False. Keys mix in a
+# hash of this module's source, so editing the rules invalidates old
+# verdicts without a manual version bump.
+_scan_cache_db = SCAN_CACHE_DB
+
+
+@functools.cache
+def _scanner_digest() -> bytes:
+    with open(__file__, "rb") as f:
+        return hashlib.file_digest(f, "sha256").digest()
+
+
+def _scan_key(source: bytes, policy: Policy) -> str:
+    h = hashlib.sha256(_scanner_digest())
+    h.update(f"\0{policy!r}\0".encode())
+    h.update(source)
+    return h.hexdigest()
+
 
+def _open_scan_cache(path: Path) -> sqlite3.Connection | None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), timeout=5)
+    except (sqlite3.Error, OSError):
+        return None
+    try:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scans"
+            " (key TEXT PRIMARY KEY, violations TEXT NOT NULL)"
+        )
+    except sqlite3.Error:
+        conn.close()
+        return None
+    return conn
+
+
+def _scan_cache_get(
+    conn: sqlite3.Connection, keys: list[str],
+) -> dict[str, list[tuple[int, str, str]]]:
+    rows: list[tuple[str, str]] = []
+    try:
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows += conn.execute(
+                f"SELECT key, violations FROM scans"
+                f" WHERE key IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+    except sqlite3.Error:
+        return {}
+    return {key: [tuple(v) for v in json.loads(payload)] for key, payload in rows}
+
+
+def _scan_cache_put(
+    conn: sqlite3.Connection, entries: list[tuple[str, list[PolicyViolation]]],
+) -> None:
+    if not entries:
+        return
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO scans VALUES (?, ?)",
+                [
+                    (key, json.dumps([[v.line, v.rule, v.detail] for v in violations]))
+                    for key, violations in entries
+                ],
+            )
+    except sqlite3.Error:
+        pass
+
+
+def _check_source(source: bytes, filename: str, policy: Policy) -> list[PolicyViolation]:
+    """Parse and check one file's source; never consults the cache."""
     try:
         tree = ast.parse(source, filename=filename)
     except SyntaxError as e:
@@ -180,18 +275,98 @@ def scan_file(path: Path, policy: Policy) -> list[PolicyViolation]:
             file=filename, line=e.lineno or 0,
             rule="syntax_error", detail=f"Cannot parse: {e.msg}",
         )]
-
     visitor = _Visitor(policy, filename)
     visitor.visit(tree)
     return visitor.violations
 
 
-def scan_directory(directory: Path, policy: Policy) -> ScanResult:
-    """Scan all .py files in a directory against the policy."""
+def _check_sources(
+    filenames: list[str], sources: list[bytes], policy: Policy,
+    min_files_for_parallel: int,
+) -> list[list[PolicyViolation]]:
+    workers = min(os.cpu_count() or 1, len(filenames))
+    if workers > 1 and len(filenames) >= min_files_for_parallel:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(
+                _check_source, sources, filenames, [policy] * len(filenames),
+                chunksize=max(1, len(filenames) // (workers * 4)),
+            ))
+    return [_check_source(src, name, policy) for src, name in zip(sources, filenames)]
+
+
+def _scan_paths(
+    paths: list[Path], policy: Policy, *,
+    use_cache: bool, min_files_for_parallel: int,
+) -> list[list[PolicyViolation]]:
+    """Violations per path, in order, through one cache connection."""
+    filenames = [str(p) for p in paths]
+    sources = [p.read_bytes() for p in paths]
+    cache = _scan_cache_db if use_cache else None
+    conn = _open_scan_cache(cache) if cache is not None else None
+    if conn is None:
+        return _check_sources(filenames, sources, policy, min_files_for_parallel)
+
+    try:
+        keys = [_scan_key(src, policy) for src in sources]
+        cached = _scan_cache_get(conn, keys)
+        misses = [i for i, key in enumerate(keys) if key not in cached]
+        fresh = _check_sources(
+            [filenames[i] for i in misses], [sources[i] for i in misses],
+            policy, min_files_for_parallel,
+        )
+        _scan_cache_put(conn, [(keys[i], v) for i, v in zip(misses, fresh)])
+    finally:
+        conn.close()
+
+    results: list[list[PolicyViolation]] = []
+    fresh_iter = iter(fresh)
+    for filename, key in zip(filenames, keys):
+        hit = cached.get(key)
+        if hit is None:
+            results.append(next(fresh_iter))
+        else:
+            results.append([
+                PolicyViolation(file=filename, line=line, rule=rule, detail=detail)
+                for line, rule, detail in hit
+            ])
+    return results
+
+
+def scan_file(path: Path, policy: Policy, *, use_cache: bool = True) -> list[PolicyViolation]:
+    """Scan a single Python file against the policy.
+
+    With SCAN_CACHE_DB set and use_cache true, results are cached on disk
+    by file content, policy and scanner source, so unchanged files are not
+    re-parsed on later runs.
+    """
+    return _scan_paths(
+        [path], policy, use_cache=use_cache, min_files_for_parallel=2,
+    )[0]
+
+
+def scan_directory(
+    directory: Path,
+    policy: Policy,
+    *,
+    min_files_for_parallel: int = 8,
+    use_cache: bool = True,
+) -> ScanResult:
+    """Scan all .py files in a directory against the policy.
+
+    Trees with at least min_files_for_parallel uncached files are parsed
+    across a process pool (ast.parse is CPU-bound); smaller ones scan
+    in-process. The scan cache, if enabled, is opened once per call.
+    Violations are reported in sorted file order either way.
+    """
     result = ScanResult()
-    for py_file in sorted(directory.rglob("*.py")):
-        result.files_scanned += 1
-        result.violations.extend(scan_file(py_file, policy))
+    py_files = sorted(directory.rglob("*.py"))
+    result.files_scanned = len(py_files)
+    per_file = _scan_paths(
+        py_files, policy,
+        use_cache=use_cache, min_files_for_parallel=min_files_for_parallel,
+    )
+    for violations in per_file:
+        result.violations.extend(violations)
     return result
 
 
@@ -39,8 +39,13 @@ class BaseSkill(ABC):
         """Execute the skill with validated input. Returns validated output."""
 
     def validate_and_run(self, raw_input: dict[str, Any]) -> dict[str, Any]:
-        """Validate input, execute, validate output, return dict."""
-        validated_input = self.input_model(**raw_input)
+        """Validate input, execute, validate output, return dict.
+
+        An exact output_model instance was validated when it was built, so
+        it is dumped directly; anything else is re-validated from its dump.
+        """
+        validated_input = self.input_model.model_validate(raw_input)
         result = self.execute(validated_input)
-        validated_output = self.output_model.model_validate(result.model_dump())
-        return validated_output.model_dump()
+        if type(result) is not self.output_model:
+            result = self.output_model.model_validate(result.model_dump())
+        return result.model_dump()
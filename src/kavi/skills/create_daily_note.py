@@ -46,14 +46,15 @@ class CreateDailyNoteSkill(BaseSkill):
 
         entry = f"- {time_str} — {input_data.content}\n"
 
-        if dest.exists():
-            dest.write_text(dest.read_text() + entry)
-        else:
-            header = f"# {date_str}\n\n"
-            dest.write_text(header + entry)
-
-        content_bytes = dest.read_bytes()
-        sha = hashlib.sha256(content_bytes).hexdigest()
+        # One open: hash what is already there while reading it, then append.
+        with open(dest, "a+b") as f:
+            f.seek(0)
+            digest = hashlib.file_digest(f, "sha256")
+            header = f"# {date_str}\n\n" if f.tell() == 0 else ""
+            data = (header + entry).encode("utf-8")
+            f.write(data)
+            digest.update(data)
+        sha = digest.hexdigest()
 
         return CreateDailyNoteOutput(
             path=str(dest),
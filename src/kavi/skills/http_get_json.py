@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import os
+import ssl
 import urllib.error
 import urllib.request
 from typing import Any
@@ -12,6 +14,23 @@ from urllib.parse import urlparse
 from kavi.skills.base import BaseSkill, SkillInput, SkillOutput
 
 
+@functools.cache
+def _opener() -> urllib.request.OpenerDirector:
+    """Opener shared across calls, with one SSL context for all HTTPS requests.
+
+    Plain urlopen() leaves http.client to build a fresh default context
+    (loading the CA store) per connection; reusing one also lets OpenSSL
+    resume sessions with hosts already contacted. Built on first use.
+    """
+    context = ssl.create_default_context()
+    return urllib.request.build_opener(urllib.request.HTTPSHandler(context=context))
+
+
+def _urlopen(req: urllib.request.Request, timeout: float) -> Any:
+    """urlopen() through the shared opener."""
+    return _opener().open(req, timeout=timeout)
+
+
 class HttpGetJsonInput(SkillInput):
     """Input for http_get_json skill."""
 
@@ -22,6 +41,11 @@ class HttpGetJsonInput(SkillInput):
     max_bytes: int = 200_000
     allowed_hosts: list[str]
 
+    @functools.cached_property
+    def allowed_host_set(self) -> frozenset[str]:
+        """allowed_hosts as a set, built once per input for O(1) host checks."""
+        return frozenset(self.allowed_hosts)
+
 
 class HttpGetJsonOutput(SkillOutput):
     """Output for http_get_json skill."""
@@ -62,7 +86,7 @@ class HttpGetJsonSkill(BaseSkill):
         if not host:
             return HttpGetJsonOutput(url=url, error="No hostname in URL")
 
-        if host not in input_data.allowed_hosts:
+        if host not in input_data.allowed_host_set:
             return HttpGetJsonOutput(
                 url=url,
                 error=f"Host {host!r} not in allowed_hosts",
@@ -88,12 +112,10 @@ class HttpGetJsonSkill(BaseSkill):
             req_headers["Authorization"] = f"Bearer {api_key}"
             used_secret = True
 
-        # Perform HTTP GET via urllib
+        # Perform HTTP GET via urllib (shared opener)
         req = urllib.request.Request(url, headers=req_headers, method="GET")
         try:
-            with urllib.request.urlopen(
-                req, timeout=input_data.timeout_s
-            ) as resp:
+            with _urlopen(req, timeout=input_data.timeout_s) as resp:
                 status_code = resp.status
                 raw_body = resp.read(input_data.max_bytes + 1)
         except urllib.error.HTTPError as exc:
@@ -2,38 +2,93 @@
 
 from __future__ import annotations
 
+import copy
+import functools
 import hashlib
 import importlib
+import os
 import warnings
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from kavi.config import STRICT_TRUST_HASH
 from kavi.skills.base import BaseSkill
 
+# libyaml's C loader/dumper when PyYAML was built with it; same safe subset.
+try:
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeDumper as _SafeDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
 
 class TrustError(Exception):
     """Raised when a skill file hash does not match the registry."""
 
 
-def load_registry(registry_path: Path) -> list[dict[str, Any]]:
-    """Load the skill registry YAML file."""
+# Parsed registries keyed by path, tagged with the (mtime_ns, size) they
+# were parsed at, plus a name -> entry index. Any write to the file
+# changes the tag.
+_registry_cache: dict[
+    Path, tuple[int, int, list[dict[str, Any]], dict[str, dict[str, Any]]]
+] = {}
+
+
+# Source files that passed _verify_trust, keyed by path and tagged with
+# (mtime_ns, ctime_ns, size, inode, hash) at the time they were hashed.
+_verified_hashes: dict[str, tuple[int, int, int, int, str]] = {}
+
+
+def _cached_registry(
+    registry_path: Path,
+) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    """Return the cached (entries, name index); callers must not mutate them."""
+    st = registry_path.stat()
+    cached = _registry_cache.get(registry_path)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2], cached[3]
+
     with open(registry_path) as f:
-        data = yaml.safe_load(f)
-    return data.get("skills", []) if data else []
+        data = yaml.load(f, Loader=_SafeLoader)
+    skills: list[dict[str, Any]] = data.get("skills", []) if data else []
+    # First entry wins on duplicate names, matching a front-to-back scan
+    index: dict[str, dict[str, Any]] = {}
+    for entry in skills:
+        if "name" in entry:
+            index.setdefault(entry["name"], entry)
+    _registry_cache[registry_path] = (st.st_mtime_ns, st.st_size, skills, index)
+    return skills, index
+
+
+def load_registry(registry_path: Path) -> list[dict[str, Any]]:
+    """Load the skill registry YAML file.
+
+    Parsed contents are cached until the file's mtime or size changes;
+    callers get a deep copy, so mutating the result never touches the cache.
+    """
+    return copy.deepcopy(_cached_registry(registry_path)[0])
 
 
 def save_registry(registry_path: Path, skills: list[dict[str, Any]]) -> None:
     """Write the skill registry YAML file."""
+    _registry_cache.pop(registry_path, None)
     with open(registry_path, "w") as f:
-        yaml.dump({"skills": skills}, f, default_flow_style=False, sort_keys=False)
+        yaml.dump(
+            {"skills": skills}, f,
+            Dumper=_SafeDumper, default_flow_style=False, sort_keys=False,
+        )
 
 
-def _import_skill(module_path: str) -> type[BaseSkill]:
+@functools.cache
+def _resolve_skill(module_path: str) -> tuple[type[BaseSkill], str | None]:
     """Import a skill class from a dotted module path (e.g. 'module.ClassName').
 
-    Private — only called by load_skill after trust verification.
+    Returns (class, source file). Cached per module path, so repeat loads
+    skip the import machinery; failures are not cached.
+    Private — only reached through load_skill.
     """
     parts = module_path.rsplit(".", 1)
     if len(parts) != 2:
@@ -43,30 +98,36 @@ def _import_skill(module_path: str) -> type[BaseSkill]:
     cls = getattr(module, class_name)
     if not isinstance(cls, type) or not issubclass(cls, BaseSkill):
         raise TypeError(f"{module_path} is not a BaseSkill subclass")
-    return cls
+    return cls, getattr(module, "__file__", None)
 
 
 def _verify_trust(module_path: str, expected_hash: str) -> None:
     """Re-hash the skill source file and compare against the registry hash.
 
     Raises TrustError if the hash does not match or the source file
-    cannot be located.
+    cannot be located. A file whose stat (mtime, ctime, size, inode) is
+    unchanged since it last matched the same hash is not re-read, unless
+    STRICT_TRUST_HASH is set.
     """
-    parts = module_path.rsplit(".", 1)
-    module_name = parts[0]
-    mod = importlib.import_module(module_name)
-    source_file = getattr(mod, "__file__", None)
+    source_file = _resolve_skill(module_path)[1]
     if source_file is None:
         raise TrustError(
-            f"Cannot locate source file for module '{module_name}'"
+            f"Cannot locate source file for module '{module_path.rsplit('.', 1)[0]}'"
         )
-    actual_hash = hashlib.sha256(Path(source_file).read_bytes()).hexdigest()
+    st = os.stat(source_file)
+    tag = (st.st_mtime_ns, st.st_ctime_ns, st.st_size, st.st_ino, expected_hash)
+    if not STRICT_TRUST_HASH and _verified_hashes.get(source_file) == tag:
+        return
+    with open(source_file, "rb") as f:
+        actual_hash = hashlib.file_digest(f, "sha256").hexdigest()
     if actual_hash != expected_hash:
+        _verified_hashes.pop(source_file, None)
         raise TrustError(
             f"Skill '{module_path}' failed trust check: "
             f"expected hash {expected_hash[:12]}…, "
             f"got {actual_hash[:12]}…"
         )
+    _verified_hashes[source_file] = tag
 
 
 def load_skill(registry_path: Path, skill_name: str) -> BaseSkill:
@@ -75,22 +136,21 @@ def load_skill(registry_path: Path, skill_name: str) -> BaseSkill:
     Verifies the skill file hash against the registry before execution.
     Raises TrustError if the hash does not match.
     """
-    entries = load_registry(registry_path)
-    for entry in entries:
-        if entry["name"] == skill_name:
-            expected_hash = entry.get("hash")
-            if expected_hash:
-                _verify_trust(entry["module_path"], expected_hash)
-            else:
-                warnings.warn(
-                    f"Skill '{skill_name}' has no hash in registry — "
-                    "trust check skipped (re-promote to fix)",
-                    UserWarning,
-                    stacklevel=2,
-                )
-            cls = _import_skill(entry["module_path"])
-            return cls()
-    raise KeyError(f"Skill '{skill_name}' not found in registry")
+    entry = _cached_registry(registry_path)[1].get(skill_name)
+    if entry is None:
+        raise KeyError(f"Skill '{skill_name}' not found in registry")
+    expected_hash = entry.get("hash")
+    if expected_hash:
+        _verify_trust(entry["module_path"], expected_hash)
+    else:
+        warnings.warn(
+            f"Skill '{skill_name}' has no hash in registry — "
+            "trust check skipped (re-promote to fix)",
+            UserWarning,
+            stacklevel=2,
+        )
+    cls = _resolve_skill(entry["module_path"])[0]
+    return cls()
 
 
 def list_skills(registry_path: Path) -> list[dict[str, Any]]:
@@ -2,12 +2,18 @@
 
 from __future__ import annotations
 
+import functools
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from kavi.skills.base import BaseSkill, SkillInput, SkillOutput
 
 VAULT_OUT = Path("vault_out")
 
+_READ_WORKERS = 16
+
 
 class NoteInfo(SkillOutput):
     """A single note entry."""
@@ -48,46 +54,128 @@ class ReadNotesByTagSkill(BaseSkill):
         if not VAULT_OUT.exists():
             return ReadNotesByTagOutput(notes=[], count=0)
 
-        for md_file in sorted(VAULT_OUT.rglob("*.md")):
-            try:
-                content = md_file.read_text(encoding="utf-8")
-            except (OSError, UnicodeDecodeError):
+        md_files = _walk_md(VAULT_OUT)
+        contents = _read_notes(
+            [path for path, _, _ in md_files], f"#{tag}".encode()
+        )
+        for (_, rel_path, _), content in zip(md_files, contents):
+            if content is None:
                 continue
 
             if _has_tag(content, tag):
-                title = _extract_title(content, md_file.stem)
-                rel_path = str(md_file.relative_to(VAULT_OUT))
+                stem = os.path.splitext(os.path.basename(rel_path))[0]
+                title = _extract_title(content, stem)
                 notes.append(NoteInfo(path=rel_path, title=title))
 
         return ReadNotesByTagOutput(notes=notes, count=len(notes))
 
 
+def _walk_md(root: Path) -> list[tuple[str, str, bool]]:
+    """List ``*.md`` files under *root* as (path, relative_path, is_symlink).
+
+    An os.scandir walk: DirEntry caches the file type from the directory
+    read, so no per-file stat or Path objects are needed. Like
+    Path.rglob, symlinked directories are not descended into. Results
+    are sorted by path components, the order sorted(rglob(...)) gave.
+    """
+    found: list[tuple[str, str, bool]] = []
+    stack = [(os.fspath(root), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    rel = prefix + entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if not entry.is_symlink():
+                            stack.append((entry.path, rel + os.sep))
+                    elif entry.name.endswith(".md"):
+                        found.append((entry.path, rel, entry.is_symlink()))
+        except OSError:
+            continue
+    found.sort(key=lambda f: f[1].split(os.sep))
+    return found
+
+
+def _read_note(path: str, needle: bytes | None = None) -> str | None:
+    """Read a note as UTF-8, or None if it cannot be read or decoded.
+
+    With *needle*, files whose raw bytes do not contain it return None
+    without being decoded (UTF-8 keeps substrings, so they cannot match).
+    Newlines are translated as text-mode reads would.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if needle is not None and needle not in data:
+        return None
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def _read_notes(paths: list[str], needle: bytes | None = None) -> list[str | None]:
+    """Read *paths* concurrently, returning contents in input order.
+
+    Files without *needle* (see _read_note) come back as None.
+
+    Note reads are syscall-latency bound and release the GIL, so a small
+    thread pool overlaps them; parsing stays on the calling thread.
+    """
+    if len(paths) < 2:
+        return [_read_note(p, needle) for p in paths]
+    with ThreadPoolExecutor(max_workers=min(_READ_WORKERS, len(paths))) as pool:
+        return list(pool.map(_read_note, paths, [needle] * len(paths)))
+
+
+# Line boundaries recognised by str.splitlines(), so the regex sees the
+# same lines the per-line scan did.
+_EOL = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+# A line that is "# ..." after leading whitespace; group 1 is the rest.
+_H1_LINE = re.compile(rf"(?:\A|(?<=[{_EOL}]))[^\S{_EOL}]*# ([^{_EOL}]*)")
+
+
+@functools.lru_cache(maxsize=128)
+def _tag_pattern(tag: str) -> re.Pattern[str]:
+    """Compile the standalone-#tag matcher for *tag*.
+
+    A match starts at a line that is not a markdown heading ("# ..." or a
+    bare "#" after leading whitespace) and ends at #tag followed by a
+    non-alphanumeric character or end-of-line.
+    """
+    return re.compile(
+        rf"(?:\A|(?<=[{_EOL}]))"
+        rf"(?![^\S{_EOL}]*#(?: |[{_EOL}]|\Z))"
+        rf"[^{_EOL}]*?#{re.escape(tag)}(?![^\W_])"
+    )
+
+
 def _has_tag(content: str, tag: str) -> bool:
     """Check whether *content* contains #tag as a standalone tag."""
-    needle = f"#{tag}"
-    for line in content.splitlines():
-        # Skip markdown headings (lines starting with #)
-        stripped = line.lstrip()
-        if stripped.startswith("# ") or stripped == "#":
-            continue
-        idx = 0
-        while True:
-            pos = line.find(needle, idx)
-            if pos == -1:
-                break
-            end = pos + len(needle)
-            # Character after the tag must be whitespace, punctuation, or end-of-line
-            if end < len(line) and line[end].isalnum():
-                idx = end
-                continue
-            return True
-    return False
+    if f"#{tag}" not in content:
+        return False
+    return _tag_pattern(tag).search(content) is not None
 
 
 def _extract_title(content: str, fallback: str) -> str:
-    """Extract the first H1 heading from markdown content."""
-    for line in content.splitlines():
-        stripped = line.strip()
-        if stripped.startswith("# "):
-            return stripped[2:].strip()
+    """Extract the first H1 heading from markdown content.
+
+    Matches lines lazily, so a title on the first line costs nothing for
+    the rest of the note.
+    """
+    for m in _H1_LINE.finditer(content):
+        title = m.group(1).strip()
+        if title:
+            return title
     return fallback
@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
+import collections
+import functools
+import heapq
 import math
+import operator
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path, PurePosixPath
 
 from pydantic import Field
@@ -15,6 +21,7 @@ from kavi.skills.base import BaseSkill, SkillInput, SkillOutput
 VAULT_OUT = Path("vault_out")
 
 _SNIPPET_CHARS = 200
+_READ_WORKERS = 16
 
 
 # ---------------------------------------------------------------------------
@@ -57,6 +64,14 @@ class SearchNotesOutput(SkillOutput):
 # ---------------------------------------------------------------------------
 
 
+# Line boundaries recognised by str.splitlines(), so the regex sees the
+# same lines the per-line scan did.
+_EOL = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+# A line that is "# ..." after leading whitespace; group 1 is the rest.
+_H1_LINE = re.compile(rf"(?:\A|(?<=[{_EOL}]))[^\S{_EOL}]*# ([^{_EOL}]*)")
+
+
 def extract_title(md_text: str) -> str | None:
     """Return the first Markdown H1 heading as a single-line string, or None.
 
@@ -68,10 +83,9 @@ def extract_title(md_text: str) -> str | None:
     - Guaranteed single-line: real ``\\n``/``\\r`` and literal escape
       sequences (``\\\\n``, ``\\\\r``) are treated as title boundaries.
     """
-    for line in md_text.splitlines():
-        stripped = line.strip()
-        if stripped.startswith("# "):
-            title = stripped[2:].strip()
+    for m in _H1_LINE.finditer(md_text):
+        title = m.group(1).strip()
+        if title:
             # Enforce single-line — strip real newlines
             title = title.replace("\r", "").replace("\n", "")
             # Also truncate at literal escape sequences (files written with
@@ -85,24 +99,26 @@ def extract_title(md_text: str) -> str | None:
     return None
 
 
+@functools.lru_cache(maxsize=128)
+def _tag_pattern(tag: str) -> re.Pattern[str]:
+    """Compile the standalone-#tag matcher for *tag*.
+
+    A match starts at a line that is not a markdown heading ("# ..." or a
+    bare "#" after leading whitespace) and ends at #tag followed by a
+    non-alphanumeric character or end-of-line.
+    """
+    return re.compile(
+        rf"(?:\A|(?<=[{_EOL}]))"
+        rf"(?![^\S{_EOL}]*#(?: |[{_EOL}]|\Z))"
+        rf"[^{_EOL}]*?#{re.escape(tag)}(?![^\W_])"
+    )
+
+
 def _has_tag(content: str, tag: str) -> bool:
     """Check whether *content* contains #tag as a standalone tag."""
-    needle = f"#{tag}"
-    for line in content.splitlines():
-        stripped = line.lstrip()
-        if stripped.startswith("# ") or stripped == "#":
-            continue
-        idx = 0
-        while True:
-            pos = line.find(needle, idx)
-            if pos == -1:
-                break
-            end = pos + len(needle)
-            if end < len(line) and line[end].isalnum():
-                idx = end
-                continue
-            return True
-    return False
+    if f"#{tag}" not in content:
+        return False
+    return _tag_pattern(tag).search(content) is not None
 
 
 def _normalize_snippet(text: str) -> str:
@@ -115,36 +131,74 @@ def _normalize_snippet(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 
-def _snippet(content: str, query: str, length: int = _SNIPPET_CHARS) -> str:
-    """Return a snippet around the first occurrence of *query*, or the start."""
-    lower = content.lower()
-    q_lower = query.lower()
-    pos = lower.find(q_lower)
-    if pos == -1:
+def _query_pattern(query: str) -> re.Pattern[str]:
+    """Case-insensitive literal matcher for *query*, built once per search."""
+    return re.compile(re.escape(query), re.IGNORECASE)
+
+
+def _snippet(
+    content: str, query: str | re.Pattern[str], length: int = _SNIPPET_CHARS,
+) -> str:
+    """Return a snippet around the first occurrence of *query*, or the start.
+
+    The match is case-insensitive and stops at the first hit, without
+    lowercasing a copy of *content*; pass a _query_pattern to reuse it
+    across results.
+    """
+    if isinstance(query, str):
+        query = _query_pattern(query)
+    match = query.search(content)
+    if match is None:
         raw = content[:length].strip()
     else:
-        start = max(0, pos - length // 4)
+        start = max(0, match.start() - length // 4)
         raw = content[start : start + length].strip()
     return _normalize_snippet(raw)
 
 
 def _cosine_similarity(a: list[float], b: list[float]) -> float:
     """Compute cosine similarity between two vectors."""
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+    return _cosine_scores(a, [b])[0]
 
 
-def _lexical_score(content: str, query: str) -> float:
-    """Simple lexical ranking: fraction of query tokens found in content."""
-    tokens = query.lower().split()
-    if not tokens:
+def _cosine_scores(query: list[float], vectors: list[list[float]]) -> list[float]:
+    """Cosine similarity of *query* against each of *vectors*.
+
+    The query norm is computed once; dot products and norms run through
+    map(operator.mul) and math.hypot so the per-element work stays in C.
+    """
+    norm_q = math.hypot(*query)
+    if norm_q == 0:
+        return [0.0] * len(vectors)
+    scores: list[float] = []
+    for vec in vectors:
+        norm_v = math.hypot(*vec)
+        if norm_v == 0:
+            scores.append(0.0)
+        else:
+            scores.append(sum(map(operator.mul, query, vec)) / (norm_q * norm_v))
+    return scores
+
+
+def _query_tokens(query: str) -> dict[str, int]:
+    """Lowercased query tokens mapped to how often each appears."""
+    return collections.Counter(query.lower().split())
+
+
+def _lexical_score(content: str, query: str | dict[str, int]) -> float:
+    """Simple lexical ranking: fraction of query tokens found in content.
+
+    Tokens match as case-insensitive substrings. *query* may be a
+    _query_tokens result, so a search tokenizes it once for all notes;
+    each distinct token is looked up once and counts as often as it
+    appears in the query.
+    """
+    tokens = _query_tokens(query) if isinstance(query, str) else query
+    total = sum(tokens.values())
+    if not total:
         return 0.0
     lower = content.lower()
-    return sum(1 for t in tokens if t in lower) / len(tokens)
+    return sum(n for t, n in tokens.items() if t in lower) / total
 
 
 # ---------------------------------------------------------------------------
@@ -152,6 +206,75 @@ def _lexical_score(content: str, query: str) -> float:
 # ---------------------------------------------------------------------------
 
 
+def _walk_md(root: Path) -> list[tuple[str, str, bool]]:
+    """List ``*.md`` files under *root* as (path, relative_path, is_symlink).
+
+    An os.scandir walk: DirEntry caches the file type from the directory
+    read, so no per-file stat or Path objects are needed. Like
+    Path.rglob, symlinked directories are not descended into. Results
+    are sorted by path components, the order sorted(rglob(...)) gave.
+    """
+    found: list[tuple[str, str, bool]] = []
+    stack = [(os.fspath(root), "")]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    rel = prefix + entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if not entry.is_symlink():
+                            stack.append((entry.path, rel + os.sep))
+                    elif entry.name.endswith(".md"):
+                        found.append((entry.path, rel, entry.is_symlink()))
+        except OSError:
+            continue
+    found.sort(key=lambda f: f[1].split(os.sep))
+    return found
+
+
+def _read_note(path: str, needle: bytes | None = None) -> str | None:
+    """Read a note as UTF-8, or None if it cannot be read or decoded.
+
+    With *needle*, files whose raw bytes do not contain it return None
+    without being decoded (UTF-8 keeps substrings, so they cannot match).
+    Newlines are translated as text-mode reads would.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if needle is not None and needle not in data:
+        return None
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def _read_notes(paths: list[str], needle: bytes | None = None) -> list[str | None]:
+    """Read *paths* concurrently, returning contents in input order.
+
+    Files without *needle* (see _read_note) come back as None.
+
+    Note reads are syscall-latency bound and release the GIL, so a small
+    thread pool overlaps them; filtering and title extraction stay on the
+    calling thread.
+    """
+    if len(paths) < 2:
+        return [_read_note(p, needle) for p in paths]
+    with ThreadPoolExecutor(max_workers=min(_READ_WORKERS, len(paths))) as pool:
+        return list(pool.map(_read_note, paths, [needle] * len(paths)))
+
+
 def _enumerate_notes(
     max_chars: int,
     tag: str | None,
@@ -166,19 +289,22 @@ def _enumerate_notes(
     if not VAULT_OUT.exists():
         return entries, truncated
 
-    for md_file in sorted(VAULT_OUT.rglob("*.md")):
+    candidates: list[tuple[str, PurePosixPath]] = []
+    for md_file, rel_path, is_symlink in _walk_md(VAULT_OUT):
         # Skip symlinks
-        if md_file.is_symlink():
+        if is_symlink:
             continue
 
         # Reject paths with traversal
-        rel = PurePosixPath(md_file.relative_to(VAULT_OUT))
+        rel = PurePosixPath(rel_path)
         if ".." in rel.parts:
             continue
+        candidates.append((md_file, rel))
 
-        try:
-            content = md_file.read_text(encoding="utf-8")
-        except (OSError, UnicodeDecodeError):
+    needle = f"#{tag}".encode() if tag else None
+    contents = _read_notes([md_file for md_file, _ in candidates], needle)
+    for (_, rel), content in zip(candidates, contents):
+        if content is None:
             continue
 
         # Tag filter
@@ -241,22 +367,26 @@ class SearchNotesSkill(BaseSkill):
         # Try semantic search via Sparkstation embeddings
         error: str | None = None
         try:
-            scored = self._semantic_rank(query, entries, input_data.timeout_s)
+            scores = self._semantic_rank(query, entries, input_data.timeout_s)
             used_model = SPARK_EMBED_MODEL
         except SparkUnavailableError:
-            scored = self._lexical_rank(query, entries)
+            scores = self._lexical_rank(query, entries)
             used_model = "lexical-fallback"
             error = "SPARKSTATION_UNAVAILABLE"
 
-        # Sort descending by score, take top_k
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top = scored[: input_data.top_k]
+        # Top_k indices by descending score; ties keep vault order, as a
+        # stable sort would
+        top = heapq.nlargest(
+            input_data.top_k, range(len(scores)), key=scores.__getitem__,
+        )
 
+        pattern = _query_pattern(query) if input_data.include_snippet else None
         results: list[SearchResult] = []
-        for score, path, content, title in top:
-            snip = _snippet(content, query) if input_data.include_snippet else None
+        for i in top:
+            path, content, title = entries[i]
+            snip = _snippet(content, pattern) if pattern is not None else None
             results.append(
-                SearchResult(path=path, score=round(score, 4), title=title, snippet=snip)
+                SearchResult(path=path, score=round(scores[i], 4), title=title, snippet=snip)
             )
 
         return SearchNotesOutput(
@@ -272,27 +402,22 @@ class SearchNotesSkill(BaseSkill):
         query: str,
         entries: list[tuple[str, str, str | None]],
         timeout: float,
-    ) -> list[tuple[float, str, str, str | None]]:
-        """Rank entries by cosine similarity of bge-large embeddings."""
+    ) -> list[float]:
+        """Score entries by cosine similarity of bge-large embeddings.
+
+        Scores are returned in entry order; callers index *entries* with
+        them rather than carrying per-entry tuples around.
+        """
         texts = [content for _, content, _ in entries]
         all_texts = [query] + texts
         vectors = embed(all_texts, timeout=timeout)
-        query_vec = vectors[0]
-
-        scored: list[tuple[float, str, str, str | None]] = []
-        for i, (path, content, title) in enumerate(entries):
-            sim = _cosine_similarity(query_vec, vectors[i + 1])
-            scored.append((sim, path, content, title))
-        return scored
+        return _cosine_scores(vectors[0], vectors[1:])
 
     def _lexical_rank(
         self,
         query: str,
         entries: list[tuple[str, str, str | None]],
-    ) -> list[tuple[float, str, str, str | None]]:
-        """Rank entries by lexical substring match."""
-        scored: list[tuple[float, str, str, str | None]] = []
-        for path, content, title in entries:
-            score = _lexical_score(content, query)
-            scored.append((score, path, content, title))
-        return scored
+    ) -> list[float]:
+        """Score entries by lexical substring match, in entry order."""
+        tokens = _query_tokens(query)
+        return [_lexical_score(content, tokens) for _, content, _ in entries]
@@ -2,12 +2,30 @@
 
 from __future__ import annotations
 
+import atexit
+import hashlib
 import json
+import os
+import sqlite3
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path, PurePosixPath
 from typing import Literal
 
-from kavi.config import SPARK_MODEL
-from kavi.llm.spark import SparkError, SparkUnavailableError, generate
+from kavi.config import (
+    SPARK_MODEL,
+    SUMMARY_CACHE_DB,
+    SUMMARY_CACHE_MAX_ROWS,
+    SUMMARY_CACHE_TTL,
+)
+from kavi.llm.spark import (
+    NearMatchResponse,
+    SparkError,
+    SparkUnavailableError,
+    generate,
+)
 from kavi.skills.base import BaseSkill, SkillInput, SkillOutput
 
 VAULT_OUT = Path("vault_out")
@@ -25,6 +43,148 @@ _ERROR_CODES: dict[type, str] = {
 }
 
 
+# Successful summaries persisted across runs; any cache error is a miss,
+# never raised. Bump the version whenever the prompt changes. Rows expire
+# after SUMMARY_CACHE_TTL and the newest SUMMARY_CACHE_MAX_ROWS are kept,
+# so summaries of edited or deleted notes do not linger.
+_summary_cache_db = SUMMARY_CACHE_DB
+_SUMMARY_CACHE_VERSION = "1"
+
+# One connection per process, shared by execute_many's threads under the
+# lock; (path, None) records a cache that could not be opened.
+_summary_conn: tuple[Path, sqlite3.Connection | None] | None = None
+_summary_conn_lock = threading.Lock()
+
+
+@atexit.register
+def _close_summary_cache() -> None:
+    global _summary_conn
+    with _summary_conn_lock:
+        if _summary_conn is not None and _summary_conn[1] is not None:
+            _summary_conn[1].close()
+        _summary_conn = None
+
+
+def _summary_key(model: str, style: str, content: str) -> str:
+    h = hashlib.sha256(f"{_SUMMARY_CACHE_VERSION}\0{model}\0{style}\0".encode())
+    h.update(content.encode())
+    return h.hexdigest()
+
+
+def _open_summary_cache(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=5, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(summaries)")}
+        if columns and "created_at" not in columns:
+            # Table from before expiry existed: its rows have no age, drop them
+            conn.execute("DROP TABLE summaries")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries"
+            " (key TEXT PRIMARY KEY, summary TEXT NOT NULL,"
+            " key_points TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.commit()
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def _summary_cache_conn(path: Path) -> sqlite3.Connection | None:
+    """Return this process's connection to *path*; call with the lock held."""
+    global _summary_conn
+    if _summary_conn is not None and _summary_conn[0] == path:
+        return _summary_conn[1]
+    if _summary_conn is not None and _summary_conn[1] is not None:
+        _summary_conn[1].close()
+    try:
+        conn: sqlite3.Connection | None = _open_summary_cache(path)
+    except (sqlite3.Error, OSError):
+        conn = None
+    _summary_conn = (path, conn)
+    return conn
+
+
+def _summary_cache_get(path: Path, key: str) -> tuple[str, list[str]] | None:
+    cutoff = time.time() - SUMMARY_CACHE_TTL
+    try:
+        with _summary_conn_lock:
+            conn = _summary_cache_conn(path)
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT summary, key_points FROM summaries"
+                " WHERE key = ? AND created_at >= ?",
+                (key, cutoff),
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+def _summary_cache_put(
+    path: Path, key: str, summary: str, key_points: list[str],
+) -> None:
+    now = time.time()
+    try:
+        with _summary_conn_lock:
+            conn = _summary_cache_conn(path)
+            if conn is None:
+                return
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)",
+                    (key, summary, json.dumps(key_points), now),
+                )
+                conn.execute(
+                    "DELETE FROM summaries WHERE created_at < ?",
+                    (now - SUMMARY_CACHE_TTL,),
+                )
+                conn.execute(
+                    "DELETE FROM summaries WHERE key IN (SELECT key FROM summaries"
+                    " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (SUMMARY_CACHE_MAX_ROWS,),
+                )
+    except sqlite3.Error:
+        pass
+
+
+# Exception class -> error code, filled lazily by _classify.
+_code_by_type: dict[type, str] = {}
+
+
+def _classify(exc_type: type) -> str:
+    """Error code for an exception class, resolved once per class.
+
+    Exact entries win; otherwise the first _ERROR_CODES base it subclasses
+    (e.g. a SparkError subclass → SPARKSTATION_ERROR).
+    """
+    code = _code_by_type.get(exc_type)
+    if code is None:
+        code = _ERROR_CODES.get(exc_type)
+        if code is None:
+            code = next(
+                (c for cls, c in _ERROR_CODES.items() if issubclass(exc_type, cls)),
+                "SPARKSTATION_UNKNOWN",
+            )
+        _code_by_type[exc_type] = code
+    return code
+
+
+# System prompt per style, built once instead of formatted on every call.
+_SYSTEM_PROMPTS: dict[str, str] = {
+    style: (
+        f"Summarize the following markdown note in {style} style.\n"
+        "Return ONLY a JSON object with keys:\n"
+        '- "summary": a string summary\n'
+        '- "key_points": a list of strings with key points'
+    )
+    for style in ("bullet", "paragraph")
+}
+
+
 class SummarizeNoteInput(SkillInput):
     """Input for summarize_note skill."""
 
@@ -54,6 +214,20 @@ class SummarizeNoteSkill(BaseSkill):
     output_model = SummarizeNoteOutput
     side_effect_class = "READ_ONLY"
 
+    def execute_many(
+        self, inputs: list[SummarizeNoteInput], *, max_workers: int = 8,
+    ) -> list[SummarizeNoteOutput]:
+        """Summarize several notes concurrently; outputs are in input order.
+
+        Each note still goes through execute(); up to max_workers of them
+        wait on Sparkstation at once instead of one after another. An
+        invalid path raises as execute() would, for the first such input.
+        """
+        if len(inputs) < 2:
+            return [self.execute(inp) for inp in inputs]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(inputs))) as pool:
+            return list(pool.map(self.execute, inputs))
+
     def execute(self, input_data: SummarizeNoteInput) -> SummarizeNoteOutput:  # type: ignore[override]
         path_str = input_data.path
         rel = PurePosixPath(path_str)
@@ -65,33 +239,44 @@ class SummarizeNoteSkill(BaseSkill):
 
         target = VAULT_OUT / rel
 
-        # Reject symlinks
-        if target.is_symlink():
+        # One lstat answers both: reject symlinks, then anything that is
+        # not an existing regular file
+        try:
+            mode = os.lstat(target).st_mode
+        except OSError:
+            mode = 0
+        if stat.S_ISLNK(mode):
             msg = f"Symlinks not allowed: {path_str}"
             raise ValueError(msg)
-
-        # Reject non-existent files
-        if not target.is_file():
+        if not stat.S_ISREG(mode):
             msg = f"File not found: {path_str}"
             raise ValueError(msg)
 
-        # Read file content
-        content = target.read_text(encoding="utf-8")
+        # Read at most one character past max_chars — enough to tell
+        # whether the note was truncated without loading all of it
+        with open(target, encoding="utf-8") as f:
+            content = f.read(input_data.max_chars + 1)
         truncated = len(content) > input_data.max_chars
         if truncated:
             content = content[: input_data.max_chars]
 
+        # Same model, style and text summarized before: reuse it
+        cache = _summary_cache_db
+        cache_key = _summary_key(SPARK_MODEL, input_data.style, content)
+        if cache is not None:
+            hit = _summary_cache_get(cache, cache_key)
+            if hit is not None:
+                return SummarizeNoteOutput(
+                    path=path_str,
+                    summary=hit[0],
+                    key_points=hit[1],
+                    truncated=truncated,
+                    used_model=SPARK_MODEL,
+                )
+
         # Build LLM messages (D019: role-separated)
         messages: list[dict[str, str]] = [
-            {
-                "role": "system",
-                "content": (
-                    f"Summarize the following markdown note in {input_data.style} style.\n"
-                    "Return ONLY a JSON object with keys:\n"
-                    '- "summary": a string summary\n'
-                    '- "key_points": a list of strings with key points'
-                ),
-            },
+            {"role": "system", "content": _SYSTEM_PROMPTS[input_data.style]},
             {"role": "user", "content": content},
         ]
 
@@ -101,6 +286,9 @@ class SummarizeNoteSkill(BaseSkill):
             parsed = json.loads(raw)
             summary = str(parsed["summary"])
             key_points = [str(kp) for kp in parsed["key_points"]]
+            # A near match was written for another note: serve it, never persist it
+            if cache is not None and not isinstance(raw, NearMatchResponse):
+                _summary_cache_put(cache, cache_key, summary, key_points)
             return SummarizeNoteOutput(
                 path=path_str,
                 summary=summary,
@@ -112,15 +300,7 @@ class SummarizeNoteSkill(BaseSkill):
             SparkUnavailableError, SparkError, json.JSONDecodeError, KeyError, TypeError,
         ) as exc:
             fallback_text = content[:_FALLBACK_CHARS]
-            code = _ERROR_CODES.get(type(exc))
-            if code is None:
-                # Walk MRO for subclass matches (e.g. SparkUnavailableError → SparkError)
-                for cls, c in _ERROR_CODES.items():
-                    if isinstance(exc, cls):
-                        code = c
-                        break
-                else:
-                    code = "SPARKSTATION_UNKNOWN"
+            code = _classify(type(exc))
             return SummarizeNoteOutput(
                 path=path_str,
                 summary=f"{_FALLBACK_PREFIX}{fallback_text}",
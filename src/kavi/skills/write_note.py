@@ -3,12 +3,24 @@
 from __future__ import annotations
 
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path, PurePosixPath
 
 from kavi.skills.base import BaseSkill, SkillInput, SkillOutput
 
 VAULT_OUT = Path("vault_out")
 
+# Batches smaller than this are written with plain execute() calls
+_PARALLEL_HASH_MIN = 8
+
+# execute() writes and hashes the content in chunks of this size
+_WRITE_CHUNK = 64 * 1024
+
+# Parent directories already created, so repeat writes into the same folder
+# skip mkdir. A stale entry (directory removed since) is dropped on the
+# FileNotFoundError it causes and the write retried once.
+_made_dirs: set[Path] = set()
+
 
 class WriteNoteInput(SkillInput):
     """Input for write_note skill."""
@@ -35,18 +47,74 @@ class WriteNoteSkill(BaseSkill):
     side_effect_class = "FILE_WRITE"
 
     def execute(self, input_data: WriteNoteInput) -> WriteNoteOutput:  # type: ignore[override]
+        return self._write(input_data, _render(input_data), None)
+
+    def execute_many(
+        self, inputs: list[WriteNoteInput], *, max_workers: int = 8,
+    ) -> list[WriteNoteOutput]:
+        """Write several notes; outputs are in input order.
+
+        From _PARALLEL_HASH_MIN notes up, contents are hashed on a thread
+        pool (hashlib releases the GIL on large buffers, so hashes run on
+        separate cores). Files are still written one at a time in input
+        order, so a repeated path ends with the last note, and an invalid
+        path raises after the notes before it are written, as a loop of
+        execute() would.
+        """
+        if len(inputs) < _PARALLEL_HASH_MIN:
+            return [self.execute(inp) for inp in inputs]
+        contents = [_render(inp) for inp in inputs]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(inputs))) as pool:
+            hashes = pool.map(_sha256_hex, contents)
+            return [
+                self._write(inp, content, sha)
+                for inp, content, sha in zip(inputs, contents, hashes)
+            ]
+
+    def _write(
+        self, input_data: WriteNoteInput, content_bytes: bytes, sha: str | None,
+    ) -> WriteNoteOutput:
+        """Write *content_bytes* under VAULT_OUT.
+
+        With no precomputed *sha*, each chunk is hashed as it is written,
+        so the content is read from memory once rather than twice.
+        """
         rel = PurePosixPath(input_data.path)
         if rel.is_absolute() or ".." in rel.parts:
             msg = f"Invalid path: {input_data.path}"
             raise ValueError(msg)
 
         dest = VAULT_OUT / rel
-        dest.parent.mkdir(parents=True, exist_ok=True)
+        parent = dest.parent
+        if parent not in _made_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            _made_dirs.add(parent)
+        try:
+            f = open(dest, "wb")
+        except FileNotFoundError:
+            _made_dirs.discard(parent)
+            parent.mkdir(parents=True, exist_ok=True)
+            _made_dirs.add(parent)
+            f = open(dest, "wb")
+        with f:
+            if sha is None:
+                h = hashlib.sha256()
+                view = memoryview(content_bytes)
+                for i in range(0, len(view), _WRITE_CHUNK):
+                    chunk = view[i:i + _WRITE_CHUNK]
+                    f.write(chunk)
+                    h.update(chunk)
+                sha = h.hexdigest()
+            else:
+                f.write(content_bytes)
 
-        content = f"# {input_data.title}\n\n{input_data.body}\n"
-        content_bytes = content.encode()
-        dest.write_bytes(content_bytes)
+        return WriteNoteOutput(written_path=str(dest), sha256=sha)
 
-        sha = hashlib.sha256(content_bytes).hexdigest()
 
-        return WriteNoteOutput(written_path=str(dest), sha256=sha)
+def _render(input_data: WriteNoteInput) -> bytes:
+    """Encode the note file content for *input_data*."""
+    return f"# {input_data.title}\n\n{input_data.body}\n".encode()
+
+
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
@@ -219,6 +219,43 @@ class TestSafeCopyBack:
                 ["../../../etc/shadow"],
             )
 
+    def test_rejects_symlinked_destination_into_sibling(self, tmp_path: Path) -> None:
+        sandbox = tmp_path / "sandbox"
+        (sandbox / "src" / "kavi" / "skills").mkdir(parents=True)
+        (sandbox / "src" / "kavi" / "skills" / "ok.py").write_text("# fine")
+
+        project = tmp_path / "project"
+        project.mkdir()
+        # Sibling whose name shares the project's string prefix
+        sibling = tmp_path / "project-evil"
+        sibling.mkdir()
+        os.symlink(str(sibling), str(project / "src"))
+
+        with pytest.raises(ValueError, match="traversal"):
+            _safe_copy_back(
+                sandbox, project,
+                ["src/kavi/skills/ok.py"],
+            )
+        assert not (sibling / "kavi").exists()
+
+    def test_rejects_symlinked_destination_file(self, tmp_path: Path) -> None:
+        sandbox = tmp_path / "sandbox"
+        (sandbox / "src" / "kavi" / "skills").mkdir(parents=True)
+        (sandbox / "src" / "kavi" / "skills" / "ok.py").write_text("# fine")
+
+        project = tmp_path / "project"
+        (project / "src" / "kavi" / "skills").mkdir(parents=True)
+        outside = tmp_path / "outside.py"
+        outside.write_text("# untouched")
+        os.symlink(str(outside), str(project / "src" / "kavi" / "skills" / "ok.py"))
+
+        with pytest.raises(ValueError, match="traversal"):
+            _safe_copy_back(
+                sandbox, project,
+                ["src/kavi/skills/ok.py"],
+            )
+        assert outside.read_text() == "# untouched"
+
     def test_copies_normal_files(self, tmp_path: Path) -> None:
         sandbox = tmp_path / "sandbox"
         (sandbox / "src" / "kavi" / "skills").mkdir(parents=True)
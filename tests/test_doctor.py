@@ -77,6 +77,11 @@ class TestConfigPaths:
         assert result.status == "fail"
         assert "mkdir" in (result.remediation or "")
 
+    def test_vault_is_a_file(self, tmp_path: Path) -> None:
+        vault = tmp_path / "vault_out"
+        vault.write_text("")
+        assert check_vault_path(vault).status == "fail"
+
     def test_registry_exists(self, tmp_path: Path) -> None:
         reg = tmp_path / "registry.yaml"
         reg.write_text("skills: []")
@@ -253,6 +258,85 @@ class TestRegistryIntegrity:
         assert broken[0].status == "fail"
         assert "import failed" in broken[0].message
 
+    def test_many_skills_keep_registry_order(self, tmp_path: Path) -> None:
+        import hashlib
+
+        entries = []
+        modules = {}
+        for i in range(5):
+            src = tmp_path / f"s{i}.py"
+            src.write_text(f"# skill {i}\n")
+            good = hashlib.sha256(src.read_bytes()).hexdigest()
+            entries.append(
+                f"- name: s{i}\n  module_path: pkg.s{i}.Cls\n"
+                f"  hash: {good if i != 2 else 'bad'}\n"
+            )
+            mod = MagicMock()
+            mod.__file__ = str(src) if i != 4 else str(tmp_path / "gone.py")
+            modules[f"pkg.s{i}"] = mod
+        reg = tmp_path / "registry.yaml"
+        reg.write_text("skills:\n" + "".join(entries))
+
+        with patch(
+            "kavi.ops.doctor.importlib.import_module", side_effect=modules.__getitem__,
+        ):
+            results = check_registry_integrity(reg)
+
+        skill_results = [r for r in results if r.name.startswith("skill_")]
+        assert [r.name for r in skill_results] == [f"skill_s{i}" for i in range(5)]
+        assert [r.status for r in skill_results] == ["ok", "ok", "fail", "ok", "fail"]
+        assert "cannot read source file" in skill_results[4].message
+
+    def test_modules_imported_serially_on_calling_thread(self, tmp_path: Path) -> None:
+        import threading
+
+        reg = tmp_path / "registry.yaml"
+        reg.write_text("skills:\n" + "".join(
+            f"- name: s{i}\n  module_path: pkg.s{i}.Cls\n  hash: abc\n" for i in range(4)
+        ))
+        threads: list[int] = []
+
+        def fake_import(name: str) -> MagicMock:
+            threads.append(threading.get_ident())
+            mod = MagicMock()
+            mod.__file__ = str(tmp_path / f"{name}.py")
+            return mod
+
+        with patch("kavi.ops.doctor.importlib.import_module", side_effect=fake_import):
+            check_registry_integrity(reg)
+
+        assert threads == [threading.get_ident()] * 4
+
+    def test_shared_module_imported_and_hashed_once(self, tmp_path: Path) -> None:
+        import hashlib
+
+        src = tmp_path / "shared.py"
+        src.write_text("# two skills\n")
+        digest = hashlib.sha256(src.read_bytes()).hexdigest()
+        reg = tmp_path / "registry.yaml"
+        reg.write_text(
+            "skills:\n"
+            f"- name: a\n  module_path: pkg.shared.A\n  hash: {digest}\n"
+            f"- name: b\n  module_path: pkg.shared.B\n  hash: {digest}\n"
+        )
+        fake_mod = MagicMock()
+        fake_mod.__file__ = str(src)
+
+        with (
+            patch(
+                "kavi.ops.doctor.hashlib.file_digest", wraps=hashlib.file_digest,
+            ) as digest_fn,
+            patch(
+                "kavi.ops.doctor.importlib.import_module", return_value=fake_mod,
+            ) as imp,
+        ):
+            results = check_registry_integrity(reg)
+
+        imp.assert_called_once_with("pkg.shared")
+        digest_fn.assert_called_once()
+        statuses = {r.name: r.status for r in results}
+        assert statuses["skill_a"] == statuses["skill_b"] == "ok"
+
 
 # ---------------------------------------------------------------------------
 # Check 3: Sparkstation
@@ -260,16 +344,14 @@ class TestRegistryIntegrity:
 
 
 class TestSparkstation:
-    @patch("kavi.ops.doctor.OpenAI")
-    def test_spark_reachable(self, mock_cls: MagicMock) -> None:
-        mock_client = MagicMock()
-        mock_cls.return_value = mock_client
+    @patch("kavi.ops.doctor.is_available", return_value=True)
+    def test_spark_reachable(self, mock_available: MagicMock) -> None:
         result = check_sparkstation("http://localhost:8000/v1", timeout=0.5)
         assert result.status == "ok"
+        mock_available.assert_called_once_with("http://localhost:8000/v1", timeout=0.5)
 
-    @patch("kavi.ops.doctor.OpenAI")
-    def test_spark_unreachable(self, mock_cls: MagicMock) -> None:
-        mock_cls.side_effect = Exception("Connection refused")
+    @patch("kavi.ops.doctor.is_available", return_value=False)
+    def test_spark_unreachable(self, mock_available: MagicMock) -> None:
         result = check_sparkstation("http://localhost:8000/v1", timeout=0.5)
         assert result.status == "warn"
         assert "unreachable" in result.message.lower()
@@ -296,6 +378,31 @@ class TestToolchain:
         # We're running on 3.12+, so should be ok
         assert py[0].status == "ok"
 
+    def test_ruff_from_distribution_metadata(self) -> None:
+        from kavi.ops.doctor import check_toolchain
+
+        with patch("kavi.ops.doctor.importlib.metadata.version", return_value="0.9.1"):
+            results = check_toolchain()
+        ruff = [r for r in results if r.name == "ruff"]
+        assert ruff[0].status == "ok"
+        assert "0.9.1" in ruff[0].message
+
+    def test_ruff_missing_warns(self) -> None:
+        import importlib.metadata
+
+        from kavi.ops.doctor import check_toolchain
+
+        with (
+            patch(
+                "kavi.ops.doctor.importlib.metadata.version",
+                side_effect=importlib.metadata.PackageNotFoundError("ruff"),
+            ),
+            patch("kavi.ops.doctor.shutil.which", return_value=None),
+        ):
+            results = check_toolchain()
+        ruff = [r for r in results if r.name == "ruff"]
+        assert ruff[0].status == "warn"
+
 
 # ---------------------------------------------------------------------------
 # Check 5: Log sanity
@@ -345,6 +452,19 @@ class TestLogSanity:
         assert result.status == "ok"
         assert "1 with record_version" in result.message
 
+    def test_blank_bad_utf8_and_non_object_lines(self, tmp_path: Path) -> None:
+        log = tmp_path / "executions.jsonl"
+        log.write_bytes(
+            b'{"v": 1}\r\n'
+            b"\n   \n"
+            b'{"skill_name": "\xff\xfe"}\n'
+            b"[1, 2]\n"
+            b'{"v": 1}'  # no trailing newline
+        )
+        result = check_log_sanity(log)
+        assert result.status == "warn"
+        assert "3 valid, 1 malformed line(s) of 4 total" in result.message
+
 
 # ---------------------------------------------------------------------------
 # Integration: run_all_checks
@@ -393,3 +513,40 @@ class TestRunAllChecks:
         vault_check = [c for c in report.checks if c.name == "vault_path"][0]
         assert vault_check.status == "fail"
         assert "mkdir" in (vault_check.remediation or "")
+
+    def test_checks_run_concurrently_in_fixed_order(self, tmp_path: Path) -> None:
+        import threading
+
+        vault = tmp_path / "vault_out"
+        vault.mkdir()
+        reg = tmp_path / "registry.yaml"
+        reg.write_text("skills: []\n")
+        log = tmp_path / "executions.jsonl"
+        # Spark and the log check must overlap or the barrier times out
+        barrier = threading.Barrier(2, timeout=5)
+
+        def slow_spark(base_url: str, timeout: float) -> bool:
+            barrier.wait()
+            return True
+
+        real_log_sanity = check_log_sanity
+
+        def log_sanity(path: Path):
+            barrier.wait()
+            return real_log_sanity(path)
+
+        with (
+            patch("kavi.ops.doctor.is_available", side_effect=slow_spark),
+            patch("kavi.ops.doctor.check_log_sanity", side_effect=log_sanity),
+        ):
+            report = run_all_checks(
+                vault_out=vault, registry_path=reg, log_path=log,
+                spark_base_url="http://spark/v1",
+            )
+
+        names = [c.name for c in report.checks]
+        assert names[:4] == [
+            "vault_path", "registry_path", "execution_log", "registry_parse",
+        ]
+        assert names.index("sparkstation") < names.index("python_version")
+        assert names[-1] == "log_sanity"
@@ -7,6 +7,7 @@ Fast tests use StubRunner (no subprocesses).
 One slow integration test uses SubprocessRunner (real tools).
 """
 
+import threading
 from pathlib import Path
 
 import pytest
@@ -203,6 +204,16 @@ class TestFullForgeFlow:
         assert Path(artifact.path).exists()
         assert "write_note" in Path(artifact.path).read_text()
 
+    def test_propose_rejects_invalid_schema_json(self, db, artifacts_dir):
+        with pytest.raises(ValueError):
+            propose_skill(
+                db, name="write_note", description="Write a note",
+                io_schema_json="{not json",
+                side_effect_class=SideEffectClass.FILE_WRITE,
+                output_dir=artifacts_dir,
+            )
+        assert list(artifacts_dir.iterdir()) == []
+
     def test_build_creates_packet(self, db, artifacts_dir):
         proposal, _ = propose_skill(
             db, name="write_note", description="Write a note",
@@ -328,6 +339,112 @@ class TestFullForgeFlow:
         assert verification.ruff_ok is False
         assert verification.status == VerificationStatus.FAILED
 
+    def test_verify_runs_tool_checks_concurrently(
+        self, db, artifacts_dir, skill_file, policy, tmp_path,
+    ):
+        proposal, _ = propose_skill(
+            db, name="write_note", description="Write a note",
+            io_schema_json=IO_SCHEMA,
+            side_effect_class=SideEffectClass.FILE_WRITE,
+            output_dir=artifacts_dir,
+        )
+        build, _ = build_skill(
+            db, proposal_id=proposal.id, output_dir=artifacts_dir,
+        )
+        mark_build_succeeded(db, build.id)
+
+        # Each tool waits for the other two; a sequential verify would
+        # break the barrier on timeout.
+        barrier = threading.Barrier(3, timeout=5)
+
+        class BarrierRunner(StubRunner):
+            def run_ruff(self, skill_file: Path, cwd: Path) -> CheckResult:
+                barrier.wait()
+                return CheckResult(ok=True)
+
+            def run_mypy(self, skill_file: Path, cwd: Path) -> CheckResult:
+                barrier.wait()
+                return CheckResult(ok=True)
+
+            def run_pytest(self, cwd: Path) -> CheckResult:
+                barrier.wait()
+                return CheckResult(ok=True)
+
+        verification, _ = verify_skill(
+            db, proposal_id=proposal.id,
+            policy=policy, output_dir=artifacts_dir,
+            project_root=tmp_path, runner=BarrierRunner(),
+        )
+        assert verification.status == VerificationStatus.PASSED
+
+    def test_verify_fail_fast_skips_expensive_checks(
+        self, db, artifacts_dir, skill_file, policy, tmp_path,
+    ):
+        from kavi.forge.research import FailureKind, classify_failure
+
+        proposal, _ = propose_skill(
+            db, name="write_note", description="Write a note",
+            io_schema_json=IO_SCHEMA,
+            side_effect_class=SideEffectClass.FILE_WRITE,
+            output_dir=artifacts_dir,
+        )
+        build, _ = build_skill(
+            db, proposal_id=proposal.id, output_dir=artifacts_dir,
+        )
+        mark_build_succeeded(db, build.id)
+
+        calls: list[str] = []
+
+        class RecordingRunner(StubRunner):
+            def run_mypy(self, skill_file: Path, cwd: Path) -> CheckResult:
+                calls.append("mypy")
+                return CheckResult(ok=True)
+
+            def run_pytest(self, cwd: Path) -> CheckResult:
+                calls.append("pytest")
+                return CheckResult(ok=True)
+
+        verification, report = verify_skill(
+            db, proposal_id=proposal.id,
+            policy=policy, output_dir=artifacts_dir,
+            project_root=tmp_path, runner=RecordingRunner(ruff_ok=False),
+            fail_fast=True,
+        )
+        assert calls == []
+        assert verification.status == VerificationStatus.FAILED
+        assert verification.policy_ok is True
+        assert verification.invariant_ok is True
+        assert verification.mypy_ok is False
+        assert verification.pytest_ok is False
+        assert "- pytest: SKIP (ruff failed)" in Path(report.path).read_text()
+
+        build_row = build.model_copy(update={"status": BuildStatus.SUCCEEDED})
+        assert classify_failure(build_row, "", verification).kind == FailureKind.VERIFY_LINT
+
+    def test_verify_fail_fast_runs_all_when_ruff_passes(
+        self, db, artifacts_dir, skill_file, policy, tmp_path,
+    ):
+        proposal, _ = propose_skill(
+            db, name="write_note", description="Write a note",
+            io_schema_json=IO_SCHEMA,
+            side_effect_class=SideEffectClass.FILE_WRITE,
+            output_dir=artifacts_dir,
+        )
+        build, _ = build_skill(
+            db, proposal_id=proposal.id, output_dir=artifacts_dir,
+        )
+        mark_build_succeeded(db, build.id)
+
+        verification, _ = verify_skill(
+            db, proposal_id=proposal.id,
+            policy=policy, output_dir=artifacts_dir,
+            project_root=tmp_path, runner=StubRunner(pytest_ok=False),
+            fail_fast=True,
+        )
+        assert verification.ruff_ok is True
+        assert verification.pytest_ok is False
+        assert verification.status == VerificationStatus.FAILED
+
     def test_promote_updates_registry(
         self, db, artifacts_dir, skill_file, policy, registry_path, tmp_path,
     ):
@@ -468,6 +585,155 @@ class TestFullForgeFlow:
             load_skill(registry_path, "write_note")
 
 
+class TestSkillHash:
+    def test_hash_matches_sha256_and_tracks_edits(self, tmp_path):
+        import hashlib
+        import os
+
+        from kavi.forge.promote import _compute_skill_hash
+
+        f = tmp_path / "skill.py"
+        f.write_text("x = 1\n")
+        assert _compute_skill_hash(f) == hashlib.sha256(b"x = 1\n").hexdigest()
+
+        f.write_text("x = 22\n")
+        st = f.stat()
+        os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert _compute_skill_hash(f) == hashlib.sha256(b"x = 22\n").hexdigest()
+
+
+PACKET = "\n".join(f"- requirement {i}" for i in range(20)) + "\n"
+
+
+class TestEscalationTriggers:
+    def _triggers(self, db, original: str, proposed: str):
+        from kavi.forge.research import (
+            FailureAnalysis,
+            FailureKind,
+            _check_escalation_triggers,
+        )
+
+        analysis = FailureAnalysis(kind=FailureKind.VERIFY_LINT, build_id="none")
+        return _check_escalation_triggers(
+            db, analysis=analysis,
+            original_packet=original, proposed_packet=proposed,
+        )
+
+    def test_identical_packet_no_large_diff(self, db):
+        from kavi.forge.research import EscalationTrigger
+
+        assert EscalationTrigger.LARGE_DIFF not in self._triggers(db, PACKET, PACKET)
+
+    def test_small_edit_no_large_diff(self, db):
+        from kavi.forge.research import EscalationTrigger
+
+        proposed = "- new first line\n" + PACKET.replace("requirement 3", "req three")
+        assert EscalationTrigger.LARGE_DIFF not in self._triggers(db, PACKET, proposed)
+
+    def test_rewrite_is_large_diff(self, db):
+        from kavi.forge.research import EscalationTrigger
+
+        proposed = "\n".join(f"- rewritten {i}" for i in range(20))
+        assert EscalationTrigger.LARGE_DIFF in self._triggers(db, PACKET, proposed)
+
+    def test_appending_as_many_lines_is_large_diff(self, db):
+        from kavi.forge.research import EscalationTrigger
+
+        original = "\n".join(f"- requirement {i}" for i in range(10)) + "\n"
+        proposed = original + "\n".join(f"- extra {i}" for i in range(10)) + "\n"
+        assert EscalationTrigger.LARGE_DIFF in self._triggers(db, original, proposed)
+
+    def test_deleting_most_lines_is_large_diff(self, db):
+        from kavi.forge.research import EscalationTrigger
+
+        original = "\n".join(f"- requirement {i}" for i in range(10)) + "\n"
+        proposed = "\n".join(f"- requirement {i}" for i in range(4)) + "\n"
+        assert EscalationTrigger.LARGE_DIFF in self._triggers(db, original, proposed)
+
+    def test_deleting_a_few_lines_no_large_diff(self, db):
+        from kavi.forge.research import EscalationTrigger
+
+        original = "\n".join(f"- requirement {i}" for i in range(10)) + "\n"
+        proposed = "\n".join(f"- requirement {i}" for i in range(6)) + "\n"
+        assert EscalationTrigger.LARGE_DIFF not in self._triggers(db, original, proposed)
+
+    def test_new_keyword_is_permission_widening(self, db):
+        from kavi.forge.research import EscalationTrigger
+
+        proposed = PACKET + "- Side effect: NETWORK\n"
+        assert EscalationTrigger.PERMISSION_WIDENING in self._triggers(
+            db, PACKET, proposed,
+        )
+
+    def test_existing_keyword_is_not_widening(self, db):
+        from kavi.forge.research import EscalationTrigger
+
+        original = PACKET + "- reads a Secret\n"
+        proposed = PACKET + "- reads a secret key\n"
+        assert EscalationTrigger.PERMISSION_WIDENING not in self._triggers(
+            db, original, proposed,
+        )
+
+
+class TestAdviseRetry:
+    def test_security_class_skips_llm(self, db, artifacts_dir, monkeypatch):
+        import kavi.llm.spark as spark
+        from kavi.forge.research import (
+            EscalationTrigger,
+            FailureAnalysis,
+            FailureKind,
+            advise_retry,
+        )
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("Sparkstation must not be contacted")
+
+        monkeypatch.setattr(spark, "is_available", _fail)
+        monkeypatch.setattr(spark, "generate", _fail)
+
+        analysis = FailureAnalysis(kind=FailureKind.VERIFY_POLICY, build_id="none")
+        proposed, triggers = advise_retry(
+            db, analysis=analysis, original_packet=PACKET, output_dir=artifacts_dir,
+        )
+        assert proposed == PACKET
+        assert triggers == [EscalationTrigger.SECURITY_CLASS]
+
+    def test_clean_analysis_calls_llm(self, db, artifacts_dir, monkeypatch):
+        import kavi.llm.spark as spark
+        from kavi.forge.research import FailureAnalysis, FailureKind, advise_retry
+
+        monkeypatch.setattr(spark, "is_available", lambda: True)
+        monkeypatch.setattr(spark, "generate", lambda messages, **kw: PACKET)
+
+        analysis = FailureAnalysis(kind=FailureKind.VERIFY_LINT, build_id="none")
+        proposed, triggers = advise_retry(
+            db, analysis=analysis, original_packet=PACKET, output_dir=artifacts_dir,
+        )
+        assert proposed == PACKET
+        assert triggers == []
+
+
+    def test_near_match_proposal_escalates(self, db, artifacts_dir, monkeypatch):
+        import kavi.llm.spark as spark
+        from kavi.forge.research import (
+            EscalationTrigger,
+            FailureAnalysis,
+            FailureKind,
+            advise_retry,
+        )
+
+        monkeypatch.setattr(spark, "is_available", lambda: True)
+        monkeypatch.setattr(
+            spark, "generate", lambda messages, **kw: spark.NearMatchResponse(PACKET),
+        )
+
+        analysis = FailureAnalysis(kind=FailureKind.VERIFY_LINT, build_id="none")
+        _, triggers = advise_retry(
+            db, analysis=analysis, original_packet=PACKET, output_dir=artifacts_dir,
+        )
+        assert triggers == [EscalationTrigger.AMBIGUOUS]
+
+
 class TestRetryFlow:
     """Test the iteration/retry flow: propose → build(fail) → research → build(succeed).
 
@@ -590,6 +856,29 @@ class TestRetryFlow:
         analysis = classify_failure(build, "")
         assert analysis.kind == FailureKind.TIMEOUT
 
+    def test_read_log_bounded_keeps_head_and_tail(self, tmp_path):
+        """Large build logs are read as head + tail; the gate section survives."""
+        from kavi.forge.research import _LOG_READ_HEAD, _read_log_bounded
+
+        log = tmp_path / "build_log.md"
+        log.write_text(
+            "## Exit code: 1\n"
+            + "x" * (_LOG_READ_HEAD * 4)
+            + "\n- Violations: ['pyproject.toml']\n"
+        )
+        text = _read_log_bounded(log)
+        assert len(text) < _LOG_READ_HEAD * 2
+        assert text.startswith("## Exit code: 1")
+        assert "... (truncated)" in text
+        assert "Violations: ['pyproject.toml']" in text
+
+    def test_read_log_bounded_small_log_unchanged(self, tmp_path):
+        from kavi.forge.research import _read_log_bounded
+
+        log = tmp_path / "build_log.md"
+        log.write_text("## Exit code: 0\nok\n")
+        assert _read_log_bounded(log) == "## Exit code: 0\nok\n"
+
 
 @pytest.mark.slow
 class TestVerifyIntegration:
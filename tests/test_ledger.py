@@ -1,32 +1,47 @@
 """Tests for ledger schema and CRUD operations."""
 
+import sqlite3
 from pathlib import Path
 
 import pytest
 
-from kavi.ledger.db import init_db
+from kavi.ledger.db import (
+    SCHEMA_VERSION,
+    close,
+    ensure_schema,
+    get_connection,
+    init_db,
+    optimize,
+    transaction,
+)
 from kavi.ledger.models import (
     Artifact,
     ArtifactKind,
     Build,
     BuildStatus,
     Promotion,
+    ProposalRow,
     ProposalStatus,
     SideEffectClass,
     SkillProposal,
     Verification,
     VerificationStatus,
+    count_failed_builds,
+    find_build_log_artifact,
     get_artifacts_for_related,
     get_build,
     get_builds_for_proposal,
     get_latest_verification,
     get_proposal,
     insert_artifact,
+    insert_artifacts,
     insert_build,
     insert_promotion,
     insert_proposal,
     insert_verification,
+    iter_artifacts_for_related,
     list_proposals,
+    list_proposals_rows,
     update_build,
     update_proposal_status,
 )
@@ -72,8 +87,146 @@ class TestInitDb:
         assert len(tables) > 0
         conn2.close()
 
+    def test_ensure_schema_on_open_connection(self, tmp_path):
+        conn = get_connection(tmp_path / "test.db")
+        ensure_schema(conn)
+        ensure_schema(conn)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        conn.close()
+
+    def test_creates_indexes(self, db):
+        indexes = {
+            row["name"] for row in db.execute(
+                "SELECT name FROM sqlite_master WHERE type='index'"
+            ).fetchall()
+        }
+        assert "idx_builds_proposal_status" in indexes
+        assert "idx_verifications_proposal" in indexes
+        assert "idx_artifacts_related_kind" in indexes
+        assert "idx_proposals_status_created" in indexes
+        assert "idx_builds_proposal_started" in indexes
+        assert "idx_artifacts_related_created" in indexes
+
+    @pytest.mark.parametrize(("sql", "index"), [
+        ("SELECT * FROM skill_proposals WHERE status = 'PROPOSED' ORDER BY created_at",
+         "idx_proposals_status_created"),
+        ("SELECT * FROM builds WHERE proposal_id = 'p' ORDER BY started_at",
+         "idx_builds_proposal_started"),
+        ("SELECT * FROM artifacts WHERE related_id = 'p' ORDER BY created_at",
+         "idx_artifacts_related_created"),
+        ("SELECT * FROM verifications WHERE proposal_id = 'p'"
+         " ORDER BY rowid DESC LIMIT 1",
+         "idx_verifications_proposal"),
+    ])
+    def test_list_queries_avoid_sort(self, db, sql, index):
+        plan = " ".join(
+            row["detail"] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        )
+        assert index in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_migration_6_adds_indexes(self, tmp_path):
+        db_path = tmp_path / "test.db"
+        conn = init_db(db_path)
+        for name in (
+            "idx_builds_proposal_status",
+            "idx_verifications_proposal_created",
+            "idx_artifacts_related_kind",
+        ):
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute("PRAGMA user_version = 5")
+        conn.commit()
+        conn.close()
+
+        conn = init_db(db_path)
+        indexes = {
+            row["name"] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='index'"
+            ).fetchall()
+        }
+        assert "idx_builds_proposal_status" in indexes
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        conn.close()
+
+    def test_failed_migration_rolls_back_that_version(self, tmp_path, monkeypatch):
+        import kavi.ledger.db as ledger_db
+
+        db_path = tmp_path / "test.db"
+        init_db(db_path).close()
+        bad = SCHEMA_VERSION + 1
+        monkeypatch.setattr(ledger_db, "SCHEMA_VERSION", bad)
+        monkeypatch.setitem(ledger_db.MIGRATIONS, bad, [
+            "CREATE TABLE half_done (x INTEGER)",
+            "NOT VALID SQL",
+        ])
+        with pytest.raises(sqlite3.OperationalError):
+            init_db(db_path)
+
+        conn = sqlite3.connect(str(db_path))
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute(
+            "SELECT name FROM sqlite_master WHERE name='half_done'"
+        ).fetchone() is None
+        conn.close()
+
+    def test_version_in_user_version(self, db):
+        assert db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        tables = {
+            row["name"] for row in db.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            ).fetchall()
+        }
+        assert "schema_version" not in tables
+
+    def test_migration_7_moves_legacy_version_table(self, tmp_path):
+        db_path = tmp_path / "test.db"
+        conn = init_db(db_path)
+        conn.execute("PRAGMA user_version = 0")
+        conn.execute("CREATE TABLE schema_version (version INTEGER NOT NULL)")
+        conn.execute("INSERT INTO schema_version (version) VALUES (6)")
+        conn.commit()
+        conn.close()
+
+        conn = init_db(db_path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute(
+            "SELECT name FROM sqlite_master WHERE name='schema_version'"
+        ).fetchone() is None
+        conn.close()
+
+    def test_connection_pragmas(self, db):
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        # 1 = NORMAL
+        assert db.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert db.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert db.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        # 2 = MEMORY
+        assert db.execute("PRAGMA temp_store").fetchone()[0] == 2
+        assert db.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
+    def test_close_optimizes_then_closes(self, tmp_path):
+        conn = init_db(tmp_path / "test.db")
+        optimize(conn)
+        close(conn)
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_safe_mode_keeps_full_sync(self, tmp_path):
+        conn = init_db(tmp_path / "test.db", safe_mode=True)
+        # 2 = FULL
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+        conn.close()
+
 
 class TestProposals:
+    def test_created_at_matches_sqlite_default_format(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        stored = sample_proposal.created_at
+        # Round-trips through SQLite's own parser unchanged
+        assert db.execute(
+            "SELECT strftime('%Y-%m-%dT%H:%M:%SZ', ?)", (stored,)
+        ).fetchone()[0] == stored
+
     def test_insert_and_get(self, db, sample_proposal):
         inserted = insert_proposal(db, sample_proposal)
         assert inserted.id == sample_proposal.id
@@ -103,6 +256,22 @@ class TestProposals:
         assert len(list_proposals(db, status=ProposalStatus.PROPOSED)) == 1
         assert len(list_proposals(db, status=ProposalStatus.TRUSTED)) == 0
 
+    def test_enums_stored_as_text(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        row = db.execute(
+            "SELECT status, typeof(status), side_effect_class FROM skill_proposals"
+        ).fetchone()
+        assert tuple(row) == ("PROPOSED", "text", sample_proposal.side_effect_class.value)
+
+    def test_list_rows_matches_models(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        rows = list_proposals_rows(db)
+        assert rows == [ProposalRow(**sample_proposal.model_dump())]
+        assert rows[0].status == ProposalStatus.PROPOSED
+        assert list_proposals_rows(db, status=ProposalStatus.TRUSTED) == []
+        # Row factory of the shared connection is untouched
+        assert isinstance(db.execute("SELECT 1 AS x").fetchone(), sqlite3.Row)
+
 
 class TestBuilds:
     def test_insert_and_get(self, db, sample_proposal):
@@ -135,6 +304,15 @@ class TestBuilds:
         builds = get_builds_for_proposal(db, sample_proposal.id)
         assert len(builds) == 2
 
+    def test_count_failed_builds(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        for status in (BuildStatus.FAILED, BuildStatus.SUCCEEDED, BuildStatus.FAILED):
+            insert_build(db, Build(
+                proposal_id=sample_proposal.id, branch_name="b", status=status,
+            ))
+        assert count_failed_builds(db, sample_proposal.id) == 2
+        assert count_failed_builds(db, "missing") == 0
+
 
 class TestVerifications:
     def test_insert_and_get_latest(self, db, sample_proposal):
@@ -152,6 +330,21 @@ class TestVerifications:
         assert latest.status == VerificationStatus.PASSED
         assert latest.ruff_ok is True
 
+    def test_latest_is_last_inserted_within_same_second(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        first = Verification(
+            proposal_id=sample_proposal.id, status=VerificationStatus.FAILED,
+            created_at="2026-01-01T00:00:00Z",
+        )
+        second = first.model_copy(update={
+            "id": "second", "status": VerificationStatus.PASSED,
+        })
+        insert_verification(db, first)
+        insert_verification(db, second)
+        latest = get_latest_verification(db, sample_proposal.id)
+        assert latest is not None
+        assert latest.id == "second"
+
 
 class TestPromotions:
     def test_insert(self, db, sample_proposal):
@@ -181,3 +374,121 @@ class TestArtifacts:
         assert len(artifacts) == 1
         assert artifacts[0].kind == ArtifactKind.SKILL_SPEC
         assert artifacts[0].sha256 == "abc123"
+
+    def test_iter_artifacts_is_lazy(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        for i in range(3):
+            insert_artifact(db, Artifact(
+                kind=ArtifactKind.NOTE, path=f"{i}.md", sha256="x",
+                related_id=sample_proposal.id,
+            ))
+        it = iter_artifacts_for_related(db, sample_proposal.id)
+        assert not isinstance(it, list)
+        assert next(it).path == "0.md"
+        assert [a.path for a in it] == ["1.md", "2.md"]
+
+    def test_insert_artifacts_batch(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        arts = [
+            Artifact(
+                kind=ArtifactKind.NOTE, path=f"notes/{i}.md", sha256=str(i),
+                related_id=sample_proposal.id,
+            )
+            for i in range(5)
+        ]
+        insert_artifacts(db, arts)
+        assert len(get_artifacts_for_related(db, sample_proposal.id)) == 5
+
+    def test_insert_artifacts_rolls_back_whole_batch(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        art = Artifact(
+            kind=ArtifactKind.NOTE, path="a.md", sha256="x",
+            related_id=sample_proposal.id,
+        )
+        dup = art.model_copy(update={"path": "b.md"})
+        with pytest.raises(sqlite3.IntegrityError):
+            insert_artifacts(db, [art, dup])
+        assert get_artifacts_for_related(db, sample_proposal.id) == []
+
+    def test_find_build_log_artifact(self, db, sample_proposal):
+        insert_proposal(db, sample_proposal)
+        for path, kind in [
+            ("logs/build_aaa111.log", ArtifactKind.BUILD_LOG),
+            ("notes/build_bbb222.md", ArtifactKind.RESEARCH_NOTE),
+            ("logs/build_bbb222_old.log", ArtifactKind.BUILD_LOG),
+            ("logs/build_bbb222.log", ArtifactKind.BUILD_LOG),
+        ]:
+            insert_artifact(db, Artifact(
+                kind=kind, path=path, sha256="x", related_id=sample_proposal.id,
+            ))
+
+        found = find_build_log_artifact(db, sample_proposal.id, "bbb222")
+        assert found == "logs/build_bbb222.log"
+        assert find_build_log_artifact(db, sample_proposal.id, "ccc333") is None
+        assert find_build_log_artifact(db, "other", "aaa111") is None
+
+
+class TestTransaction:
+    def test_commits_once_on_exit(self, tmp_path, sample_proposal):
+        db_path = tmp_path / "test.db"
+        conn = init_db(db_path)
+        with transaction(conn):
+            insert_proposal(conn, sample_proposal)
+            insert_build(conn, Build(proposal_id=sample_proposal.id, branch_name="b"))
+            # Not yet visible to another connection
+            other = init_db(db_path)
+            assert get_proposal(other, sample_proposal.id) is None
+            other.close()
+        other = init_db(db_path)
+        assert get_proposal(other, sample_proposal.id) is not None
+        assert len(get_builds_for_proposal(other, sample_proposal.id)) == 1
+        other.close()
+        conn.close()
+
+    def test_rolls_back_on_error(self, db, sample_proposal):
+        with pytest.raises(RuntimeError), transaction(db):
+            insert_proposal(db, sample_proposal)
+            raise RuntimeError("boom")
+        assert get_proposal(db, sample_proposal.id) is None
+
+    def test_nested_joins_outer(self, db, sample_proposal):
+        with pytest.raises(RuntimeError), transaction(db):
+            with transaction(db):
+                insert_proposal(db, sample_proposal)
+            raise RuntimeError("boom")
+        assert get_proposal(db, sample_proposal.id) is None
+
+    def test_batch_state_is_per_connection(self, tmp_path, sample_proposal):
+        db_path = tmp_path / "test.db"
+        conn = init_db(db_path)
+        other = init_db(db_path)
+        with transaction(conn):
+            assert conn.batch_depth == 1
+            with transaction(conn):
+                assert conn.batch_depth == 2
+            assert other.batch_depth == 0
+        assert conn.batch_depth == 0
+        # Committing through another connection is unaffected by conn's block
+        insert_proposal(other, sample_proposal)
+        assert get_proposal(conn, sample_proposal.id) is not None
+        other.close()
+        conn.close()
+
+    def test_rejects_plain_connection(self, tmp_path):
+        conn = sqlite3.connect(str(tmp_path / "plain.db"))
+        with pytest.raises(TypeError), transaction(conn):
+            pass
+        conn.close()
+
+    def test_takes_write_lock_on_entry(self, tmp_path):
+        db_path = tmp_path / "test.db"
+        conn = init_db(db_path)
+        other = sqlite3.connect(str(db_path), timeout=0)
+        with transaction(conn):
+            assert conn.in_transaction
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                other.execute("BEGIN IMMEDIATE")
+        other.execute("BEGIN IMMEDIATE")
+        other.rollback()
+        other.close()
+        conn.close()
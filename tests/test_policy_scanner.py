@@ -4,9 +4,16 @@ from pathlib import Path
 
 import pytest
 
+from kavi.policies import scanner
 from kavi.policies.scanner import Policy, scan_directory, scan_file
 
 
+@pytest.fixture(autouse=True)
+def _no_scan_cache(monkeypatch):
+    """Keep the on-disk scan cache out of tests unless one opts in."""
+    monkeypatch.setattr(scanner, "_scan_cache_db", None)
+
+
 @pytest.fixture()
 def policy():
     return Policy(
@@ -59,6 +66,17 @@ class TestForbiddenImports:
         violations = scan_file(f, policy)
         assert len(violations) == 1
 
+    def test_catches_submodule_of_forbidden(self, tmp_path, policy):
+        f = _write_py(tmp_path, "bad.py", "import paramiko.client.ssh\n")
+        violations = scan_file(f, policy)
+        assert len(violations) == 1
+        assert "paramiko.client.ssh" in violations[0].detail
+
+    def test_allows_name_sharing_forbidden_prefix(self, tmp_path, policy):
+        f = _write_py(tmp_path, "good.py", "import ptyprocess\nimport os.path\n")
+        violations = scan_file(f, policy)
+        assert len(violations) == 0
+
     def test_allows_clean_imports(self, tmp_path, policy):
         f = _write_py(tmp_path, "good.py", "import json\nimport pathlib\n")
         violations = scan_file(f, policy)
@@ -88,6 +106,28 @@ class TestDynamicExec:
         assert len(violations) == 0
 
 
+class TestTraversal:
+    def test_nested_violations_reported_in_source_order(self, tmp_path, policy):
+        code = (
+            "def outer():\n"
+            "    def inner():\n"
+            "        import pty\n"
+            "    return inner\n"
+            "eval('1')\n"
+        )
+        f = _write_py(tmp_path, "nested.py", code)
+        violations = scan_file(f, policy)
+        assert [(v.line, v.rule) for v in violations] == [
+            (3, "forbidden_import"), (5, "forbid_dynamic_exec"),
+        ]
+
+    def test_deeply_nested_expression(self, tmp_path, policy):
+        # 150 nested list literals: one AST level each
+        f = _write_py(tmp_path, "deep.py", "x = " + "[" * 150 + "eval('1')" + "]" * 150 + "\n")
+        violations = scan_file(f, policy)
+        assert [v.rule for v in violations] == ["forbid_dynamic_exec"]
+
+
 class TestDirectoryScan:
     def test_scans_all_files(self, tmp_path, policy):
         _write_py(tmp_path, "a.py", "import json\n")
@@ -111,6 +151,98 @@ class TestDirectoryScan:
         result = scan_directory(tmp_path, policy)
         assert result.ok is False
 
+    def test_parallel_scan_matches_serial(self, tmp_path, policy, monkeypatch):
+        monkeypatch.setattr("kavi.policies.scanner.os.cpu_count", lambda: 2)
+        for i in range(10):
+            code = "import subprocess\n" if i % 3 == 0 else "import json\n"
+            _write_py(tmp_path, f"m{i}.py", code)
+        parallel = scan_directory(tmp_path, policy, min_files_for_parallel=2)
+        serial = scan_directory(tmp_path, policy, min_files_for_parallel=100)
+        assert parallel.files_scanned == serial.files_scanned == 10
+        assert parallel.violations == serial.violations
+        assert [Path(v.file).name for v in parallel.violations] == [
+            "m0.py", "m3.py", "m6.py", "m9.py",
+        ]
+
+
+class TestScanCache:
+    def test_unchanged_file_is_not_reparsed(self, tmp_path, policy, monkeypatch):
+        monkeypatch.setattr(scanner, "_scan_cache_db", tmp_path / "c" / "scan.db")
+        f = _write_py(tmp_path, "bad.py", "import subprocess\n")
+        first = scan_file(f, policy)
+
+        def fail(*a, **kw):
+            raise AssertionError("parsed despite cache hit")
+
+        monkeypatch.setattr(scanner.ast, "parse", fail)
+        assert scan_file(f, policy) == first
+        # Same content at another path reports the new path
+        g = _write_py(tmp_path, "copy.py", "import subprocess\n")
+        assert [v.file for v in scan_file(g, policy)] == [str(g)]
+
+    def test_cache_keyed_by_content_and_policy(self, tmp_path, policy, monkeypatch):
+        monkeypatch.setattr(scanner, "_scan_cache_db", tmp_path / "scan.db")
+        f = _write_py(tmp_path, "m.py", "import paramiko\n")
+        assert len(scan_file(f, policy)) == 1
+        lenient = Policy(
+            forbidden_imports=[], allowed_network=False,
+            allowed_write_paths=[], forbid_dynamic_exec=True,
+        )
+        assert scan_file(f, lenient) == []
+        f.write_text("import json\n")
+        assert scan_file(f, policy) == []
+
+    def test_unwritable_cache_still_scans(self, tmp_path, policy, monkeypatch):
+        blocker = tmp_path / "blocker"
+        blocker.write_text("")
+        monkeypatch.setattr(scanner, "_scan_cache_db", blocker / "scan.db")
+        f = _write_py(tmp_path, "bad.py", "import pty\n")
+        assert len(scan_file(f, policy)) == 1
+
+
+    def test_off_by_default(self):
+        from kavi import config
+
+        assert config.SCAN_CACHE_DB is None
+
+    def test_key_tracks_scanner_source(self, tmp_path, policy, monkeypatch):
+        monkeypatch.setattr(scanner, "_scan_cache_db", tmp_path / "scan.db")
+        f = _write_py(tmp_path, "m.py", "import pty\n")
+        before = scanner._scan_key(f.read_bytes(), policy)
+        monkeypatch.setattr(scanner, "_scanner_digest", lambda: b"edited rules")
+        assert scanner._scan_key(f.read_bytes(), policy) != before
+
+    def test_directory_scan_opens_one_connection(self, tmp_path, policy, monkeypatch):
+        monkeypatch.setattr(scanner, "_scan_cache_db", tmp_path / "c" / "scan.db")
+        for i in range(5):
+            _write_py(tmp_path, f"m{i}.py", "import json\n")
+        opened = []
+        real_connect = scanner.sqlite3.connect
+
+        def counting_connect(*args, **kwargs):
+            opened.append(args)
+            return real_connect(*args, **kwargs)
+
+        monkeypatch.setattr(scanner.sqlite3, "connect", counting_connect)
+        scan_directory(tmp_path, policy, min_files_for_parallel=100)
+        scan_directory(tmp_path, policy, min_files_for_parallel=100)
+        assert len(opened) == 2
+
+    def test_verify_gate_ignores_poisoned_cache(self, tmp_path, policy, monkeypatch):
+        from kavi.forge.verify import SubprocessRunner
+
+        db = tmp_path / "scan.db"
+        monkeypatch.setattr(scanner, "_scan_cache_db", db)
+        f = _write_py(tmp_path, "evil.py", "import subprocess\n")
+        conn = scanner._open_scan_cache(db)
+        assert conn is not None
+        scanner._scan_cache_put(conn, [(scanner._scan_key(f.read_bytes(), policy), [])])
+        conn.close()
+
+        assert scan_file(f, policy) == []  # opted-in callers read the entry
+        assert len(scan_file(f, policy, use_cache=False)) == 1
+        assert SubprocessRunner().run_policy_scan(f, policy).ok is False
+
 
 class TestSyntaxErrors:
     def test_reports_syntax_error(self, tmp_path, policy):
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import io
 import json
+import ssl
 import urllib.error
+import urllib.request
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -18,7 +20,7 @@ from kavi.skills.http_get_json import (
 # ---- helpers ----
 
 def _mock_response(body: bytes, status: int = 200) -> MagicMock:
-    """Create a mock that behaves like urllib.request.urlopen() context."""
+    """Create a mock that behaves like an opener.open() response context."""
     resp = MagicMock()
     resp.status = status
     resp.read = MagicMock(return_value=body)
@@ -54,6 +56,15 @@ class TestHttpGetJsonModels:
         assert inp.api_key_env == "MY_API_KEY"
         assert inp.timeout_s == 10.0
 
+    def test_allowed_host_set_not_a_field(self):
+        inp = HttpGetJsonInput(
+            url="https://a.example.com", allowed_hosts=["a.example.com", "b.example.com"],
+        )
+        assert inp.allowed_host_set == frozenset({"a.example.com", "b.example.com"})
+        assert inp.allowed_host_set is inp.allowed_host_set
+        assert "allowed_host_set" not in inp.model_dump()
+        assert "allowed_host_set" not in HttpGetJsonInput.model_json_schema()["properties"]
+
     def test_missing_required_fields(self):
         with pytest.raises(Exception):
             HttpGetJsonInput(url="https://example.com")  # type: ignore[call-arg]
@@ -112,7 +123,7 @@ class TestHttpGetJsonSkill:
         mock_resp = _mock_response(body, 200)
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             return_value=mock_resp,
         ):
             result = skill.execute(HttpGetJsonInput(
@@ -133,7 +144,7 @@ class TestHttpGetJsonSkill:
         mock_resp = _mock_response(body, 200)
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             return_value=mock_resp,
         ) as mock_urlopen:
             result = skill.execute(HttpGetJsonInput(
@@ -165,7 +176,7 @@ class TestHttpGetJsonSkill:
         mock_resp = _mock_response(body, 200)
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             return_value=mock_resp,
         ) as mock_urlopen:
             skill.execute(HttpGetJsonInput(
@@ -181,7 +192,7 @@ class TestHttpGetJsonSkill:
         skill = HttpGetJsonSkill()
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             side_effect=urllib.error.URLError(
                 reason=TimeoutError("timed out")
             ),
@@ -199,7 +210,7 @@ class TestHttpGetJsonSkill:
         skill = HttpGetJsonSkill()
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             side_effect=urllib.error.URLError(
                 reason="Connection refused"
             ),
@@ -220,7 +231,7 @@ class TestHttpGetJsonSkill:
         mock_resp = _mock_response(body, 200)
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             return_value=mock_resp,
         ):
             result = skill.execute(HttpGetJsonInput(
@@ -239,7 +250,7 @@ class TestHttpGetJsonSkill:
         mock_resp = _mock_response(body, 200)
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             return_value=mock_resp,
         ):
             result = skill.execute(HttpGetJsonInput(
@@ -256,7 +267,7 @@ class TestHttpGetJsonSkill:
         mock_resp = _mock_response(b"not json at all", 200)
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             return_value=mock_resp,
         ):
             result = skill.execute(HttpGetJsonInput(
@@ -281,7 +292,7 @@ class TestHttpGetJsonSkill:
         )
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             side_effect=exc,
         ):
             result = skill.execute(HttpGetJsonInput(
@@ -299,7 +310,7 @@ class TestHttpGetJsonSkill:
         mock_resp = _mock_response(body, 200)
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             return_value=mock_resp,
         ):
             result = skill.validate_and_run({
@@ -316,7 +327,7 @@ class TestHttpGetJsonSkill:
         mock_resp = _mock_response(body, 200)
 
         with patch(
-            "kavi.skills.http_get_json.urllib.request.urlopen",
+            "kavi.skills.http_get_json._urlopen",
             return_value=mock_resp,
         ):
             result = skill.execute(HttpGetJsonInput(
@@ -326,3 +337,36 @@ class TestHttpGetJsonSkill:
 
         assert result.data == {"source": "backup"}
         assert result.error is None
+
+
+# ---- shared opener ----
+
+class TestSharedOpener:
+    def test_opener_built_once_with_shared_ssl_context(self):
+        from kavi.skills import http_get_json
+
+        http_get_json._opener.cache_clear()
+        try:
+            opener = http_get_json._opener()
+            assert http_get_json._opener() is opener
+            https = [h for h in opener.handlers if isinstance(h, urllib.request.HTTPSHandler)]
+            assert len(https) == 1
+            assert isinstance(https[0]._context, ssl.SSLContext)
+        finally:
+            http_get_json._opener.cache_clear()
+
+    def test_execute_opens_through_shared_opener(self):
+        from kavi.skills import http_get_json
+
+        opener = MagicMock()
+        opener.open.return_value = _mock_response(b'{"ok": true}')
+        with patch.object(http_get_json, "_opener", return_value=opener):
+            result = HttpGetJsonSkill().execute(HttpGetJsonInput(
+                url="https://api.example.com/x",
+                allowed_hosts=["api.example.com"],
+                timeout_s=2.5,
+            ))
+        assert result.data == {"ok": True}
+        req = opener.open.call_args[0][0]
+        assert req.full_url == "https://api.example.com/x"
+        assert opener.open.call_args.kwargs["timeout"] == 2.5
@@ -152,6 +152,39 @@ class TestReadNotesByTagSkill:
         result = skill.execute(ReadNotesByTagInput(tag="   "))
         assert result.count == 0
 
+    def test_nested_note_falls_back_to_stem(self, tmp_path: Path) -> None:
+        vault = _vault(tmp_path)
+        (vault / "daily").mkdir(parents=True)
+        (vault / "daily" / "2025-01-01.md").write_text("no heading #log\n")
+
+        skill = ReadNotesByTagSkill()
+        result = skill.execute(ReadNotesByTagInput(tag="log"))
+        assert result.notes[0].path == "daily/2025-01-01.md"
+        assert result.notes[0].title == "2025-01-01"
+
+    def test_title_from_later_line(self, tmp_path: Path) -> None:
+        vault = _vault(tmp_path)
+        vault.mkdir(parents=True)
+        (vault / "late.md").write_text("#project\n#  \n\n# Late Title\n")
+
+        skill = ReadNotesByTagSkill()
+        result = skill.execute(ReadNotesByTagInput(tag="project"))
+        assert result.notes[0].title == "Late Title"
+
+    def test_many_notes_sorted_and_unreadable_skipped(self, tmp_path: Path) -> None:
+        vault = _vault(tmp_path)
+        vault.mkdir(parents=True)
+        for i in range(40):
+            body = "#even" if i % 2 == 0 else "#odd"
+            (vault / f"n{i:02d}.md").write_text(f"# Note {i}\n\n{body}\n")
+        (vault / "bad.md").write_bytes(b"\xff\xfe #even")
+
+        skill = ReadNotesByTagSkill()
+        result = skill.execute(ReadNotesByTagInput(tag="even"))
+        assert result.count == 20
+        assert [n.path for n in result.notes] == [f"n{i:02d}.md" for i in range(0, 40, 2)]
+        assert result.notes[3].title == "Note 6"
+
     def test_validate_and_run(self, tmp_path: Path) -> None:
         vault = _vault(tmp_path)
         vault.mkdir(parents=True)
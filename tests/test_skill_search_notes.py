@@ -14,6 +14,7 @@ from kavi.skills.search_notes import (
     SearchNotesOutput,
     SearchNotesSkill,
     SearchResult,
+    _cosine_scores,
     _cosine_similarity,
     _has_tag,
     _lexical_score,
@@ -164,6 +165,12 @@ class TestHelpers:
         assert result == "Title"
         assert r"\n" not in result
 
+    def test_extract_title_skips_blank_heading(self) -> None:
+        assert extract_title("#   \n  # Real title  \nbody") == "Real title"
+
+    def test_extract_title_crlf_and_later_line(self) -> None:
+        assert extract_title("intro\r\n\r\n# Later\r\nbody") == "Later"
+
     def test_has_tag_present(self) -> None:
         assert _has_tag("Some text #work here", "work") is True
 
@@ -176,6 +183,28 @@ class TestHelpers:
     def test_has_tag_heading_not_matched(self) -> None:
         assert _has_tag("# work\nBody", "work") is False
 
+    def test_has_tag_after_heading_line(self) -> None:
+        assert _has_tag("# work\r\n  see #work, later", "work") is True
+
+    def test_has_tag_bare_hash_heading_skipped(self) -> None:
+        assert _has_tag("#\n#work_", "work") is True
+        assert _has_tag("  #\n", "work") is False
+
+    def test_has_tag_unicode_letter_continues_tag(self) -> None:
+        assert _has_tag("#workés", "work") is False
+
+    def test_has_tag_without_needle_skips_regex(self) -> None:
+        search_notes._tag_pattern.cache_clear()
+        assert _has_tag("plain text, #other tag", "absent") is False
+        assert search_notes._tag_pattern.cache_info().currsize == 0
+        assert _has_tag("see #absent", "absent") is True
+        assert search_notes._tag_pattern.cache_info().currsize == 1
+
+    def test_has_tag_regex_metachars_escaped(self) -> None:
+        assert _has_tag("#c++ notes", "c++") is True
+        assert _has_tag("#a.b", "a.b") is True
+        assert _has_tag("#axb", "a.b") is False
+
     def test_snippet_with_match(self) -> None:
         content = "A" * 100 + "hello world" + "B" * 100
         s = _snippet(content, "hello")
@@ -186,6 +215,16 @@ class TestHelpers:
         s = _snippet(content, "xyz")
         assert s == content
 
+    def test_snippet_case_insensitive_and_literal(self) -> None:
+        content = "x" * 120 + "Price: $5 (approx.)" + "y" * 300
+        s = _snippet(content, "PRICE: $5 (APPROX.)", length=40)
+        assert s == "x" * 10 + "Price: $5 (approx.)" + "y" * 11
+        assert _snippet("a.b", "a*b") == "a.b"
+
+    def test_snippet_accepts_precompiled_query(self) -> None:
+        pattern = search_notes._query_pattern("world")
+        assert _snippet("Hello World", pattern) == _snippet("Hello World", "world")
+
     def test_snippet_normalizes_real_newlines(self) -> None:
         content = "Line one\nLine two\r\nLine three"
         s = _snippet(content, "Line")
@@ -217,6 +256,13 @@ class TestHelpers:
     def test_cosine_zero_vector(self) -> None:
         assert _cosine_similarity([0.0, 0.0], [1.0, 1.0]) == 0.0
 
+    def test_cosine_scores_batch(self) -> None:
+        scores = _cosine_scores([3.0, 4.0], [[3.0, 4.0], [-4.0, 3.0], [0.0, 0.0], [6.0, 8.0]])
+        assert scores == pytest.approx([1.0, 0.0, 0.0, 1.0])
+
+    def test_cosine_scores_zero_query(self) -> None:
+        assert _cosine_scores([0.0, 0.0], [[1.0, 1.0], [2.0, 0.0]]) == [0.0, 0.0]
+
     def test_lexical_score_all_match(self) -> None:
         assert _lexical_score("hello world test", "hello world") == 1.0
 
@@ -229,6 +275,13 @@ class TestHelpers:
     def test_lexical_score_empty_query(self) -> None:
         assert _lexical_score("content", "") == 0.0
 
+    def test_lexical_score_substring_and_repeats(self) -> None:
+        assert _lexical_score("Architecture notes", "ARCH arch zzz") == pytest.approx(2 / 3)
+
+    def test_lexical_score_pretokenized_query(self) -> None:
+        tokens = search_notes._query_tokens("Hello World")
+        assert _lexical_score("hello planet", tokens) == 0.5
+
 
 # ---------------------------------------------------------------------------
 # Execute: empty / edge cases
@@ -295,6 +348,42 @@ class TestSemanticSearch:
         assert result.used_model == "bge-large"
         assert result.error is None
 
+    def test_repeat_search_only_embeds_query_and_changed_notes(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        from collections import OrderedDict
+        from types import SimpleNamespace
+
+        from kavi.llm import spark
+
+        sent: list[list[str]] = []
+
+        def create(*, model: str, input: list[str], timeout: float) -> SimpleNamespace:
+            sent.append(list(input))
+            return SimpleNamespace(data=[
+                SimpleNamespace(index=i, embedding=[1.0, float(len(text))])
+                for i, text in enumerate(input)
+            ])
+
+        client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+        monkeypatch.setattr(spark, "_get_client", lambda base_url: client)
+        monkeypatch.setattr(spark, "_embed_cache", OrderedDict())
+        monkeypatch.setattr(spark, "_embed_cache_db", tmp_path / "emb.db")
+        _write_note(tmp_path, "a.md", "# A\n\nalpha")
+        _write_note(tmp_path, "b.md", "# B\n\nbeta")
+
+        skill = SearchNotesSkill()
+        skill.execute(SearchNotesInput(query="first"))
+        spark._embed_cache.clear()  # as in a new process; disk cache remains
+        _write_note(tmp_path, "b.md", "# B\n\nbeta, edited")
+        result = skill.execute(SearchNotesInput(query="second"))
+
+        assert sent == [
+            ["first", "# A\n\nalpha", "# B\n\nbeta"],
+            ["second", "# B\n\nbeta, edited"],
+        ]
+        assert len(result.results) == 2
+
     @patch("kavi.skills.search_notes.embed")
     def test_top_k_limits_results(self, mock_embed: MagicMock, tmp_path: Path) -> None:
         for i in range(5):
@@ -408,6 +497,20 @@ class TestLexicalFallback:
         assert scores["partial.md"] == 0.5
         assert scores["none.md"] == 0.0
 
+    @patch("kavi.skills.search_notes.embed")
+    def test_fallback_top_k_ties_keep_vault_order(
+        self, mock_embed: MagicMock, tmp_path: Path
+    ) -> None:
+        for name in ("a.md", "b.md", "c.md", "d.md"):
+            _write_note(tmp_path, name, "hello there")
+        _write_note(tmp_path, "e.md", "hello world")
+        mock_embed.side_effect = SparkUnavailableError("down")
+
+        skill = SearchNotesSkill()
+        result = skill.execute(SearchNotesInput(query="hello world", top_k=3))
+
+        assert [r.path for r in result.results] == ["e.md", "a.md", "b.md"]
+
 
 # ---------------------------------------------------------------------------
 # Tag filter
@@ -494,6 +597,54 @@ class TestFileHandling:
         assert "link.md" not in paths
         assert "real.md" in paths
 
+    def test_many_notes_keep_sorted_order(self, tmp_path: Path) -> None:
+        for i in range(40):
+            _write_note(tmp_path, f"n{i:02d}.md", f"# Note {i}\n\nbody {i}")
+        (_vault(tmp_path) / "bad.md").write_bytes(b"\xff\xfe not utf-8")
+
+        entries, truncated = search_notes._enumerate_notes(12000, None)
+
+        assert [path for path, _, _ in entries] == [f"n{i:02d}.md" for i in range(40)]
+        assert entries[7][1:] == ("# Note 7\n\nbody 7", "Note 7")
+        assert truncated == []
+
+    def test_crlf_notes_read_with_text_mode_newlines(self, tmp_path: Path) -> None:
+        vault = _vault(tmp_path)
+        vault.mkdir(parents=True)
+        (vault / "win.md").write_bytes(b"# Win\r\n\r\nline one\rline two #work\r\n")
+
+        entries, _ = search_notes._enumerate_notes(12000, "work")
+
+        assert entries == [("win.md", "# Win\n\nline one\nline two #work\n", "Win")]
+
+    def test_tag_prefilter_skips_untagged_notes(self, tmp_path: Path) -> None:
+        _write_note(tmp_path, "tagged.md", "# T\n\n#work item")
+        _write_note(tmp_path, "plain.md", "# P\n\nno tags")
+        _write_note(tmp_path, "heading.md", "# work\n")
+
+        entries, _ = search_notes._enumerate_notes(12000, "work")
+
+        assert [path for path, _, _ in entries] == ["tagged.md"]
+
+    def test_walk_orders_by_path_components(self, tmp_path: Path) -> None:
+        for rel in ("a-b.md", "a/b.md", "a.md", "z/deep/n.md"):
+            _write_note(tmp_path, rel, "x")
+
+        rels = [rel for _, rel, _ in search_notes._walk_md(_vault(tmp_path))]
+
+        assert rels == ["a/b.md", "a-b.md", "a.md", "z/deep/n.md"]
+
+    def test_symlinked_directory_not_descended(self, tmp_path: Path) -> None:
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (outside / "secret.md").write_text("secret")
+        _write_note(tmp_path, "real.md", "# Real\n\nbody")
+        (_vault(tmp_path) / "linked").symlink_to(outside)
+
+        entries, _ = search_notes._enumerate_notes(12000, None)
+
+        assert [path for path, _, _ in entries] == ["real.md"]
+
 
 # ---------------------------------------------------------------------------
 # validate_and_run integration
@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import json
+import sqlite3
+from collections.abc import Iterator
 from pathlib import Path
+from typing import get_args
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -21,6 +24,14 @@ def _isolate_vault(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(summarize_note, "VAULT_OUT", tmp_path / "vault_out")
 
 
+@pytest.fixture(autouse=True)
+def _no_summary_cache(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Keep the on-disk summary cache out of tests unless one opts in."""
+    monkeypatch.setattr(summarize_note, "_summary_cache_db", None)
+    yield
+    summarize_note._close_summary_cache()
+
+
 def _vault(tmp_path: Path) -> Path:
     return tmp_path / "vault_out"
 
@@ -130,6 +141,12 @@ class TestPathValidation:
         with pytest.raises(ValueError, match="Symlinks not allowed"):
             skill.execute(SummarizeNoteInput(path="link.md"))
 
+    def test_directory_rejected(self, tmp_path: Path) -> None:
+        (_vault(tmp_path) / "sub.md").mkdir(parents=True)
+        skill = SummarizeNoteSkill()
+        with pytest.raises(ValueError, match="File not found"):
+            skill.execute(SummarizeNoteInput(path="sub.md"))
+
     def test_nonexistent_file_rejected(self, tmp_path: Path) -> None:
         vault = _vault(tmp_path)
         vault.mkdir(parents=True)
@@ -197,6 +214,10 @@ class TestLLMSuccess:
         system_content = messages_arg[0]["content"]
         assert "bullet" in system_content
 
+    def test_every_style_has_a_prompt(self) -> None:
+        styles = get_args(SummarizeNoteInput.model_fields["style"].annotation)
+        assert set(summarize_note._SYSTEM_PROMPTS) == set(styles)
+
 
 # ---------------------------------------------------------------------------
 # Truncation tests
@@ -219,6 +240,29 @@ class TestTruncation:
         # The prompt includes preamble + content, but content portion is capped
         assert len(prompt_arg) < 15000
 
+    @patch("kavi.skills.summarize_note.generate")
+    def test_reads_only_a_bounded_prefix(self, mock_gen: MagicMock, tmp_path: Path) -> None:
+        # Bytes far past max_chars are never decoded
+        note = _write_note(tmp_path, "big.md", "")
+        note.write_bytes(b"ab\r\ncd" + b"x" * 100_000 + b"\xff\xfe")
+        mock_gen.return_value = _llm_json("s", [])
+
+        skill = SummarizeNoteSkill()
+        result = skill.execute(SummarizeNoteInput(path="big.md", max_chars=5))
+
+        assert result.truncated is True
+        assert mock_gen.call_args[0][0][1]["content"] == "ab\ncd"
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_exact_length_not_truncated(self, mock_gen: MagicMock, tmp_path: Path) -> None:
+        _write_note(tmp_path, "note.md", "12345")
+        mock_gen.return_value = _llm_json("s", [])
+
+        skill = SummarizeNoteSkill()
+        result = skill.execute(SummarizeNoteInput(path="note.md", max_chars=5))
+
+        assert result.truncated is False
+
     @patch("kavi.skills.summarize_note.generate")
     def test_short_content_not_truncated(self, mock_gen: MagicMock, tmp_path: Path) -> None:
         _write_note(tmp_path, "small.md", "short note")
@@ -303,6 +347,239 @@ class TestFallback:
         assert result.summary == expected
 
 
+class TestClassify:
+    def test_exact_and_subclass_codes(self) -> None:
+        from kavi.llm.spark import SparkError, SparkUnavailableError
+
+        class _FlakyError(SparkUnavailableError):
+            pass
+
+        class _OddError(SparkError):
+            pass
+
+        classify = summarize_note._classify
+        assert classify(SparkUnavailableError) == "SPARKSTATION_UNAVAILABLE"
+        assert classify(_FlakyError) == "SPARKSTATION_UNAVAILABLE"
+        assert classify(_OddError) == "SPARKSTATION_ERROR"
+        assert classify(json.JSONDecodeError) == "SPARKSTATION_BAD_JSON"
+        assert classify(RuntimeError) == "SPARKSTATION_UNKNOWN"
+
+    def test_resolved_once_per_class(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(summarize_note, "_code_by_type", {})
+        assert summarize_note._classify(KeyError) == "SPARKSTATION_BAD_SCHEMA"
+        assert summarize_note._code_by_type == {KeyError: "SPARKSTATION_BAD_SCHEMA"}
+
+
+# ---------------------------------------------------------------------------
+# execute_many
+# ---------------------------------------------------------------------------
+
+
+class TestExecuteMany:
+    @patch("kavi.skills.summarize_note.generate")
+    def test_calls_overlap_and_keep_input_order(
+        self, mock_gen: MagicMock, tmp_path: Path,
+    ) -> None:
+        import threading
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        def slow_generate(messages: list[dict[str, str]], **kwargs: object) -> str:
+            barrier.wait()  # only passes if all three calls are in flight
+            return _llm_json(f"sum:{messages[1]['content']}", [])
+
+        mock_gen.side_effect = slow_generate
+        for name in ("a", "b", "c"):
+            _write_note(tmp_path, f"{name}.md", name)
+
+        results = SummarizeNoteSkill().execute_many(
+            [SummarizeNoteInput(path=f"{n}.md") for n in ("c", "a", "b")],
+        )
+
+        assert [r.path for r in results] == ["c.md", "a.md", "b.md"]
+        assert [r.summary for r in results] == ["sum:c", "sum:a", "sum:b"]
+
+    def test_invalid_path_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="File not found"):
+            SummarizeNoteSkill().execute_many(
+                [SummarizeNoteInput(path="missing.md"), SummarizeNoteInput(path="x.md")],
+            )
+
+    def test_empty(self) -> None:
+        assert SummarizeNoteSkill().execute_many([]) == []
+
+
+# ---------------------------------------------------------------------------
+# Summary cache
+# ---------------------------------------------------------------------------
+
+
+class TestSummaryCache:
+    @pytest.fixture()
+    def cache_db(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+        db = tmp_path / "cache" / "summaries.db"
+        monkeypatch.setattr(summarize_note, "_summary_cache_db", db)
+        return db
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_repeat_summary_served_from_cache(
+        self, mock_gen: MagicMock, tmp_path: Path, cache_db: Path,
+    ) -> None:
+        _write_note(tmp_path, "note.md", "# Title\n\nBody")
+        _write_note(tmp_path, "copy.md", "# Title\n\nBody")
+        mock_gen.return_value = _llm_json("cached", ["k"])
+        skill = SummarizeNoteSkill()
+
+        first = skill.execute(SummarizeNoteInput(path="note.md"))
+        second = skill.execute(SummarizeNoteInput(path="copy.md"))
+
+        assert mock_gen.call_count == 1
+        assert second.path == "copy.md"
+        assert (second.summary, second.key_points) == (first.summary, first.key_points)
+        assert second.used_model == first.used_model
+        assert second.error is None
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_style_and_content_are_part_of_the_key(
+        self, mock_gen: MagicMock, tmp_path: Path, cache_db: Path,
+    ) -> None:
+        note = _write_note(tmp_path, "note.md", "v1")
+        mock_gen.return_value = _llm_json("s", [])
+        skill = SummarizeNoteSkill()
+
+        skill.execute(SummarizeNoteInput(path="note.md"))
+        skill.execute(SummarizeNoteInput(path="note.md", style="paragraph"))
+        note.write_text("v2", encoding="utf-8")
+        skill.execute(SummarizeNoteInput(path="note.md"))
+
+        assert mock_gen.call_count == 3
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_fallbacks_are_not_cached(
+        self, mock_gen: MagicMock, tmp_path: Path, cache_db: Path,
+    ) -> None:
+        from kavi.llm.spark import SparkUnavailableError
+
+        _write_note(tmp_path, "note.md", "content")
+        mock_gen.side_effect = [SparkUnavailableError("down"), _llm_json("ok", [])]
+        skill = SummarizeNoteSkill()
+
+        assert skill.execute(SummarizeNoteInput(path="note.md")).used_model == "fallback"
+        assert skill.execute(SummarizeNoteInput(path="note.md")).summary == "ok"
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_unusable_cache_falls_through(
+        self, mock_gen: MagicMock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        blocker = tmp_path / "not_a_dir"
+        blocker.write_text("")
+        monkeypatch.setattr(summarize_note, "_summary_cache_db", blocker / "s.db")
+        _write_note(tmp_path, "note.md", "content")
+        mock_gen.return_value = _llm_json("fresh", [])
+
+        result = SummarizeNoteSkill().execute(SummarizeNoteInput(path="note.md"))
+
+        assert result.summary == "fresh"
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_near_match_responses_are_not_cached(
+        self, mock_gen: MagicMock, tmp_path: Path, cache_db: Path,
+    ) -> None:
+        from kavi.llm.spark import NearMatchResponse
+
+        _write_note(tmp_path, "note.md", "content")
+        mock_gen.side_effect = [
+            NearMatchResponse(_llm_json("other note", [])), _llm_json("own", []),
+        ]
+        skill = SummarizeNoteSkill()
+
+        assert skill.execute(SummarizeNoteInput(path="note.md")).summary == "other note"
+        assert skill.execute(SummarizeNoteInput(path="note.md")).summary == "own"
+        assert mock_gen.call_count == 2
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_expired_entries_are_not_served(
+        self, mock_gen: MagicMock, tmp_path: Path, cache_db: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(summarize_note, "SUMMARY_CACHE_TTL", -1)
+        _write_note(tmp_path, "note.md", "content")
+        mock_gen.return_value = _llm_json("s", [])
+        skill = SummarizeNoteSkill()
+
+        skill.execute(SummarizeNoteInput(path="note.md"))
+        skill.execute(SummarizeNoteInput(path="note.md"))
+
+        assert mock_gen.call_count == 2
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_prunes_to_max_rows(
+        self, mock_gen: MagicMock, tmp_path: Path, cache_db: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(summarize_note, "SUMMARY_CACHE_MAX_ROWS", 2)
+        mock_gen.return_value = _llm_json("s", [])
+        skill = SummarizeNoteSkill()
+        for i in range(4):
+            _write_note(tmp_path, f"n{i}.md", f"note {i}")
+            skill.execute(SummarizeNoteInput(path=f"n{i}.md"))
+
+        conn = sqlite3.connect(cache_db)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM summaries").fetchone() == (2,)
+        finally:
+            conn.close()
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_legacy_table_without_created_at_is_dropped(
+        self, mock_gen: MagicMock, tmp_path: Path, cache_db: Path,
+    ) -> None:
+        cache_db.parent.mkdir(parents=True)
+        conn = sqlite3.connect(cache_db)
+        conn.execute(
+            "CREATE TABLE summaries"
+            " (key TEXT PRIMARY KEY, summary TEXT NOT NULL, key_points TEXT NOT NULL)"
+        )
+        conn.execute("INSERT INTO summaries VALUES ('old', 'stale', '[]')")
+        conn.commit()
+        conn.close()
+        _write_note(tmp_path, "note.md", "content")
+        mock_gen.return_value = _llm_json("s", [])
+        skill = SummarizeNoteSkill()
+
+        skill.execute(SummarizeNoteInput(path="note.md"))
+        skill.execute(SummarizeNoteInput(path="note.md"))
+
+        assert mock_gen.call_count == 1
+        conn = sqlite3.connect(cache_db)
+        try:
+            keys = [row[0] for row in conn.execute("SELECT key FROM summaries")]
+        finally:
+            conn.close()
+        assert "old" not in keys and len(keys) == 1
+
+    @patch("kavi.skills.summarize_note.generate")
+    def test_connection_opened_once(
+        self, mock_gen: MagicMock, tmp_path: Path, cache_db: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        opened: list[object] = []
+        real_connect = summarize_note.sqlite3.connect
+
+        def counting_connect(*args: object, **kwargs: object) -> sqlite3.Connection:
+            opened.append(args)
+            return real_connect(*args, **kwargs)  # type: ignore[arg-type]
+
+        monkeypatch.setattr(summarize_note.sqlite3, "connect", counting_connect)
+        mock_gen.return_value = _llm_json("s", [])
+        skill = SummarizeNoteSkill()
+        for i in range(3):
+            _write_note(tmp_path, f"n{i}.md", f"note {i}")
+            skill.execute(SummarizeNoteInput(path=f"n{i}.md"))
+
+        assert len(opened) == 1
+
+
 # ---------------------------------------------------------------------------
 # validate_and_run integration
 # ---------------------------------------------------------------------------
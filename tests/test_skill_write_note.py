@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import hashlib
+import shutil
 from pathlib import Path
 
 import pytest
@@ -15,6 +16,7 @@ from kavi.skills.write_note import WriteNoteInput, WriteNoteOutput, WriteNoteSki
 def _isolate_vault(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
     """Redirect VAULT_OUT to tmp_path for every test."""
     monkeypatch.setattr(write_note, "VAULT_OUT", tmp_path / "vault_out")
+    monkeypatch.setattr(write_note, "_made_dirs", set())
 
 
 class TestWriteNoteModels:
@@ -74,6 +76,41 @@ class TestWriteNoteSkill:
         assert "# Readme" in written.read_text()
         assert result.sha256 == hashlib.sha256(written.read_bytes()).hexdigest()
 
+    def test_execute_hashes_multi_chunk_body(self, tmp_path: Path):
+        body = "x" * (write_note._WRITE_CHUNK * 2 + 17)
+        result = WriteNoteSkill().execute(
+            WriteNoteInput(path="big.md", title="Big", body=body)
+        )
+        written = (tmp_path / "vault_out" / "big.md").read_bytes()
+        assert written == f"# Big\n\n{body}\n".encode()
+        assert result.sha256 == hashlib.sha256(written).hexdigest()
+
+    def test_parent_created_once(self, monkeypatch: pytest.MonkeyPatch):
+        calls: list[Path] = []
+        real_mkdir = Path.mkdir
+
+        def counting_mkdir(self: Path, *args, **kwargs) -> None:
+            calls.append(self)
+            real_mkdir(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "mkdir", counting_mkdir)
+        skill = WriteNoteSkill()
+        skill.execute(WriteNoteInput(path="daily/0.md", title="T", body="B"))
+        assert calls
+        calls.clear()
+        for i in (1, 2):
+            skill.execute(WriteNoteInput(path=f"daily/{i}.md", title="T", body="B"))
+        assert calls == []
+
+    def test_recreates_removed_parent(self, tmp_path: Path):
+        skill = WriteNoteSkill()
+        skill.execute(WriteNoteInput(path="daily/a.md", title="A", body="a"))
+        shutil.rmtree(tmp_path / "vault_out")
+
+        skill.execute(WriteNoteInput(path="daily/b.md", title="B", body="b"))
+
+        assert (tmp_path / "vault_out" / "daily" / "b.md").read_text() == "# B\n\nb\n"
+
     def test_rejects_absolute_path(self):
         skill = WriteNoteSkill()
         with pytest.raises(ValueError, match="Invalid path"):
@@ -104,3 +141,44 @@ class TestWriteNoteSkill:
         skill = WriteNoteSkill()
         with pytest.raises(Exception):
             skill.validate_and_run({"path": "x.md"})  # missing title and body
+
+
+class TestExecuteMany:
+    def _inputs(self, n: int) -> list[WriteNoteInput]:
+        return [
+            WriteNoteInput(path=f"batch/n{i}.md", title=f"T{i}", body="x" * (i * 1000))
+            for i in range(n)
+        ]
+
+    @pytest.mark.parametrize("n", [3, 12])
+    def test_matches_execute(self, tmp_path: Path, n: int):
+        skill = WriteNoteSkill()
+        inputs = self._inputs(n)
+
+        batch = skill.execute_many(inputs)
+
+        assert [r.written_path for r in batch] == [
+            str(tmp_path / "vault_out" / inp.path) for inp in inputs
+        ]
+        for inp, result in zip(inputs, batch):
+            written = (tmp_path / "vault_out" / inp.path).read_bytes()
+            assert result.sha256 == hashlib.sha256(written).hexdigest()
+            assert result == skill.execute(inp)
+
+    def test_repeated_path_last_write_wins(self, tmp_path: Path):
+        inputs = self._inputs(10)
+        inputs[-1] = WriteNoteInput(path="batch/n0.md", title="Last", body="final")
+
+        WriteNoteSkill().execute_many(inputs)
+
+        assert (tmp_path / "vault_out" / "batch" / "n0.md").read_text() == "# Last\n\nfinal\n"
+
+    def test_invalid_path_stops_after_earlier_writes(self, tmp_path: Path):
+        inputs = self._inputs(10)
+        inputs[4] = WriteNoteInput(path="../escape.md", title="T", body="B")
+
+        with pytest.raises(ValueError, match="Invalid path"):
+            WriteNoteSkill().execute_many(inputs)
+
+        written = sorted(p.name for p in (tmp_path / "vault_out" / "batch").iterdir())
+        assert written == ["n0.md", "n1.md", "n2.md", "n3.md"]
@@ -78,6 +78,21 @@ class TestRegistry:
         assert len(skills) == 1
         assert skills[0]["name"] == "test_skill"
 
+    def test_cached_load_returns_independent_copies(self, populated_registry):
+        first = load_registry(populated_registry)
+        first[0]["name"] = "mutated"
+        first.append({"name": "extra"})
+        second = load_registry(populated_registry)
+        assert len(second) == 1
+        assert second[0]["name"] == "test_skill"
+
+    def test_external_edit_invalidates_cache(self, tmp_path):
+        reg = tmp_path / "registry.yaml"
+        save_registry(reg, [{"name": "foo", "module_path": "bar.Baz"}])
+        assert load_registry(reg)[0]["name"] == "foo"
+        reg.write_text("skills:\n- name: renamed\n  module_path: bar.Baz\n")
+        assert load_registry(reg)[0]["name"] == "renamed"
+
 
 class TestBaseSkill:
     def test_validate_and_run(self):
@@ -90,6 +105,17 @@ class TestBaseSkill:
         with pytest.raises(Exception):  # Pydantic validation error
             skill.validate_and_run({"wrong_field": "x"})
 
+    def test_foreign_output_model_is_revalidated(self):
+        class LooseOutput(SkillOutput):
+            result: int
+
+        class LooseSkill(MockSkill):
+            def execute(self, input_data: MockInput) -> LooseOutput:  # type: ignore[override]
+                return LooseOutput(result=len(input_data.value))
+
+        with pytest.raises(Exception):  # int result does not satisfy MockOutput
+            LooseSkill().validate_and_run({"value": "hello"})
+
     def test_skill_attributes(self):
         skill = MockSkill()
         assert skill.name == "test_skill"
@@ -153,6 +179,99 @@ class TestTrustEnforcement:
         assert "no hash" in str(w[0].message)
         assert "trust check skipped" in str(w[0].message)
 
+    def test_load_skill_uses_first_entry_and_sees_edits(self, tmp_path: Path) -> None:
+        reg = tmp_path / "registry.yaml"
+        entry = {
+            "name": "test_skill",
+            "module_path": "tests.test_skills_loader.MockSkill",
+            "hash": self._this_file_hash(),
+        }
+        save_registry(reg, [entry, {**entry, "hash": "deadbeef" * 8}])
+        assert load_skill(reg, "test_skill").name == "test_skill"
+        save_registry(reg, [{**entry, "hash": "deadbeef" * 8}])
+        with pytest.raises(TrustError):
+            load_skill(reg, "test_skill")
+
+    def test_repeat_loads_import_module_once(self, tmp_path: Path) -> None:
+        import importlib
+        from unittest.mock import patch
+
+        from kavi.skills import loader
+
+        reg = tmp_path / "registry.yaml"
+        save_registry(reg, [{
+            "name": "test_skill",
+            "module_path": "tests.test_skills_loader.MockSkill",
+            "hash": self._this_file_hash(),
+        }])
+        loader._resolve_skill.cache_clear()
+        with patch.object(
+            loader.importlib, "import_module", wraps=importlib.import_module,
+        ) as spy:
+            first = load_skill(reg, "test_skill")
+            second = load_skill(reg, "test_skill")
+        assert spy.call_count == 1
+        assert type(first) is type(second) is MockSkill
+        assert first is not second
+
+    def _hashing_registry(self, tmp_path: Path) -> Path:
+        from kavi.skills import loader
+
+        loader._verified_hashes.clear()
+        reg = tmp_path / "registry.yaml"
+        save_registry(reg, [{
+            "name": "test_skill",
+            "module_path": "tests.test_skills_loader.MockSkill",
+            "hash": self._this_file_hash(),
+        }])
+        return reg
+
+    def test_unchanged_file_is_hashed_once(self, tmp_path: Path) -> None:
+        from unittest.mock import patch
+
+        reg = self._hashing_registry(tmp_path)
+        with patch(
+            "kavi.skills.loader.hashlib.file_digest", wraps=hashlib.file_digest,
+        ) as spy:
+            load_skill(reg, "test_skill")
+            load_skill(reg, "test_skill")
+        assert spy.call_count == 1
+
+    def test_strict_mode_rehashes_every_load(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        from unittest.mock import patch
+
+        from kavi.skills import loader
+
+        reg = self._hashing_registry(tmp_path)
+        monkeypatch.setattr(loader, "STRICT_TRUST_HASH", True)
+        with patch(
+            "kavi.skills.loader.hashlib.file_digest", wraps=hashlib.file_digest,
+        ) as spy:
+            load_skill(reg, "test_skill")
+            load_skill(reg, "test_skill")
+        assert spy.call_count == 2
+
+    def test_cached_verification_does_not_cover_a_new_hash(self, tmp_path: Path) -> None:
+        reg = self._hashing_registry(tmp_path)
+        load_skill(reg, "test_skill")
+        save_registry(reg, [{
+            "name": "test_skill",
+            "module_path": "tests.test_skills_loader.MockSkill",
+            "hash": "deadbeef" * 8,
+        }])
+        with pytest.raises(TrustError):
+            load_skill(reg, "test_skill")
+
+    def test_shipped_registry_hashes_match_sources(self) -> None:
+        """Every trusted skill in the shipped registry passes its trust check."""
+        from kavi.config import REGISTRY_PATH
+
+        for entry in load_registry(REGISTRY_PATH):
+            if entry.get("hash"):
+                load_skill(REGISTRY_PATH, entry["name"])
+
     def test_load_skill_not_found(self, tmp_path: Path) -> None:
         """KeyError when skill name not in registry."""
         reg = tmp_path / "registry.yaml"
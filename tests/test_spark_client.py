@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import json
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+import kavi.llm.spark as spark
 from kavi.llm.spark import (
     SparkError,
     SparkUnavailableError,
@@ -18,6 +20,41 @@ from kavi.llm.spark import (
     is_available,
 )
 
+
+@pytest.fixture(autouse=True)
+def _reachable_gateway():
+    """Let is_available's TCP probe succeed; tests mock the HTTP layer."""
+    with patch("kavi.llm.spark.socket.create_connection"):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def _no_disk_cache(monkeypatch):
+    """Keep the on-disk embedding cache out of tests unless one opts in."""
+    monkeypatch.setattr(spark, "_embed_cache_db", None)
+
+
+_real_http_client = spark._http_client
+
+
+@pytest.fixture(autouse=True)
+def _stub_http_client(monkeypatch):
+    """OpenAI is mocked throughout; skip building a real HTTP client per test."""
+    monkeypatch.setattr(spark, "_http_client", lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_clients():
+    """Drop cached clients and embeddings so each test sees its own patched OpenAI."""
+    spark._clients.clear()
+    spark._embed_cache.clear()
+    spark._semantic_cache.clear()
+    yield
+    spark._clients.clear()
+    spark._embed_cache.clear()
+    spark._semantic_cache.clear()
+
+
 # ---------------------------------------------------------------------------
 # is_available
 # ---------------------------------------------------------------------------
@@ -47,6 +84,97 @@ def test_is_available_returns_false_on_timeout(mock_openai_cls: MagicMock) -> No
     assert is_available() is False
 
 
+@patch("kavi.llm.spark.OpenAI")
+def test_is_available_skips_http_when_port_closed(mock_openai_cls: MagicMock) -> None:
+    with patch(
+        "kavi.llm.spark.socket.create_connection",
+        side_effect=ConnectionRefusedError("refused"),
+    ) as probe:
+        assert is_available("http://gateway:9000/v1", timeout=2) is False
+    probe.assert_called_once_with(("gateway", 9000), timeout=2)
+    mock_openai_cls.assert_not_called()
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_client_reused_across_calls(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = _mock_response("ok")
+    mock_openai_cls.return_value = mock_client
+
+    assert is_available() is True
+    generate([{"role": "user", "content": "a"}])
+    generate([{"role": "user", "content": "b"}], timeout=7)
+
+    mock_openai_cls.assert_called_once()
+    assert mock_client.chat.completions.create.call_args.kwargs["timeout"] == 7
+
+
+def test_openai_imported_lazily() -> None:
+    import os
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, kavi.llm.spark as s\n"
+        "assert 'openai' not in sys.modules\n"
+        "s._get_client('http://localhost:1/v1')\n"
+        "assert 'openai' in sys.modules\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_client_keeps_idle_connections_alive(mock_openai_cls: MagicMock) -> None:
+    with patch.object(spark, "_http_client", return_value="pooled") as make_http:
+        is_available()
+        embed_client = spark._get_client(spark.SPARK_BASE_URL)
+    make_http.assert_called_once()
+    assert mock_openai_cls.call_args.kwargs["http_client"] == "pooled"
+    assert embed_client is mock_openai_cls.return_value
+
+
+def test_http_client_keepalive_limits() -> None:
+    from openai import DefaultHttpxClient
+
+    with patch("openai.DefaultHttpxClient", wraps=DefaultHttpxClient) as cls:
+        _real_http_client().close()
+    limits = cls.call_args.kwargs["limits"]
+    assert limits.keepalive_expiry == spark._KEEPALIVE_EXPIRY
+    assert limits.max_keepalive_connections == spark._MAX_KEEPALIVE_CONNECTIONS
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_close_clients_closes_pool(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    mock_openai_cls.return_value = mock_client
+    is_available()
+    spark._close_clients()
+    mock_client.close.assert_called_once()
+    assert spark._clients == {}
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_client_shared_by_tool_call_and_embed(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    mock_openai_cls.return_value = mock_client
+    tc = MagicMock()
+    tc.function.name = "search_notes"
+    tc.function.arguments = "{}"
+    choice = MagicMock()
+    choice.message.tool_calls = [tc]
+    mock_client.chat.completions.create.return_value.choices = [choice]
+    item = MagicMock(index=0, embedding=[0.1])
+    mock_client.embeddings.create.return_value.data = [item]
+
+    generate_tool_call([{"role": "user", "content": "a"}], [], timeout=3)
+    embed(["a"], timeout=4)
+
+    mock_openai_cls.assert_called_once()
+    assert mock_client.chat.completions.create.call_args.kwargs["timeout"] == 3
+    assert mock_client.embeddings.create.call_args.kwargs["timeout"] == 4
+
+
 # ---------------------------------------------------------------------------
 # generate (D019: messages API)
 # ---------------------------------------------------------------------------
@@ -88,6 +216,95 @@ def test_generate_passes_messages_directly(mock_openai_cls: MagicMock) -> None:
     assert call_args.kwargs["messages"] == msgs
 
 
+@patch("kavi.llm.spark.OpenAI")
+def test_generate_semantic_cache_reuses_similar_prompt(
+    mock_openai_cls: MagicMock, monkeypatch,
+) -> None:
+    monkeypatch.setattr(spark, "_semantic_cache_enabled", True)
+    vectors = iter([[1.0, 0.0], [0.99, 0.05], [0.0, 1.0]])
+
+    def create(*, model: str, input: list[str], timeout: float) -> MagicMock:
+        resp = MagicMock()
+        resp.data = [_mock_embedding(0, next(vectors))]
+        return resp
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = _mock_response("first")
+    mock_client.embeddings.create.side_effect = create
+    mock_openai_cls.return_value = mock_client
+
+    assert generate([{"role": "user", "content": "What is Kavi?"}]) == "first"
+    # Exact repeat: served by hash without embedding again
+    assert generate([{"role": "user", "content": "What is Kavi?"}]) == "first"
+    assert mock_client.embeddings.create.call_count == 1
+    # Near-duplicate: cosine above threshold
+    near = generate([{"role": "user", "content": "What's Kavi?"}])
+    assert near == "first"
+    assert isinstance(near, spark.NearMatchResponse)
+    # Unrelated prompt goes to the model
+    mock_client.chat.completions.create.return_value = _mock_response("second")
+    assert generate([{"role": "user", "content": "Weather?"}]) == "second"
+    assert mock_client.chat.completions.create.call_count == 2
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_generate_semantic_cache_near_match_needs_same_context(
+    mock_openai_cls: MagicMock, monkeypatch,
+) -> None:
+    monkeypatch.setattr(spark, "_semantic_cache_enabled", True)
+
+    def create(*, model: str, input: list[str], timeout: float) -> MagicMock:
+        resp = MagicMock()
+        resp.data = [_mock_embedding(0, [1.0, 0.0])]
+        return resp
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.side_effect = [
+        _mock_response("a"), _mock_response("b"), _mock_response("c"),
+    ]
+    mock_client.embeddings.create.side_effect = create
+    mock_openai_cls.return_value = mock_client
+
+    note = {"role": "user", "content": "note"}
+    assert generate([{"role": "system", "content": "summarize"}, note]) == "a"
+    # Same final message, different system prompt: no reuse
+    assert generate([{"role": "system", "content": "critique"}, note]) == "b"
+    # Same prompt on another gateway: no reuse, not even exact
+    assert generate(
+        [{"role": "system", "content": "summarize"}, note], base_url="http://other:1/v1",
+    ) == "c"
+    assert mock_client.chat.completions.create.call_count == 3
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_generate_semantic_cache_skips_nonzero_temperature(
+    mock_openai_cls: MagicMock, monkeypatch,
+) -> None:
+    monkeypatch.setattr(spark, "_semantic_cache_enabled", True)
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = _mock_response("ok")
+    mock_openai_cls.return_value = mock_client
+
+    msgs = [{"role": "user", "content": "hi"}]
+    generate(msgs, temperature=0.7)
+    generate(msgs, temperature=0.7)
+    assert mock_client.chat.completions.create.call_count == 2
+    mock_client.embeddings.create.assert_not_called()
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_generate_semantic_cache_off_by_default(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = _mock_response("ok")
+    mock_openai_cls.return_value = mock_client
+
+    msgs = [{"role": "user", "content": "hi"}]
+    generate(msgs)
+    generate(msgs)
+    assert mock_client.chat.completions.create.call_count == 2
+    mock_client.embeddings.create.assert_not_called()
+
+
 @patch("kavi.llm.spark.OpenAI")
 def test_generate_truncates_last_user_message(mock_openai_cls: MagicMock) -> None:
     mock_client = MagicMock()
@@ -199,6 +416,30 @@ class TestTruncateMessages:
         result = _truncate_messages(msgs, 100)
         assert result[0]["content"] == "s" * 80
 
+    def test_drops_oldest_history_first(self) -> None:
+        msgs = [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "a" * 40},
+            {"role": "assistant", "content": "b" * 40},
+            {"role": "user", "content": "c" * 10},
+            {"role": "user", "content": "now"},
+        ]
+        result = _truncate_messages(msgs, 20)
+        assert result == [msgs[0], msgs[3], msgs[4]]
+
+    def test_drops_tool_call_group_atomically(self) -> None:
+        msgs = [
+            {"role": "system", "content": "sys"},
+            {"role": "assistant", "content": "", "tool_calls": [{"id": "1"}]},
+            {"role": "tool", "content": "r" * 50, "tool_call_id": "1"},
+            {"role": "assistant", "content": "done"},
+            {"role": "user", "content": "u" * 10},
+            {"role": "user", "content": "now"},
+        ]
+        result = _truncate_messages(msgs, 20)
+        assert result == [msgs[0], msgs[4], msgs[5]]
+        assert msgs[2]["content"] == "r" * 50  # input untouched
+
     def test_no_user_message_returns_unchanged(self) -> None:
         msgs = [{"role": "system", "content": "x" * 200}]
         result = _truncate_messages(msgs, 100)
@@ -301,6 +542,28 @@ def test_generate_tool_call_raises_on_bad_args(mock_openai_cls: MagicMock) -> No
         )
 
 
+@pytest.mark.parametrize(("raw", "expected"), [("", {}), ("  ", {}), ("[1]", None)])
+@patch("kavi.llm.spark.OpenAI")
+def test_generate_tool_call_empty_or_non_object_args(
+    mock_openai_cls: MagicMock, raw: str, expected: dict[str, Any] | None,
+) -> None:
+    mock_client = MagicMock()
+    tc = MagicMock()
+    tc.function.name = "talk"
+    tc.function.arguments = raw
+    choice = MagicMock()
+    choice.message.tool_calls = [tc]
+    mock_client.chat.completions.create.return_value.choices = [choice]
+    mock_openai_cls.return_value = mock_client
+
+    msgs = [{"role": "user", "content": "hi"}]
+    if expected is None:
+        with pytest.raises(SparkError, match="expected an object, got list"):
+            generate_tool_call(msgs, [])
+    else:
+        assert generate_tool_call(msgs, []).arguments == expected
+
+
 @patch("kavi.llm.spark.OpenAI")
 def test_generate_tool_call_raises_unavailable(mock_openai_cls: MagicMock) -> None:
     mock_client = MagicMock()
@@ -373,6 +636,242 @@ def test_embed_preserves_order(mock_openai_cls: MagicMock) -> None:
     assert result == [[0.1, 0.2], [0.3, 0.4]]
 
 
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_sends_duplicates_once(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    resp = MagicMock()
+    resp.data = [
+        _mock_embedding(0, [0.1, 0.2]),
+        _mock_embedding(1, [0.3, 0.4]),
+    ]
+    mock_client.embeddings.create.return_value = resp
+    mock_openai_cls.return_value = mock_client
+
+    result = embed(["a", "b", "a", "a"])
+    assert mock_client.embeddings.create.call_args.kwargs["input"] == ["a", "b"]
+    assert result == [[0.1, 0.2], [0.3, 0.4], [0.1, 0.2], [0.1, 0.2]]
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_reuses_cached_vectors(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    first = MagicMock()
+    first.data = [_mock_embedding(0, [0.1]), _mock_embedding(1, [0.2])]
+    second = MagicMock()
+    second.data = [_mock_embedding(0, [0.3])]
+    mock_client.embeddings.create.side_effect = [first, second]
+    mock_openai_cls.return_value = mock_client
+
+    assert embed(["a", "b"]) == [[0.1], [0.2]]
+    assert embed(["b", "c", "a"]) == [[0.2], [0.3], [0.1]]
+    assert mock_client.embeddings.create.call_args.kwargs["input"] == ["c"]
+    # Fully cached batches make no request
+    assert embed(["c", "a"]) == [[0.3], [0.1]]
+    assert mock_client.embeddings.create.call_count == 2
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_cache_is_bounded(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    resp = MagicMock()
+    resp.data = [_mock_embedding(i, [float(i)]) for i in range(3)]
+    mock_client.embeddings.create.return_value = resp
+    mock_openai_cls.return_value = mock_client
+
+    with patch.object(spark, "_EMBED_CACHE_MAX", 2):
+        embed(["a", "b", "c"])
+    assert [k[2] for k in spark._embed_cache] == ["b", "c"]
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_fans_out_batches_concurrently(mock_openai_cls: MagicMock) -> None:
+    import threading
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    def create(*, model: str, input: list[str], timeout: float) -> MagicMock:
+        barrier.wait()  # all three batches must be in flight together
+        resp = MagicMock()
+        resp.data = [_mock_embedding(i, [float(t)]) for i, t in enumerate(input)]
+        return resp
+
+    mock_client = MagicMock()
+    mock_client.embeddings.create.side_effect = create
+    mock_openai_cls.return_value = mock_client
+
+    texts = [str(i) for i in range(5)]
+    result = embed(texts, batch_size=2, concurrency=4)
+    assert result == [[float(i)] for i in range(5)]
+    assert mock_client.embeddings.create.call_count == 3
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_disk_cache_survives_memory_cache(
+    mock_openai_cls: MagicMock, tmp_path, monkeypatch,
+) -> None:
+    monkeypatch.setattr(spark, "_embed_cache_db", tmp_path / "cache" / "emb.db")
+    mock_client = MagicMock()
+    resp = MagicMock()
+    resp.data = [_mock_embedding(0, [0.1, 0.25]), _mock_embedding(1, [0.5, 0.75])]
+    mock_client.embeddings.create.return_value = resp
+    mock_openai_cls.return_value = mock_client
+
+    assert embed(["a", "b"]) == [[0.1, 0.25], [0.5, 0.75]]
+    spark._embed_cache.clear()  # as in a new process
+    assert embed(["b", "a"]) == [[0.5, 0.75], [0.1, 0.25]]
+    assert mock_client.embeddings.create.call_count == 1
+    # Keyed by model as well as text
+    resp.data = [_mock_embedding(0, [0.9])]
+    assert embed(["a"], model="other") == [[0.9]]
+    assert mock_client.embeddings.create.call_count == 2
+    # ...and by gateway: another base URL never reuses these vectors
+    spark._embed_cache.clear()
+    resp.data = [_mock_embedding(0, [0.3])]
+    assert embed(["a"], base_url="http://other:1/v1") == [[0.3]]
+    assert mock_client.embeddings.create.call_count == 3
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_disk_cache_expires(
+    mock_openai_cls: MagicMock, tmp_path, monkeypatch,
+) -> None:
+    monkeypatch.setattr(spark, "_embed_cache_db", tmp_path / "emb.db")
+    monkeypatch.setattr(spark, "SPARK_EMBED_CACHE_TTL", -1)
+    mock_client = MagicMock()
+    resp = MagicMock()
+    resp.data = [_mock_embedding(0, [0.1])]
+    mock_client.embeddings.create.return_value = resp
+    mock_openai_cls.return_value = mock_client
+
+    embed(["a"])
+    spark._embed_cache.clear()
+    embed(["a"])
+    assert mock_client.embeddings.create.call_count == 2
+
+
+@pytest.mark.parametrize("indices", [(0, 0), (0, 2), (-1, 0)])
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_raises_on_bad_indices(
+    mock_openai_cls: MagicMock, indices: tuple[int, int],
+) -> None:
+    mock_client = MagicMock()
+    resp = MagicMock()
+    resp.data = [_mock_embedding(i, [0.1]) for i in indices]
+    mock_client.embeddings.create.return_value = resp
+    mock_openai_cls.return_value = mock_client
+
+    with pytest.raises(SparkError, match="bad embedding index"):
+        embed(["a", "b"])
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_use_batch_polls_job_and_restores_order(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    mock_openai_cls.return_value = mock_client
+    mock_client.files.create.return_value.id = "file-in"
+    pending = MagicMock(id="batch-1", status="in_progress")
+    done = MagicMock(id="batch-1", status="completed", output_file_id="file-out")
+    mock_client.batches.create.return_value = pending
+    mock_client.batches.retrieve.return_value = done
+    lines = [
+        {"custom_id": "1", "response": {"body": {"data": [{"embedding": [0.2]}]}}},
+        {"custom_id": "0", "response": {"body": {"data": [{"embedding": [0.1]}]}}},
+    ]
+    mock_client.files.content.return_value.text = "\n".join(json.dumps(x) for x in lines)
+
+    result = embed(["a", "b", "a"], use_batch=True, poll_interval=0)
+
+    assert result == [[0.1], [0.2], [0.1]]
+    uploaded = mock_client.files.create.call_args.kwargs["file"][1].decode().splitlines()
+    assert [json.loads(x)["body"]["input"] for x in uploaded] == ["a", "b"]
+    assert mock_client.batches.create.call_args.kwargs["endpoint"] == "/v1/embeddings"
+    mock_client.batches.retrieve.assert_called_once_with("batch-1", timeout=spark.SPARK_TIMEOUT)
+    mock_client.embeddings.create.assert_not_called()
+    deleted = [c.args[0] for c in mock_client.files.delete.call_args_list]
+    assert deleted == ["file-in", "file-out"]
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_use_batch_falls_back_when_unsupported(
+    mock_openai_cls: MagicMock, caplog: pytest.LogCaptureFixture,
+) -> None:
+    mock_client = MagicMock()
+    mock_openai_cls.return_value = mock_client
+    mock_client.files.create.return_value.id = "file-in"
+    mock_client.batches.create.side_effect = _StatusError(404)
+    resp = MagicMock()
+    resp.data = [_mock_embedding(0, [0.5])]
+    mock_client.embeddings.create.return_value = resp
+
+    with caplog.at_level("WARNING", logger="kavi.llm.spark"):
+        assert embed(["a"], use_batch=True) == [[0.5]]
+    mock_client.embeddings.create.assert_called_once()
+    mock_client.files.delete.assert_called_once_with("file-in", timeout=spark.SPARK_TIMEOUT)
+    assert "Batch API unsupported" in caplog.text
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_use_batch_failed_job_raises(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    mock_openai_cls.return_value = mock_client
+    mock_client.files.create.return_value.id = "file-in"
+    mock_client.batches.create.return_value = MagicMock(
+        id="batch-1", status="failed", output_file_id=None,
+    )
+
+    with pytest.raises(SparkError, match="ended failed"):
+        embed(["a"], use_batch=True)
+    mock_client.embeddings.create.assert_not_called()
+    mock_client.batches.cancel.assert_not_called()
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_use_batch_unreachable_raises(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    mock_openai_cls.return_value = mock_client
+    mock_client.files.create.side_effect = ConnectionError("refused")
+
+    with pytest.raises(SparkUnavailableError):
+        embed(["a"], use_batch=True)
+    mock_client.embeddings.create.assert_not_called()
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_use_batch_cancels_on_deadline_and_cleans_up(
+    mock_openai_cls: MagicMock,
+) -> None:
+    mock_client = MagicMock()
+    mock_openai_cls.return_value = mock_client
+    mock_client.files.create.return_value.id = "file-in"
+    pending = MagicMock(id="batch-1", status="in_progress", output_file_id=None)
+    mock_client.batches.create.return_value = pending
+    mock_client.batches.retrieve.return_value = pending
+
+    with pytest.raises(SparkError, match="still in_progress"):
+        embed(["a"], use_batch=True, poll_interval=0, batch_max_wait=-1)
+    mock_client.batches.cancel.assert_called_once_with("batch-1", timeout=spark.SPARK_TIMEOUT)
+    mock_client.files.delete.assert_called_once_with("file-in", timeout=spark.SPARK_TIMEOUT)
+    mock_client.embeddings.create.assert_not_called()
+
+
+@patch("kavi.llm.spark.OpenAI")
+def test_embed_raises_on_count_mismatch(mock_openai_cls: MagicMock) -> None:
+    mock_client = MagicMock()
+    resp = MagicMock()
+    resp.data = [_mock_embedding(0, [0.1])]
+    mock_client.embeddings.create.return_value = resp
+    mock_openai_cls.return_value = mock_client
+
+    with pytest.raises(SparkError, match="1 embeddings for 2 inputs"):
+        embed(["a", "b"])
+
+
 def test_embed_empty_list() -> None:
     result = embed([])
     assert result == []